@@ -0,0 +1,234 @@
+import datetime
+from typing import NamedTuple
+
+import pandas as pd
+
+import rfm
+import shared_dataset
+from customer_features import CustomerFeatureStore
+from daily_cube import DailyCube
+from data_loader import DASHBOARD_COLUMNS, compact_frame, decode_ids
+from data_sources import dataset_version, get_data_source, load_config
+from filter_index import FilterIndex, RowSelection
+from payment_analytics import PaymentAnalytics
+from sql_engine import DuckDbAnalytics
+from streaming import StreamingDataset
+
+CATEGORY_COLUMN = 'product_category_name_english'
+CATEGORY_REVENUE_COLUMNS = ['category', 'total_revenue', 'avg_order_value', 'total_orders', 'total_items', 'avg_review']
+
+
+# ===========================
+# API ANALITIK TANPA UI
+# ===========================
+# Semua angka dashboard (KPI, Pertanyaan Bisnis 1–3) sebagai fungsi / objek Python biasa: bisa
+# di-import, diukur waktunya, dan dijalankan tanpa sesi Streamlit (lihat batch_report.py).
+# dasboard.py memakai fungsi yang sama, hanya menambahkan cache Streamlit dan tampilan.
+
+class Filters(NamedTuple):
+    # Filter sidebar; None = tidak difilter
+    years: tuple = None                  # tahun pembelian, mis. (2017, 2018)
+    start_date: datetime.date = None     # rentang tanggal inklusif (keduanya diisi atau keduanya None)
+    end_date: datetime.date = None
+    statuses: tuple = None               # status order, mis. ('delivered',)
+
+    def normalized(self):
+        # Urutan tahun / status tidak berpengaruh pada hasil -> kunci cache yang sama
+        return Filters(
+            None if self.years is None else tuple(sorted(set(int(y) for y in self.years))),
+            self.start_date,
+            self.end_date,
+            None if self.statuses is None else tuple(sorted(set(self.statuses)))
+        )
+
+
+class Kpis(NamedTuple):
+    total_orders: int
+    total_revenue: float
+    avg_order_value: float
+    unique_customers: int
+
+
+class Report(NamedTuple):
+    # Semua hasil pertanyaan bisnis untuk satu kombinasi filter
+    filters: Filters
+    kpis: Kpis
+    revenue_by_category: pd.DataFrame    # Pertanyaan Bisnis 1 (kolom CATEGORY_REVENUE_COLUMNS + kontribusi %)
+    payment_stats: pd.DataFrame          # Pertanyaan Bisnis 2 (PaymentAnalytics.stats(), per metode bayar)
+    rfm: pd.DataFrame                    # Pertanyaan Bisnis 3: skor & segmen per customer
+    segment_stats: pd.DataFrame          # Pertanyaan Bisnis 3: ringkasan per segmen
+
+
+# ===========================
+# PERHITUNGAN (DIPAKAI DASHBOARD & BATCH)
+# ===========================
+def revenue_by_category(cube_view, rows):
+    # Revenue per kategori, urut pendapatan terbesar + revenue_contribution_pct.
+    # rows: df_filtered (DataFrame / RowSelection) atau seleksi lazy (StreamingSelection / SqlView); hanya dipakai
+    # kalau order tidak additive di cube (order tersebar di beberapa hari / status)
+    if cube_view.can_count_orders:
+        table = cube_view.revenue_by_category()
+    elif not isinstance(rows, (pd.DataFrame, RowSelection)):
+        table = rows.revenue_by_category()
+    else:
+        if isinstance(rows, RowSelection):
+            rows = rows.frame([CATEGORY_COLUMN, 'order_id', 'product_id', 'price', 'review_score_avg'])
+        # Baris dengan product_id, price, kategori tidak kosong
+        q1_rows = rows.dropna(subset=['product_id', 'price', CATEGORY_COLUMN])
+        table = q1_rows.groupby(CATEGORY_COLUMN, observed=True).agg({
+            'price': ['sum', 'mean'],  # sum = Total Revenue, mean = Avg Order Value
+            'order_id': 'nunique',     # nunique = Total Orders (unique)
+            'product_id': 'count',     # count = Total Items
+            'review_score_avg': 'mean' # Review score
+        }).reset_index()
+
+    table.columns = CATEGORY_REVENUE_COLUMNS
+    table = table.sort_values('total_revenue', ascending=False)
+    table['revenue_contribution_pct'] = table['total_revenue'] / table['total_revenue'].sum() * 100
+    return table
+
+
+def nunique(rows, col):
+    # df_filtered[col].nunique() untuk DataFrame maupun seleksi lazy
+    return rows[col].nunique() if isinstance(rows, pd.DataFrame) else rows.nunique(col)
+
+
+def kpis(cube_view, rows):
+    # KPI exact: order unik dari cube kalau additive, sisanya nunique di baris hasil filter
+    total_orders = cube_view.total_orders() if cube_view.can_count_orders else nunique(rows, 'order_id')
+    return Kpis(int(total_orders), float(cube_view.total_revenue()), float(cube_view.avg_order_value()),
+                int(nunique(rows, 'customer_unique_id')))
+
+
+def rfm_scores(rows, filters, rules=None):
+    # rows: CustomerFeatureStore (filter dihitung dari prefix sum), seleksi lazy, atau df_filtered
+    if isinstance(rows, CustomerFeatureStore):
+        return rows.calculate_rfm(*filters, rules)
+    if isinstance(rows, pd.DataFrame):
+        return rfm.calculate_rfm(rows, rules)
+    return rows.calculate_rfm(rules)
+
+
+def segment_stats(rfm_data):
+    # Statistik per segmen (tabel Data & Insight Pertanyaan Bisnis 3), urut pendapatan terbesar
+    stats = rfm_data.groupby('segment').agg({
+        'customer_id': 'count',
+        'recency': ['mean', 'median'],
+        'frequency': ['mean', 'median', 'sum'],
+        'monetary': ['mean', 'median', 'sum']
+    }).round(2)
+
+    stats.columns = ['Customer Count', 'Avg Recency', 'Median Recency',
+                     'Avg Frequency', 'Median Frequency', 'Total Orders',
+                     'Avg Monetary', 'Median Monetary', 'Total Revenue']
+
+    # Tambahkan persentase
+    stats['Customer %'] = (stats['Customer Count'] / stats['Customer Count'].sum() * 100).round(2)
+    stats['Revenue %'] = (stats['Total Revenue'] / stats['Total Revenue'].sum() * 100).round(2)
+    return stats.sort_values('Total Revenue', ascending=False)
+
+
+# ===========================
+# ENGINE ANALITIK
+# ===========================
+class Analytics:
+    # Dataset + struktur turunan (index filter, cube harian, feature store RFM) dibangun sekali,
+    # lalu dipakai bersama semua select() / report(). Backend mengikuti konfigurasi dashboard:
+    # engine duckdb, mode streaming, atau in-memory (pushdown & incremental khusus dashboard).
+
+    def __init__(self, config=None):
+        self.config = config or load_config()
+        self._selections = {}
+        self._features = None
+        if self.config.engine == 'duckdb':
+            self.backend = self.cube = DuckDbAnalytics(self.config)
+            self.df, self.id_lookup, self.version = None, {}, self.backend.version
+            self.filter_options = self.backend.filter_options
+        elif self.config.streaming:
+            self.backend = StreamingDataset(self.config)
+            self.cube = self.backend.daily_cube()
+            self.df, self.id_lookup, self.version = None, self.backend.id_lookup, self.backend.version
+            self.filter_options = self.backend.filter_options
+        elif self.config.shared_dir:
+            # Dataset bersama (memory map) yang juga dipakai dashboard, tidak dimuat ulang dari sumber
+            self.df, self.id_lookup, self.version = shared_dataset.open_dataset(self.config)
+        else:
+            source = get_data_source(self.config)
+            self.version = dataset_version(self.config, source)
+            self.df, self.id_lookup = compact_frame(source.load(columns=DASHBOARD_COLUMNS))
+        if self.df is not None:
+            self.backend = FilterIndex(self.df)
+            self.cube = DailyCube(self.df)
+            self.filter_options = self.backend.options()
+
+    def customer_features(self):
+        # Feature store RFM, dibangun saat pertama kali dibutuhkan (hanya backend in-memory)
+        if self._features is None:
+            self._features = CustomerFeatureStore.open(self.df, self.version, self.config.feature_store_dir)
+        return self._features
+
+    def select(self, filters=Filters()):
+        # Seleksi per kombinasi filter di-cache: preset dengan filter sama berbagi semua hasil
+        filters = filters.normalized()
+        if filters not in self._selections:
+            self._selections[filters] = Selection(self, filters)
+        return self._selections[filters]
+
+    def report(self, filters=Filters(), rules=None):
+        return self.select(filters).report(rules)
+
+    def decode_customers(self, rfm_data):
+        # customer_id kode integer -> ID asli (engine duckdb sudah mengembalikan ID asli)
+        if 'customer_unique_id' not in self.id_lookup:
+            return rfm_data
+        rfm_data = rfm_data.copy()
+        rfm_data['customer_id'] = decode_ids(rfm_data['customer_id'].to_numpy(), self.id_lookup, 'customer_unique_id')
+        return rfm_data
+
+
+class Selection:
+    # Hasil satu kombinasi filter; tiap hasil dihitung sekali lalu disimpan di objek ini
+
+    def __init__(self, analytics, filters):
+        self.analytics = analytics
+        self.filters = filters
+        self.cube_view = analytics.cube.select(**filters._asdict())
+        self._results = {}
+
+    def _cached(self, key, compute):
+        if key not in self._results:
+            self._results[key] = compute()
+        return self._results[key]
+
+    @property
+    def rows(self):
+        # df_filtered: RowSelection (in-memory) atau seleksi lazy (SqlView / StreamingSelection)
+        def compute():
+            backend, filters = self.analytics.backend, self.filters._asdict()
+            if isinstance(backend, FilterIndex):
+                return backend.select_rows(self.analytics.df, **filters)
+            return self.cube_view if backend is self.analytics.cube else backend.select(**filters)
+        return self._cached('rows', compute)
+
+    def kpis(self):
+        return self._cached('kpis', lambda: kpis(self.cube_view, self.rows))
+
+    def revenue_by_category(self):
+        return self._cached('revenue_by_category', lambda: revenue_by_category(self.cube_view, self.rows))
+
+    def payments(self):
+        return self._cached('payments', lambda: PaymentAnalytics(self.cube_view))
+
+    def rfm(self, rules=None):
+        # customer_id berupa kode integer (decode lewat Analytics.decode_customers)
+        rules = rules or rfm.load_segment_rules()
+
+        def compute():
+            source = self.analytics.customer_features() if self.analytics.df is not None else self.rows
+            return rfm_scores(source, self.filters, rules)
+        return self._cached(('rfm', repr(rules)), compute)
+
+    def report(self, rules=None):
+        rfm_data = self.rfm(rules)
+        return Report(self.filters, self.kpis(), self.revenue_by_category(), self.payments().stats(),
+                      rfm_data, segment_stats(rfm_data))
@@ -0,0 +1,95 @@
+"""Batch report: semua hasil pertanyaan bisnis untuk daftar preset filter, disimpan ke disk.
+
+Dataset, index filter, cube harian, dan feature store RFM dibangun sekali untuk semua preset;
+preset dengan filter yang sama memakai hasil yang sama. Cocok untuk job malam yang menyiapkan
+laporan sebelum user membuka dashboard.
+
+Pemakaian:
+    python batch_report.py report_presets.toml --output reports/
+    DASHBOARD_ENGINE=duckdb python batch_report.py report_presets.toml --output reports/ --preset semua-delivered
+"""
+import argparse
+import json
+import os
+import time
+import tomllib
+
+import rfm
+from analytics import Analytics, Filters
+
+DEFAULT_PRESETS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'report_presets.toml')
+
+
+def load_presets(path=DEFAULT_PRESETS_PATH):
+    # [[presets]] name, years, start_date, end_date, statuses (semua opsional kecuali name)
+    with open(path, 'rb') as f:
+        presets = tomllib.load(f).get('presets', [])
+
+    result = {}
+    for preset in presets:
+        name = preset.get('name')
+        if not name:
+            raise ValueError(f"Preset tanpa 'name': {preset!r}")
+        if name in result:
+            raise ValueError(f"Nama preset ganda: {name!r}")
+        if ('start_date' in preset) != ('end_date' in preset):
+            raise ValueError(f"Preset {name!r}: start_date dan end_date harus diisi bersamaan")
+        years, statuses = preset.get('years'), preset.get('statuses')
+        result[name] = Filters(
+            None if years is None else tuple(years),
+            preset.get('start_date'),
+            preset.get('end_date'),
+            None if statuses is None else tuple(statuses)
+        )
+    return result
+
+
+def write_report(report, folder, analytics):
+    # Satu folder per preset: KPI (JSON) + tabel per pertanyaan bisnis (CSV)
+    os.makedirs(folder, exist_ok=True)
+    with open(os.path.join(folder, 'kpis.json'), 'w') as f:
+        json.dump(report.kpis._asdict(), f, indent=2)
+    report.revenue_by_category.to_csv(os.path.join(folder, 'revenue_by_category.csv'), index=False)
+    report.payment_stats.to_csv(os.path.join(folder, 'payment_stats.csv'))
+    report.segment_stats.to_csv(os.path.join(folder, 'rfm_segments.csv'))
+    analytics.decode_customers(report.rfm).to_csv(os.path.join(folder, 'rfm_customers.csv'), index=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('presets', nargs='?', default=DEFAULT_PRESETS_PATH, help='file TOML berisi [[presets]]')
+    parser.add_argument('--output', default='reports', help='folder hasil (satu subfolder per preset)')
+    parser.add_argument('--preset', nargs='+', help='hanya jalankan preset dengan nama ini')
+    parser.add_argument('--rules', help='file aturan segmen RFM (default rfm_segments.toml)')
+    args = parser.parse_args()
+
+    presets = load_presets(args.presets)
+    if args.preset:
+        missing = set(args.preset) - set(presets)
+        if missing:
+            parser.error(f"preset tidak ditemukan: {', '.join(sorted(missing))}")
+        presets = {name: presets[name] for name in args.preset}
+    rules = rfm.load_segment_rules(args.rules)
+
+    start = time.perf_counter()
+    analytics = Analytics()
+    print(f"Dataset {analytics.version} dimuat dalam {time.perf_counter() - start:.2f}s")
+
+    index = []
+    for name, filters in presets.items():
+        t = time.perf_counter()
+        report = analytics.report(filters, rules)
+        write_report(report, os.path.join(args.output, name), analytics)
+        seconds = time.perf_counter() - t
+        index.append({'name': name, 'filters': report.filters._asdict(),
+                      'kpis': report.kpis._asdict(), 'seconds': seconds})
+        print(f"{name:>30}: {report.kpis.total_orders:,} order, R$ {report.kpis.total_revenue:,.2f} ({seconds:.2f}s)")
+
+    with open(os.path.join(args.output, 'index.json'), 'w') as f:
+        json.dump({'dataset_version': analytics.version, 'generated_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                   'presets': index}, f, indent=2, default=str)
+    print(f"{len(index)} preset ditulis ke {args.output} ({time.perf_counter() - start:.2f}s)")
+
+
+if __name__ == '__main__':
+    main()
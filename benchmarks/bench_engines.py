@@ -0,0 +1,151 @@
+"""Benchmark + cek paritas engine agregasi: pandas (DailyCube + FilterIndex) vs DuckDB (query SQL).
+
+Pemakaian:
+    python benchmarks/bench_engines.py
+    python benchmarks/bench_engines.py --rows 2000000 --output hasil_engine.json
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+import rfm  # noqa: E402
+from bench_ingest import write_orders_csv  # noqa: E402
+from daily_cube import QUANTILE_ALPHA, DailyCube  # noqa: E402
+from data_loader import DASHBOARD_COLUMNS, compact_frame, decode_ids  # noqa: E402
+from data_sources import DataConfig, get_data_source  # noqa: E402
+from filter_index import FilterIndex  # noqa: E402
+from payment_analytics import PaymentAnalytics  # noqa: E402
+from sql_engine import DuckDbAnalytics  # noqa: E402
+
+# Kombinasi filter sidebar yang dibandingkan
+SCENARIOS = {
+    'semua tahun, delivered': dict(years=[2016, 2017, 2018], statuses=['delivered']),
+    '2017, semua status': dict(years=[2017], statuses=['delivered', 'shipped', 'canceled', 'invoiced',
+                                                        'processing', 'unavailable']),
+    'satu bulan, delivered+shipped': dict(years=[2018], start_date=pd.Timestamp('2018-03-01').date(),
+                                          end_date=pd.Timestamp('2018-03-31').date(),
+                                          statuses=['delivered', 'shipped'])
+}
+
+
+def pandas_answers(df, id_lookup, filter_index, cube, filters):
+    # Angka dashboard dengan engine pandas (jalur yang sama dengan dasboard.py)
+    view = cube.select(**filters)
+    rows = filter_index.filter(df, **filters)
+    rfm_data = rfm.calculate_rfm(rows)
+    rfm_data['customer_id'] = decode_ids(rfm_data['customer_id'].to_numpy(), id_lookup, 'customer_unique_id')
+
+    # Order yang tersebar di beberapa hari / status tidak additive di cube -> nunique di raw rows
+    if view.can_count_orders:
+        total_orders, revenue_by_category = view.total_orders(), view.revenue_by_category()
+    else:
+        total_orders = rows['order_id'].nunique()
+        q1_rows = rows.dropna(subset=['product_id', 'price', 'product_category_name_english'])
+        revenue_by_category = q1_rows.groupby('product_category_name_english', observed=True).agg({
+            'price': ['sum', 'mean'], 'order_id': 'nunique', 'product_id': 'count', 'review_score_avg': 'mean'
+        }).reset_index()
+        revenue_by_category.columns = ['category', 'total_revenue', 'avg_order_value', 'total_orders',
+                                       'total_items', 'avg_review']
+    return {
+        'kpi': [total_orders, view.total_revenue(), view.avg_order_value(), rows['customer_unique_id'].nunique()],
+        'q1': revenue_by_category,
+        'q2': PaymentAnalytics(view).stats(),
+        'q3': rfm_data
+    }
+
+
+def sql_answers(engine, filters):
+    view = engine.select(**filters)
+    return {
+        'kpi': [view.total_orders(), view.total_revenue(), view.avg_order_value(),
+                view.nunique('customer_unique_id')],
+        'q1': view.revenue_by_category(),
+        'q2': PaymentAnalytics(view).stats(),
+        'q3': view.calculate_rfm()
+    }
+
+
+def same_table(expected, actual, rtol=1e-9, column_rtol=None):
+    # Kolom numerik boleh beda pembulatan floating point (kolom float32 hasil compact_frame: presisi
+    # float32; column_rtol: toleransi per kolom), kolom lain harus sama persis
+    expected, actual = expected.reset_index(drop=True), actual.reset_index(drop=True)
+    if list(expected.columns) != list(actual.columns) or len(expected) != len(actual):
+        return False
+    for col in expected.columns:
+        a, b = expected[col], actual[col]
+        if pd.api.types.is_numeric_dtype(a) and pd.api.types.is_numeric_dtype(b):
+            tolerance = 1e-6 if 'float32' in (a.dtype, b.dtype) else rtol
+            tolerance = max(tolerance, (column_rtol or {}).get(col, 0))
+            if not np.allclose(a.to_numpy(np.float64), b.to_numpy(np.float64), rtol=tolerance, equal_nan=True):
+                return False
+        elif not (a.astype(str).to_numpy() == b.astype(str).to_numpy()).all():
+            return False
+    return True
+
+
+def parity(expected, actual):
+    return {
+        'kpi': bool(np.allclose(expected['kpi'], actual['kpi'], rtol=1e-9, equal_nan=True)),
+        'q1': same_table(expected['q1'], actual['q1']),
+        # Median cube dari histogram bucket logaritmik, DuckDB exact
+        'q2': same_table(expected['q2'].reset_index(), actual['q2'].reset_index(),
+                         column_rtol={'median_transaction': QUANTILE_ALPHA}),
+        'q3': same_table(expected['q3'], actual['q3'])
+    }
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=500_000)
+    parser.add_argument('--output', help='simpan hasil sebagai JSON')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'orders.csv')
+        translation_path = os.path.join(tmp, 'translation.csv')
+        write_orders_csv(path, args.rows).to_csv(translation_path, index=False)
+        config = DataConfig(path=path, translation_path=translation_path)
+
+        def build_pandas():
+            df, id_lookup = compact_frame(get_data_source(config).load(columns=DASHBOARD_COLUMNS))
+            return df, id_lookup, FilterIndex(df), DailyCube(df)
+
+        (df, id_lookup, filter_index, cube), t_build_pandas = timed(build_pandas)
+        engine, t_build_sql = timed(DuckDbAnalytics, config)
+        print(f"{args.rows:,} baris, {os.cpu_count()} core; build pandas {t_build_pandas:.2f}s, "
+              f"duckdb {t_build_sql:.2f}s")
+
+        results = []
+        print(f"{'skenario':>32} {'pandas (s)':>11} {'duckdb (s)':>11} {'kpi':>6} {'q1':>6} {'q2':>6} {'q3':>6}")
+        for name, filters in SCENARIOS.items():
+            expected, t_pandas = timed(pandas_answers, df, id_lookup, filter_index, cube, filters)
+            actual, t_sql = timed(sql_answers, engine, filters)
+            checks = parity(expected, actual)
+            results.append({'scenario': name, 'pandas_seconds': t_pandas, 'duckdb_seconds': t_sql, **checks})
+            print(f"{name:>32} {t_pandas:>11.3f} {t_sql:>11.3f} "
+                  + ' '.join(f"{str(checks[key]):>6}" for key in ('kpi', 'q1', 'q2', 'q3')))
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'rows': args.rows, 'cpu_count': os.cpu_count(), 'build_pandas_seconds': t_build_pandas,
+                       'build_duckdb_seconds': t_build_sql, 'results': results}, f, indent=2)
+    if not all(r[key] for r in results for key in ('kpi', 'q1', 'q2', 'q3')):
+        sys.exit("Hasil engine pandas dan duckdb berbeda")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+"""Benchmark ingest CSV: pandas satu thread vs parser paralel per rentang byte.
+
+Pemakaian:
+    python benchmarks/bench_ingest.py
+    python benchmarks/bench_ingest.py --rows 2000000 --workers 1 2 4 8 16 32 --output hasil_ingest.json
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+from data_loader import DATETIME_COLUMNS, TIMESTAMP_FORMAT, prepare_source_frame, read_csv_parallel  # noqa: E402
+
+CATEGORIES = ['cama_mesa_banho', 'beleza_saude', 'esporte_lazer', 'informatica_acessorios', 'moveis_decoracao',
+              'utilidades_domesticas', 'relogios_presentes', 'telefonia', 'automotivo', 'brinquedos']
+STATUSES = ['delivered', 'shipped', 'canceled', 'invoiced', 'processing', 'unavailable']
+PAYMENT_TYPES = ['credit_card', 'boleto', 'voucher', 'debit_card']
+
+
+def write_orders_csv(path, n_rows, seed=0):
+    # Kolom sama dengan all_data_ans.csv; ID berupa hash hex 32 karakter, timestamp format TIMESTAMP_FORMAT
+    rng = np.random.default_rng(seed)
+    start = pd.Timestamp('2016-09-01').value
+    purchase = pd.to_datetime(rng.integers(start, start + 760 * 86_400 * 10**9, n_rows))
+    hours = lambda h: pd.to_timedelta(rng.integers(0, h, n_rows), unit='h')
+    hex_ids = lambda n, k: pd.Series(rng.integers(0, k, n)).map('{:032x}'.format)
+
+    df = pd.DataFrame({
+        'order_id': hex_ids(n_rows, n_rows),
+        'customer_unique_id': hex_ids(n_rows, max(1, int(n_rows / 1.2))),
+        'order_status': rng.choice(STATUSES, n_rows, p=[0.9, 0.04, 0.02, 0.02, 0.01, 0.01]),
+        'order_purchase_timestamp': purchase,
+        'order_approved_at': purchase + hours(48),
+        'order_delivered_carrier_date': purchase + hours(24 * 7),
+        'order_delivered_customer_date': purchase + hours(24 * 30),
+        'order_estimated_delivery_date': (purchase + hours(24 * 40)).normalize(),
+        'shipping_limit_date': purchase + hours(24 * 5),
+        'product_id': pd.Series(rng.integers(0, 30_000, n_rows)).map('p{:05d}'.format),
+        'price': np.round(rng.lognormal(4.2, 0.8, n_rows), 2),
+        'freight_value': np.round(rng.lognormal(2.8, 0.5, n_rows), 2),
+        'product_category_name': rng.choice(CATEGORIES, n_rows),
+        'payment_type': rng.choice(PAYMENT_TYPES, n_rows),
+        'max_installments': rng.integers(1, 11, n_rows),
+        'total_payment_value': np.round(rng.lognormal(4.5, 1.0, n_rows), 2),
+        'review_score_avg': rng.choice([1.0, 2.0, 3.0, 4.0, 5.0, np.nan], n_rows)
+    })
+    # Sebagian tanggal kosong seperti order yang belum dikirim
+    df.loc[rng.random(n_rows) < 0.03, 'order_delivered_customer_date'] = pd.NaT
+    df.to_csv(path, index=False, date_format=TIMESTAMP_FORMAT)
+
+    translation = pd.DataFrame({'product_category_name': CATEGORIES,
+                                'product_category_name_english': [c.upper() for c in CATEGORIES]})
+    return translation
+
+
+def read_pandas(path, df_translation):
+    # Jalur satu thread: read_csv + to_datetime(errors='coerce') berurutan per kolom
+    return prepare_source_frame(pd.read_csv(path), df_translation)
+
+
+def same_frame(expected, actual):
+    if list(expected.columns) != list(actual.columns) or len(expected) != len(actual):
+        return False
+    for col in expected.columns:
+        a, b = expected[col], actual[col]
+        if not (a.isna().to_numpy() == b.isna().to_numpy()).all():
+            return False
+        if not (a[a.notna()].to_numpy() == b[b.notna()].to_numpy()).all():
+            return False
+    return True
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8, 16, 32])
+    parser.add_argument('--repeat', type=int, default=3, help='ambil waktu terbaik dari N kali')
+    parser.add_argument('--output', help='simpan hasil sebagai JSON')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'orders.csv')
+        df_translation = write_orders_csv(path, args.rows)
+        size_mb = os.path.getsize(path) / 1024**2
+        print(f"{args.rows:,} baris, {size_mb:,.0f} MB, {os.cpu_count()} core, "
+              f"{len(DATETIME_COLUMNS)} kolom timestamp")
+
+        best = lambda func, *a: min((timed(func, *a) for _ in range(args.repeat)), key=lambda r: r[1])
+        expected, t_pandas = best(read_pandas, path, df_translation)
+        results = [{'engine': 'pandas', 'workers': 1, 'seconds': t_pandas, 'parity': True}]
+        print(f"{'engine':>10} {'workers':>8} {'time (s)':>10} {'MB/s':>8} {'speedup':>9} {'parity':>8}")
+        print(f"{'pandas':>10} {1:>8} {t_pandas:>10.3f} {size_mb / t_pandas:>8.0f} {1:>8.1f}x {'-':>8}")
+
+        for workers in args.workers:
+            actual, seconds = best(read_csv_parallel, path, df_translation, workers)
+            parity = same_frame(expected, actual)
+            results.append({'engine': 'parallel', 'workers': workers, 'seconds': seconds, 'parity': parity})
+            print(f"{'parallel':>10} {workers:>8} {seconds:>10.3f} {size_mb / seconds:>8.0f} "
+                  f"{t_pandas / seconds:>8.1f}x {str(parity):>8}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'rows': args.rows, 'size_mb': size_mb, 'cpu_count': os.cpu_count(), 'results': results},
+                      f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,192 @@
+"""Benchmark skala: waktu & puncak memori tiap tahap dashboard pada data sintetis berbentuk Olist.
+
+Tahap diukur terpisah, dengan jalur yang sama dengan dasboard.py / analytics.py (engine in-memory):
+load (parse CSV + snapshot, lalu compact_frame), load ulang dari snapshot, build index + cube, filter
+sidebar, KPI, Pertanyaan Bisnis 1 (revenue per kategori), 2 (metode bayar), calculate_rfm, dan render
+chart (top 10 kategori, frekuensi metode bayar, scatter RFM) ke PNG. Puncak memori = RSS tertinggi
+selama tahap berjalan (disampling thread terpisah).
+
+Pemakaian:
+    python benchmarks/bench_scale.py --output hasil_scale.json
+    python benchmarks/bench_scale.py --sizes 100000 1000000 --data-dir data/bench --statuses delivered shipped
+"""
+import argparse
+import gc
+import io
+import json
+import os
+import platform
+import resource
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt  # noqa: E402
+import psutil  # noqa: E402
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+import analytics  # noqa: E402
+import charts  # noqa: E402
+import rfm  # noqa: E402
+from daily_cube import DailyCube  # noqa: E402
+from data_loader import DASHBOARD_COLUMNS, compact_frame, snapshot_path_for  # noqa: E402
+from data_sources import DataConfig, get_data_source  # noqa: E402
+from filter_index import FilterIndex  # noqa: E402
+from payment_analytics import PaymentAnalytics  # noqa: E402
+from synthetic_olist import MAIN_FILENAME, TRANSLATION_FILENAME, write_dataset  # noqa: E402
+
+STAGES = ['load', 'load_snapshot', 'index', 'filter', 'kpi', 'q1', 'q2', 'rfm', 'charts']
+SAMPLE_SECONDS = 0.005
+
+
+class PeakMemory:
+    # RSS tertinggi proses selama blok `with` berjalan (MB)
+    def __init__(self):
+        self.process = psutil.Process()
+
+    def __enter__(self):
+        self.start_mb = self.peak_mb = self._rss()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak_mb = max(self.peak_mb, self._rss())
+
+    def _rss(self):
+        return self.process.memory_info().rss / 1024**2
+
+    def _sample(self):
+        while not self._stop.wait(SAMPLE_SECONDS):
+            self.peak_mb = max(self.peak_mb, self._rss())
+
+
+def measure(results, stage, func, *args):
+    gc.collect()
+    with PeakMemory() as memory:
+        start = time.perf_counter()
+        value = func(*args)
+        seconds = time.perf_counter() - start
+    results[stage] = {'seconds': seconds, 'peak_rss_mb': memory.peak_mb,
+                      'delta_rss_mb': memory.peak_mb - memory.start_mb}
+    return value
+
+
+def render_charts(revenue_by_category, payments, rfm_data, config):
+    # Versi ringkas chart dashboard (ukuran & jenis plot sama), dirender ke PNG di memori
+    figures = []
+
+    top_10 = revenue_by_category.head(10)
+    fig, ax = plt.subplots(figsize=(10, 8))
+    ax.barh(range(len(top_10)), top_10['total_revenue'], color='#2ecc71', alpha=0.8)
+    ax.set_yticks(range(len(top_10)))
+    ax.set_yticklabels(top_10['category'])
+    figures.append(fig)
+
+    payment_freq = payments.frequency()
+    fig, ax = plt.subplots(figsize=(10, 6))
+    ax.bar(range(len(payment_freq)), payment_freq['frequency'], color='#9b59b6', alpha=0.8)
+    ax.set_xticks(range(len(payment_freq)))
+    ax.set_xticklabels(payment_freq['payment_type'], rotation=45, ha='right')
+    figures.append(fig)
+
+    fig, ax = plt.subplots(figsize=(10, 6))
+    charts.rfm_scatter(ax, rfm_data['frequency'], rfm_data['monetary'], rfm_data['recency'],
+                       cmap='viridis', label='Recency (days)',
+                       max_points=config.scatter_max_points, mode=config.scatter_mode)
+    figures.append(fig)
+
+    png_bytes = 0
+    for fig in figures:
+        buffer = io.BytesIO()
+        fig.tight_layout()
+        fig.savefig(buffer, format='png')
+        png_bytes += buffer.tell()
+        plt.close(fig)
+    return png_bytes
+
+
+def run_size(n_rows, data_dir, filters, rules):
+    folder = os.path.join(data_dir, f'olist-{n_rows}')
+    if not os.path.exists(os.path.join(folder, MAIN_FILENAME)):
+        start = time.perf_counter()
+        write_dataset(folder, n_rows)
+        print(f"  data sintetis {n_rows:,} baris dibuat dalam {time.perf_counter() - start:.1f}s")
+    config = DataConfig(path=os.path.join(folder, MAIN_FILENAME),
+                        translation_path=os.path.join(folder, TRANSLATION_FILENAME))
+    # Snapshot dari run sebelumnya dihapus supaya tahap load selalu parse CSV
+    shutil.rmtree(snapshot_path_for(config.path), ignore_errors=True)
+    source = get_data_source(config)
+    load = lambda: compact_frame(source.load(columns=DASHBOARD_COLUMNS))
+    filter_args = filters._asdict()
+
+    stages = {}
+    measure(stages, 'load', load)
+    df, _ = measure(stages, 'load_snapshot', load)
+    filter_index, cube = measure(stages, 'index', lambda: (FilterIndex(df), DailyCube(df)))
+    rows = measure(stages, 'filter', lambda: filter_index.filter(df, **filter_args))
+    view = cube.select(**filter_args)
+    kpis = measure(stages, 'kpi', analytics.kpis, view, rows)
+    revenue_by_category = measure(stages, 'q1', analytics.revenue_by_category, view, rows)
+    payments = PaymentAnalytics(view)
+    measure(stages, 'q2', payments.stats)
+    rfm_data = measure(stages, 'rfm', analytics.rfm_scores, rows, filters, rules)
+    png_bytes = measure(stages, 'charts', render_charts, revenue_by_category, payments, rfm_data, config)
+
+    return {
+        'rows': n_rows,
+        'csv_mb': os.path.getsize(config.path) / 1024**2,
+        'frame_mb': df.memory_usage(deep=True).sum() / 1024**2,
+        'filtered_rows': len(rows),
+        'customers': len(rfm_data),
+        'total_orders': kpis.total_orders,
+        'png_bytes': png_bytes,
+        'stages': stages
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100_000, 1_000_000, 10_000_000])
+    parser.add_argument('--data-dir', help='folder data sintetis (dipakai ulang antar run); default folder sementara')
+    parser.add_argument('--years', type=int, nargs='+', help='filter tahun (default semua)')
+    parser.add_argument('--statuses', nargs='+', default=['delivered'], help='filter status (default delivered)')
+    parser.add_argument('--output', help='simpan hasil sebagai JSON')
+    args = parser.parse_args()
+
+    filters = analytics.Filters(years=args.years, statuses=args.statuses).normalized()
+    rules = rfm.load_segment_rules()
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = args.data_dir or tmp
+        print(f"{os.cpu_count()} core, RAM {psutil.virtual_memory().total / 1024**3:.1f} GB, filter {filters}")
+        print(f"{'rows':>12} " + ' '.join(f"{stage:>14}" for stage in STAGES) + '   (detik / puncak RSS MB)')
+        for n_rows in args.sizes:
+            result = run_size(n_rows, data_dir, filters, rules)
+            results.append(result)
+            stages = result['stages']
+            print(f"{n_rows:>12,} " + ' '.join(
+                f"{stages[stage]['seconds']:>7.3f}/{stages[stage]['peak_rss_mb']:>6,.0f}" for stage in STAGES))
+            gc.collect()
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({
+                'machine': {'cpu_count': os.cpu_count(), 'ram_gb': psutil.virtual_memory().total / 1024**3,
+                            'platform': platform.platform(), 'python': platform.python_version()},
+                'filters': filters._asdict(),
+                'max_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+                'results': results
+            }, f, indent=2, default=str)
+
+
+if __name__ == '__main__':
+    main()
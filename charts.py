@@ -0,0 +1,84 @@
+import numpy as np
+
+# ===========================
+# SCATTER BESAR (RFM)
+# ===========================
+# Di atas ambang jumlah titik, satu marker per customer membuat render matplotlib lambat dan
+# gambar berat. Mode besar:
+# - hexbin: kepadatan 2-D, warna = rata-rata variabel warna (recency / frequency) per bin
+# - sample: sampel terstratifikasi (kuantil x & y) + seluruh titik di ekor atas sumbu y (monetary)
+
+SCATTER_MODES = ('hexbin', 'sample')
+DEFAULT_MAX_POINTS = 20_000
+HEXBIN_GRIDSIZE = 60
+TAIL_QUANTILE = 0.99
+
+
+def _quantile_codes(values, n_bins):
+    # Nilai -> nomor bin kuantil 0..n_bins-1 berbasis rank (nilai kembar tidak menumpuk di satu bin)
+    ranks = np.empty(len(values), dtype=np.int64)
+    ranks[np.argsort(values, kind='stable')] = np.arange(len(values))
+    return np.minimum(ranks * n_bins // max(len(values), 1), n_bins - 1)
+
+
+def stratified_sample(x, y, n_points, tail_quantile=TAIL_QUANTILE, n_strata=10, seed=0):
+    # Posisi titik terpilih (urut). Semua titik dengan y >= kuantil tail_quantile selalu ikut;
+    # sisanya dialokasikan proporsional per strata (kuantil x * kuantil y), minimal 1 per strata.
+    x, y = np.asarray(x), np.asarray(y)
+    n = len(y)
+    if n <= n_points:
+        return np.arange(n)
+
+    tail = y >= np.quantile(y, tail_quantile)
+    keep_tail = np.flatnonzero(tail)
+    rest = np.flatnonzero(~tail)
+    budget = max(n_points - len(keep_tail), 0)
+    if not len(rest) or not budget:
+        return keep_tail
+
+    strata = _quantile_codes(x[rest], n_strata) * n_strata + _quantile_codes(y[rest], n_strata)
+    priority = np.random.default_rng(seed).random(len(rest))
+    order = np.lexsort((priority, strata))
+    sorted_strata = strata[order]
+
+    counts = np.bincount(sorted_strata, minlength=n_strata * n_strata)
+    starts = np.r_[0, np.cumsum(counts)[:-1]]
+    rank_in_stratum = np.arange(len(order)) - starts[sorted_strata]
+    quota = np.maximum(1, np.round(counts * budget / len(rest))).astype(np.int64)
+    chosen = rest[order[rank_in_stratum < quota[sorted_strata]]]
+    return np.sort(np.r_[keep_tail, chosen])
+
+
+def rfm_scatter(ax, x, y, c, cmap, label, max_points=DEFAULT_MAX_POINTS, mode='hexbin', seed=0):
+    # Scatter x vs y berwarna c + colorbar di ax. Di atas max_points pakai mode besar dan
+    # tuliskan keterangannya di pojok chart.
+    if mode not in SCATTER_MODES:
+        raise ValueError(f"Mode scatter {mode!r} tidak dikenal, pilih salah satu dari {SCATTER_MODES}")
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    c = np.asarray(c, dtype=np.float64)
+    n = len(x)
+
+    if n <= max_points:
+        scatter = ax.scatter(x, y, c=c, cmap=cmap, alpha=0.6, s=50)
+        ax.figure.colorbar(scatter, ax=ax).set_label(label, fontsize=11)
+        return
+
+    # Titik dengan NaN tidak tergambar di scatter biasa; dibuang juga di mode besar
+    valid = np.isfinite(x) & np.isfinite(y) & np.isfinite(c)
+    x, y, c = x[valid], y[valid], c[valid]
+
+    if mode == 'hexbin':
+        mappable = ax.hexbin(x, y, C=c, reduce_C_function=np.mean, gridsize=HEXBIN_GRIDSIZE,
+                             cmap=cmap, mincnt=1, linewidths=0)
+        label = f'Rata-rata {label} per bin'
+        note = f"{n:,} customer: hexbin {HEXBIN_GRIDSIZE}x{HEXBIN_GRIDSIZE}"
+    else:
+        keep = stratified_sample(x, y, max_points, seed=seed)
+        mappable = ax.scatter(x[keep], y[keep], c=c[keep], cmap=cmap, alpha=0.6, s=20)
+        note = (f"{n:,} customer: sampel terstratifikasi {len(keep):,} titik\n"
+                f"(semua titik di atas persentil {TAIL_QUANTILE:.0%} sumbu y ikut)")
+
+    ax.figure.colorbar(mappable, ax=ax).set_label(label, fontsize=11)
+    ax.text(0.99, 0.98, note, transform=ax.transAxes, ha='right', va='top', fontsize=9,
+            bbox={'facecolor': 'white', 'alpha': 0.8, 'edgecolor': 'none'})
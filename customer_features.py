@@ -0,0 +1,341 @@
+import copy
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+import rfm
+
+TIMESTAMP_COLUMN = 'order_purchase_timestamp'
+STATUS_COLUMN = 'order_status'
+CUSTOMER_COLUMN = 'customer_unique_id'
+
+DAY_BITS = 32  # key entry = run * 2**DAY_BITS + hari (hari relatif terhadap hari pertama)
+
+ARRAYS = ['run_customer', 'run_status', 'run_start', 'entry_key', 'entry_last_ns',
+          'rows_cum', 'orders_cum', 'payment_cum']
+CENTS = 10 ** rfm.MONETARY_DECIMALS
+FILE_FORMAT = 2  # naik kalau isi / satuan array berubah; file format lama dibangun ulang
+
+
+# ===========================
+# FEATURE STORE CUSTOMER (PREFIX SUM PER HARI)
+# ===========================
+# Baris order diringkas sekali menjadi entry per (customer, status, hari pembelian): jumlah baris,
+# jumlah order, total pembayaran (int64 sen, jadi selisih prefix sum exact), dan timestamp terakhir
+# hari itu. Entry diurutkan per run
+# (customer, status) lalu per hari, dan tiap run menyimpan prefix sum kumulatifnya.
+#
+# RFM untuk filter sidebar mana pun (tahun, rentang tanggal, status) = selisih dua prefix sum per
+# run dan slice hari (dua binary search), lalu dijumlahkan per customer. Biayanya sebanding
+# dengan jumlah run, bukan jumlah baris, dan tidak ada groupby ulang di raw rows.
+
+def _segment_cumsum(values, starts):
+    # Prefix sum inklusif (int64, exact) yang di-reset di awal tiap segmen
+    cum = np.cumsum(values, dtype=np.int64)
+    lengths = np.diff(np.r_[starts, len(values)])
+    return cum - np.repeat(np.r_[0, cum][starts], lengths)
+
+
+def _ranges(starts, ends):
+    # Gabungan np.arange(start, end) untuk semua pasangan, tanpa loop Python
+    lengths = ends - starts
+    offsets = np.r_[0, np.cumsum(lengths)[:-1]]
+    return np.repeat(starts - offsets, lengths) + np.arange(lengths.sum(), dtype=np.int64)
+
+
+def _valid_rows(df):
+    return df[df[CUSTOMER_COLUMN].notna().to_numpy() & df[TIMESTAMP_COLUMN].notna().to_numpy()]
+
+
+class CustomerFeatureStore:
+
+    def __init__(self, df, version=None):
+        # df: dataset kompak (compact_frame) atau mentah; version: versi dataset (kunci file)
+        self.version = version
+        df = _valid_rows(df)
+        customer, self.customer_uniques = rfm._customer_keys(df[CUSTOMER_COLUMN])
+        self.customer_dtype = str(df[CUSTOMER_COLUMN].dtype)
+
+        # Status 0 = NaN, hanya ikut kalau filter status tidak dipakai
+        status = df[STATUS_COLUMN]
+        self.statuses = list(status.cat.categories if isinstance(status.dtype, pd.CategoricalDtype)
+                             else status.astype('category').cat.categories)
+
+        customer, status, day, rows, orders, payments, self.entry_last_ns = self._entries(df, customer)
+        self.first_day = int(day.min()) if len(day) else 0
+        day = day - self.first_day
+
+        # Run per (customer, status) di atas entry, prefix sum di-reset per run
+        new_run = np.r_[True, (customer[1:] != customer[:-1])
+                        | (status[1:] != status[:-1])] if len(day) else np.empty(0, dtype=bool)
+        self.run_start = np.flatnonzero(new_run)
+        self.run_customer = customer[self.run_start]
+        self.run_status = status[self.run_start]
+        entry_run = np.cumsum(new_run) - 1
+        self.entry_key = (entry_run << DAY_BITS) + day
+
+        self.rows_cum = _segment_cumsum(rows, self.run_start)
+        self.orders_cum = _segment_cumsum(orders, self.run_start)
+        self.payment_cum = _segment_cumsum(payments, self.run_start)
+        self._run_bounds()
+
+    def _entries(self, df, customer):
+        # Baris -> entry per (customer, status, hari absolut), urut customer, status, hari.
+        # Return (customer, status, day, rows, orders, payments, last_ns) per entry
+        status = pd.Categorical(df[STATUS_COLUMN], categories=self.statuses).codes.astype(np.int64) + 1
+        ts = df[TIMESTAMP_COLUMN].to_numpy(dtype='datetime64[ns]').view(np.int64)
+        day = ts // rfm.DAY_NS
+        has_order = df['order_id'].notna().to_numpy().astype(np.int64)
+        # NaN = 0 sen, sama dengan sum pandas yang melewati NaN
+        payment = df['total_payment_value'].to_numpy(dtype=np.float64, na_value=np.nan)
+        payment = np.rint(np.nan_to_num(payment) * CENTS).astype(np.int64)
+
+        order = np.lexsort((day, status, customer))
+        customer, status, day = customer[order], status[order], day[order]
+        new_entry = np.r_[True, (customer[1:] != customer[:-1]) | (status[1:] != status[:-1])
+                          | (day[1:] != day[:-1])] if len(order) else np.empty(0, dtype=bool)
+        entry_start = np.flatnonzero(new_entry)
+        if not len(entry_start):
+            empty = np.empty(0, dtype=np.int64)
+            return empty, empty, empty, empty, empty, empty, empty
+        return (customer[entry_start], status[entry_start], day[entry_start],
+                np.diff(np.r_[entry_start, len(order)]),
+                np.add.reduceat(has_order[order], entry_start),
+                np.add.reduceat(payment[order], entry_start),
+                np.maximum.reduceat(ts[order], entry_start))
+
+    def _run_bounds(self):
+        # Posisi entry terakhir + hari pertama/terakhir per run (untuk melewati run di luar filter)
+        self.run_end = np.r_[self.run_start[1:], len(self.entry_key)][:len(self.run_start)].astype(np.int64)
+        day = self.entry_key & ((1 << DAY_BITS) - 1)
+        self.run_first_day = day[self.run_start]
+        self.run_last_day = day[self.run_end - 1]
+
+    def append(self, new_rows, df, version=None, customer_map=None):
+        # Update feature store dengan baris baru; df = dataset lengkap (sudah termasuk new_rows),
+        # version = versi dataset setelah append. customer_map: kode customer lama -> kode baru kalau
+        # kode lama bergeser (ID baru disisipkan di tengah lookup terurut; urutan tetap sama).
+        # Hanya run (customer, status) yang mendapat baris baru yang entry & prefix sum-nya dihitung
+        # ulang; entry run lain disalin apa adanya, jadi biayanya sebanding dengan jumlah entry
+        # (copy) + entry run yang tersentuh (sort), bukan groupby ulang semua baris.
+        # Return store baru; store lama tidak diubah, jadi aman dibaca sesi lain selama update.
+        new_rows = _valid_rows(new_rows)
+        status = new_rows[STATUS_COLUMN]
+        known_status = (status.isna() | status.isin(self.statuses)).all()
+        # Store kosong, ID customer mentah (bukan kode compact_frame), atau status baru (mengubah kode
+        # status) -> bangun ulang
+        if not len(self.run_start) or self.customer_uniques is not None or not known_status:
+            return CustomerFeatureStore(df, version)
+        customer, status, day, rows, orders, payments, last_ns = self._entries(
+            new_rows, rfm._customer_keys(new_rows[CUSTOMER_COLUMN])[0]
+        )
+        if len(day) and day.min() < self.first_day:
+            return CustomerFeatureStore(df, version)
+        old_customer = self.run_customer if customer_map is None else np.asarray(customer_map)[self.run_customer]
+        if not len(day):
+            store = copy.copy(self)
+            store.version, store.run_customer = version, old_customer
+            store.customer_dtype = str(df[CUSTOMER_COLUMN].dtype)
+            return store
+        day = day - self.first_day
+
+        # Key run = (customer, status) sebagai satu integer, urutannya sama dengan urutan run
+        width = len(self.statuses) + 1
+        old_keys = old_customer * width + self.run_status
+        new_keys = customer * width + status
+        # Run baru disisipkan ke daftar run lama yang sudah urut (tanpa sort ulang semua key)
+        new_unique = np.unique(new_keys)
+        pos = np.searchsorted(old_keys, new_unique)
+        missing = (pos == len(old_keys)) | (old_keys[np.minimum(pos, len(old_keys) - 1)] != new_unique)
+        run_keys = np.insert(old_keys, pos[missing], new_unique[missing])
+        # Posisi run lama di daftar run baru = posisi lama + jumlah run baru yang disisipkan sebelumnya
+        old_run = np.arange(len(old_keys)) + np.cumsum(np.bincount(pos[missing], minlength=len(old_keys) + 1))[:-1]
+        new_run = np.searchsorted(run_keys, new_keys)
+        touched = np.zeros(len(run_keys), dtype=bool)
+        touched[new_run] = True
+        old_touched = np.flatnonzero(touched[old_run])
+        old_kept = np.flatnonzero(~touched[old_run])
+
+        # Entry lama run yang tersentuh: nilai per entry = selisih prefix sum berurutan
+        lengths = self.run_end[old_touched] - self.run_start[old_touched]
+        idx = _ranges(self.run_start[old_touched], self.run_end[old_touched])
+        is_start = np.zeros(len(idx), dtype=bool)
+        is_start[np.cumsum(lengths) - lengths] = True
+
+        # Gabung entry lama + baru per (run, hari), lalu prefix sum per run tersentuh
+        entry_run = np.r_[np.repeat(old_run[old_touched], lengths), new_run]
+        entry_day = np.r_[self.entry_key[idx] & ((1 << DAY_BITS) - 1), day]
+        order = np.lexsort((entry_day, entry_run))
+        entry_run, entry_day = entry_run[order], entry_day[order]
+        start = np.flatnonzero(np.r_[True, (entry_run[1:] != entry_run[:-1]) | (entry_day[1:] != entry_day[:-1])])
+
+        def combine(ufunc, old, new):
+            return ufunc.reduceat(np.r_[old, new][order], start)
+
+        merged = {'entry_last_ns': combine(np.maximum, self.entry_last_ns[idx], last_ns)}
+        entry_run, entry_day = entry_run[start], entry_day[start]
+        touched_start = np.flatnonzero(np.r_[True, entry_run[1:] != entry_run[:-1]])
+        for name, new in (('rows_cum', rows), ('orders_cum', orders), ('payment_cum', payments)):
+            cum = getattr(self, name)
+            old = cum[idx] - np.where(is_start, 0, cum[idx - 1])
+            merged[name] = _segment_cumsum(combine(np.add, old, new), touched_start)
+
+        # Susun ulang: run yang tidak tersentuh disalin, run tersentuh diisi entry hasil gabungan
+        counts = np.zeros(len(run_keys), dtype=np.int64)
+        counts[old_run[old_kept]] = self.run_end[old_kept] - self.run_start[old_kept]
+        counts[entry_run[touched_start]] = np.diff(np.r_[touched_start, len(entry_run)])
+        run_start = np.r_[0, np.cumsum(counts)[:-1]].astype(np.int64)
+        kept_dst = _ranges(run_start[old_run[old_kept]], run_start[old_run[old_kept]] + counts[old_run[old_kept]])
+        kept_src = _ranges(self.run_start[old_kept], self.run_end[old_kept])
+        touched_dst = _ranges(run_start[entry_run[touched_start]],
+                              run_start[entry_run[touched_start]] + counts[entry_run[touched_start]])
+
+        store = copy.copy(self)
+        store.version = version
+        store.customer_dtype = str(df[CUSTOMER_COLUMN].dtype)
+        n_entries = int(counts.sum())
+        for name in ('rows_cum', 'orders_cum', 'payment_cum', 'entry_last_ns'):
+            out = np.empty(n_entries, dtype=np.int64)
+            out[kept_dst] = getattr(self, name)[kept_src]
+            out[touched_dst] = merged[name]
+            setattr(store, name, out)
+        out_day = np.empty(n_entries, dtype=np.int64)
+        out_day[kept_dst] = self.entry_key[kept_src] & ((1 << DAY_BITS) - 1)
+        out_day[touched_dst] = entry_day
+        store.entry_key = (np.repeat(np.arange(len(run_keys), dtype=np.int64), counts) << DAY_BITS) + out_day
+        store.run_start = run_start
+        store.run_customer, store.run_status = run_keys // width, run_keys % width
+        store._run_bounds()
+        return store
+
+    # ----- Persistensi -----
+    def save(self, path):
+        # Satu file .npz berisi array biasa saja (tanpa pickle); metadata (versi, status, dtype
+        # customer) disimpan sebagai JSON, lookup ID customer sebagai array string unicode
+        meta = {'format': FILE_FORMAT, 'version': self.version, 'statuses': self.statuses, 'first_day': self.first_day,
+                'customer_dtype': self.customer_dtype}
+        arrays = {name: getattr(self, name) for name in ARRAYS}
+        if self.customer_uniques is not None:
+            arrays['customer_uniques'] = np.asarray(self.customer_uniques, dtype=str)
+        tmp_path = path + '.tmp.npz'
+        np.savez(tmp_path, meta=np.array(json.dumps(meta)), **arrays)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path, version=None):
+        # None kalau file tidak ada, dibangun dari versi dataset lain, atau berisi array object
+        # (pickle tidak pernah di-load: folder feature_store_dir bisa diisi pihak lain)
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                meta = json.loads(str(data['meta']))
+                if meta.get('format') != FILE_FORMAT or (version is not None and meta['version'] != version):
+                    return None
+                store = object.__new__(cls)
+                for name in ARRAYS:
+                    setattr(store, name, data[name])
+                uniques = data['customer_uniques'] if 'customer_uniques' in data.files else None
+        except (OSError, KeyError, ValueError):
+            return None
+        store.version, store.statuses = meta['version'], meta['statuses']
+        store.first_day, store.customer_dtype = meta['first_day'], meta['customer_dtype']
+        store.customer_uniques = None if uniques is None else pd.Index(uniques.astype(object))
+        store._run_bounds()
+        return store
+
+    @classmethod
+    def open(cls, df, version, directory=None):
+        # Pakai file di `directory` kalau versinya cocok, kalau tidak bangun dari df lalu simpan.
+        # File versi lain dihapus setelah file baru tersimpan (isi file sudah disalin ke RAM saat load,
+        # jadi tidak ada proses yang masih membaca file lama)
+        if not directory:
+            return cls(df, version)
+        path = os.path.join(directory, f'customer_features-{version}.npz')
+        store = cls.load(path, version)
+        if store is None:
+            store = cls(df, version)
+            os.makedirs(directory, exist_ok=True)
+            store.save(path)
+            for name in os.listdir(directory):
+                if (name.startswith('customer_features-') and name.endswith('.npz') and '.tmp' not in name
+                        and name != os.path.basename(path)):
+                    try:
+                        os.remove(os.path.join(directory, name))
+                    except OSError:
+                        pass
+        return store
+
+    # ----- Query -----
+    def _day_slices(self, years=None, start_date=None, end_date=None):
+        # Slice hari [lo, hi) relatif terhadap hari pertama, sama dengan FilterIndex._slices
+        def day_of(value):
+            return pd.Timestamp(value).value // rfm.DAY_NS - self.first_day
+
+        if years is None:
+            slices = [(0, 1 << DAY_BITS)]
+        else:
+            slices = [(day_of(f'{y}-01-01'), day_of(f'{int(y) + 1}-01-01')) for y in sorted(set(years))]
+        if start_date is not None and end_date is not None:
+            lo, hi = day_of(start_date), day_of(end_date) + 1
+            slices = [(max(a, lo), min(b, hi)) for a, b in slices]
+        return [(max(a, 0), min(b, 1 << DAY_BITS)) for a, b in slices if min(b, 1 << DAY_BITS) > max(a, 0)]
+
+    def rfm_aggregates(self, years=None, start_date=None, end_date=None, statuses=None):
+        # Sama dengan rfm.aggregate_customers(FilterIndex.filter(df, ...)): customer_id,
+        # last_purchase_ns, frequency, monetary (urut customer_id). Monetary = selisih prefix sum sen
+        # (exact) / CENTS; setelah pembulatan di score_rfm sama persis dengan sum per baris.
+        n_runs = len(self.run_start)
+        if statuses is None:
+            selected = np.ones(n_runs, dtype=bool)
+        else:
+            wanted = set(statuses)
+            selected = np.array([False] + [s in wanted for s in self.statuses])[self.run_status]
+
+        rows = np.zeros(n_runs, dtype=np.int64)
+        orders = np.zeros(n_runs, dtype=np.int64)
+        payment = np.zeros(n_runs, dtype=np.int64)
+        last = np.full(n_runs, rfm.NAT_NS, dtype=np.int64)
+        for lo, hi in self._day_slices(years, start_date, end_date):
+            # Run di luar slice dilewati; run yang seluruhnya di dalam slice tidak perlu binary search
+            runs = np.flatnonzero(selected & (self.run_last_day >= lo) & (self.run_first_day < hi))
+            i, j = self.run_start[runs], self.run_end[runs]
+            partial = np.flatnonzero((self.run_first_day[runs] < lo) | (self.run_last_day[runs] >= hi))
+            base = runs[partial] << DAY_BITS
+            i[partial] = np.searchsorted(self.entry_key, base + lo)
+            j[partial] = np.searchsorted(self.entry_key, base + hi)
+
+            inside = j > i
+            runs, i, j = runs[inside], i[inside], j[inside]
+            has_before = i > self.run_start[runs]
+            before = i - 1
+            rows[runs] += self.rows_cum[j - 1] - np.where(has_before, self.rows_cum[before], 0)
+            orders[runs] += self.orders_cum[j - 1] - np.where(has_before, self.orders_cum[before], 0)
+            payment[runs] += self.payment_cum[j - 1] - np.where(has_before, self.payment_cum[before], 0)
+            last[runs] = np.maximum(last[runs], self.entry_last_ns[j - 1])
+
+        # Gabung run (status) & slice per customer; run sudah urut per customer
+        keep = np.flatnonzero(rows > 0)
+        customer = self.run_customer[keep]
+        customer_start = np.flatnonzero(np.r_[True, customer[1:] != customer[:-1]]) if len(keep) else keep
+        customer_keys = customer[customer_start]
+
+        def reduce(ufunc, values):
+            return ufunc.reduceat(values[keep], customer_start) if len(keep) else values[:0]
+
+        if self.customer_uniques is None:
+            customer_id = pd.array(customer_keys, dtype=self.customer_dtype)
+        else:
+            customer_id = self.customer_uniques.take(customer_keys)
+        return pd.DataFrame({
+            'customer_id': customer_id,
+            'last_purchase_ns': reduce(np.maximum, last),
+            'frequency': reduce(np.add, orders),
+            'monetary': reduce(np.add, payment) / CENTS
+        })
+
+    def rfm_table(self, years=None, start_date=None, end_date=None, statuses=None):
+        return rfm._with_recency(self.rfm_aggregates(years, start_date, end_date, statuses))
+
+    def calculate_rfm(self, years=None, start_date=None, end_date=None, statuses=None, rules=None):
+        return rfm.score_rfm(self.rfm_table(years, start_date, end_date, statuses), rules)
@@ -0,0 +1,384 @@
+import copy
+
+import numpy as np
+import pandas as pd
+
+from sketches import DEFAULT_PRECISION, DailyDistinctSketch, grouped_quantiles, log_bucket, relative_error
+
+TIMESTAMP_COLUMN = 'order_purchase_timestamp'
+CATEGORY_COLUMN = 'product_category_name_english'
+
+# Grain cube: satu cell per (hari pembelian, status, kategori, metode bayar, baris valid untuk Q1)
+DIMENSIONS = ['day', 'order_status', CATEGORY_COLUMN, 'payment_type', 'q1_row']
+
+# Kolom ID yang punya sketch HyperLogLog per (hari, status) untuk mode distinct approx
+SKETCH_COLUMNS = ['order_id', 'customer_unique_id']
+
+# Grain histogram nilai pembayaran (median / kuantil Q2)
+PAYMENT_VALUE_KEYS = ['day', 'order_status', 'payment_type', 'value']
+
+# Nilai pembayaran dibulatkan ke bucket logaritmik dengan error relatif <= 0.1% (R$ 100 -> +-R$ 0.10),
+# jadi histogram punya paling banyak ~ln(max / min) / 0.002 entry per (hari, status, metode bayar),
+# berapa pun jumlah nilai berbeda. None = simpan nilai apa adanya (kuantil exact, histogram tumbuh
+# dengan jumlah nilai berbeda)
+QUANTILE_ALPHA = 0.001
+
+
+def _cube_keys(df):
+    return pd.DataFrame({
+        'day': df[TIMESTAMP_COLUMN].dt.floor('D'),
+        'order_status': df['order_status'],
+        CATEGORY_COLUMN: df[CATEGORY_COLUMN],
+        'payment_type': df['payment_type'],
+        # df_filtered_q1 = dropna(product_id, price, kategori); kategori sudah jadi dimensi sendiri
+        'q1_row': df['product_id'].notna() & df['price'].notna()
+    })
+
+
+def _cube_cells(keys, df):
+    payment = df['total_payment_value'].astype('float64')
+    installments = df['max_installments'].astype('float64')
+    review = df['review_score_avg'].astype('float64')
+    price = df['price'].astype('float64')
+    measures = pd.DataFrame({
+        'rows': np.ones(len(df), dtype='int64'),
+        'order_id_count': df['order_id'].notna().astype('int64'),
+        'price_sum': price.fillna(0),
+        'price_count': price.notna().astype('int64'),
+        'product_count': df['product_id'].notna().astype('int64'),
+        'review_sum': review.fillna(0),
+        'review_count': review.notna().astype('int64'),
+        'payment_sum': payment.fillna(0),
+        'payment_count': payment.notna().astype('int64'),
+        'installments_sum': installments.fillna(0),
+        'installments_count': installments.notna().astype('int64')
+    }, index=df.index)
+
+    grouped = pd.concat([keys, measures, payment.rename('payment')], axis=1).groupby(
+        DIMENSIONS, observed=True, dropna=False
+    )
+    cells = grouped[list(measures.columns)].sum()
+    # M2 = jumlah kuadrat deviasi nilai pembayaran dari rata-rata cell (var populasi groupby pandas
+    # memakai algoritma Welford), bukan sum of squares: sum(x^2) - n * mean^2 kehilangan presisi
+    # kalau deviasi jauh lebih kecil dari nilainya
+    cells['payment_m2'] = grouped['payment'].var(ddof=0).fillna(0) * cells['payment_count']
+    return cells.reset_index()
+
+
+def _sum_cells(cells, keys, measures):
+    # Jumlahkan cell per key. Semua measure additive kecuali payment_m2, yang digabung dengan rumus
+    # paralel Chan dkk. (bentuk k cell): M2 = sum(M2_i + n_i * (mean_i - mean)^2), mean_i = rata-rata
+    # cell, mean = rata-rata gabungan. Deviasi rata-rata dihitung langsung, tanpa selisih sum of squares
+    grouped = cells.groupby(keys, observed=True, dropna=False)
+    n = cells['payment_count']
+    mean = grouped['payment_sum'].transform('sum') / grouped['payment_count'].transform('sum')
+    spread = (n * (cells['payment_sum'] / n - mean) ** 2).where(n > 0, 0)
+    return (cells.assign(payment_m2=cells['payment_m2'] + spread)
+            .groupby(keys, observed=True, dropna=False)[measures].sum())
+
+
+def _payment_values(keys, df, quantile_alpha):
+    # Histogram nilai pembayaran per (hari, status, metode bayar) untuk median / kuantil Q2
+    payment = df['total_payment_value'].astype('float64')
+    paid = (payment.notna() & df['payment_type'].notna()).to_numpy()
+    value = payment[paid] if quantile_alpha is None else log_bucket(payment[paid], quantile_alpha)
+    return (
+        pd.DataFrame({
+            'day': keys['day'][paid],
+            'order_status': keys['order_status'][paid],
+            'payment_type': keys['payment_type'][paid],
+            'value': value
+        })
+        .groupby(PAYMENT_VALUE_KEYS, observed=True, dropna=False)
+        .size().rename('rows').reset_index()
+    )
+
+
+def _distinct_orders(keys, df):
+    # Order unik per (hari, status) untuk KPI, dan per (hari, status, kategori) untuk Q1
+    orders = pd.concat([keys, df['order_id']], axis=1)
+    by_day_status = orders.groupby(['day', 'order_status'], observed=True)['order_id'].nunique().reset_index()
+    q1_orders = orders[keys['q1_row'] & keys[CATEGORY_COLUMN].notna()]
+    by_day_status_category = (
+        q1_orders.groupby(['day', 'order_status', CATEGORY_COLUMN], observed=True)['order_id']
+        .nunique().reset_index()
+    )
+    return by_day_status, by_day_status_category
+
+
+def _orders_additive(keys, df):
+    orders = pd.concat([keys[['day', 'order_status']], df['order_id']], axis=1)
+    per_order = orders.groupby('order_id')[['day', 'order_status']].nunique(dropna=False)
+    return bool(len(per_order) == 0 or (per_order.max() <= 1).all())
+
+
+def _merge_tables(frames, keys, value_columns, dtypes):
+    # Jumlahkan tabel agregat (lama + baru, atau per chunk) per key. Kolom kategori disamakan dulu
+    # ke dtype dataset lengkap supaya concat tidak jatuh ke object. Cell cube (ada payment_m2)
+    # digabung lewat _sum_cells.
+    frames = [frame.astype({col: dtype for col, dtype in dtypes.items() if col in frame.columns})
+              for frame in frames]
+    combined = pd.concat(frames, ignore_index=True)
+    if 'payment_m2' in value_columns:
+        return _sum_cells(combined, keys, value_columns).reset_index()
+    return combined.groupby(keys, observed=True, dropna=False)[value_columns].sum().reset_index()
+
+
+class DailyCube:
+    # Pre-agregasi harian yang dibangun sekali saat load data.
+    # Semua measure bersifat additive (sum, count), jadi hasil untuk kombinasi filter sidebar apa
+    # pun = jumlah cell yang lolos filter. Varians nilai pembayaran disimpan sebagai M2 per cell dan
+    # digabung dengan rumus paralel Chan (_sum_cells).
+    #
+    # Distinct order: satu order_id hanya punya satu tanggal pembelian & satu status, sehingga
+    # jumlah order unik per (hari, status) bisa dijumlahkan lintas cell tanpa double count.
+    # Properti ini dicek saat build; kalau tidak terpenuhi, orders_additive = False dan
+    # dashboard kembali ke nunique() di raw rows.
+
+    def __init__(self, df, sketch_columns=SKETCH_COLUMNS, precision=DEFAULT_PRECISION,
+                 quantile_alpha=QUANTILE_ALPHA):
+        df = df[df[TIMESTAMP_COLUMN].notna().to_numpy()]
+        keys = _cube_keys(df)
+
+        self.sketch_columns = list(sketch_columns)
+        self.precision = precision
+        self.quantile_alpha = quantile_alpha
+
+        self.cells = _cube_cells(keys, df)
+        self.payment_values = _payment_values(keys, df, quantile_alpha)
+        self.orders_by_day_status, self.orders_by_day_status_category = _distinct_orders(keys, df)
+        self.orders_additive = _orders_additive(keys, df)
+
+        # Sketch HLL per (hari, status); hari di-index dari hari pertama dataset
+        status = keys['order_status'].astype('category')
+        self.statuses = list(status.cat.categories)
+        self.first_day = keys['day'].min() if len(keys) else pd.Timestamp(0)
+        self.sketches = self._build_sketches(keys, df)
+
+    @classmethod
+    def from_chunks(cls, chunks, statuses, first_day, n_orders, sketch_columns=SKETCH_COLUMNS,
+                    precision=DEFAULT_PRECISION, quantile_alpha=QUANTILE_ALPHA):
+        # Mode streaming: cube dibangun chunk per chunk (lihat streaming.py) tanpa memuat seluruh
+        # dataset. Syarat hasil sama dengan DailyCube(concat(chunks)): kode ID & dtype kategori tiap
+        # chunk global (bukan per chunk), statuses / first_day dari seluruh dataset, dan
+        # n_orders = jumlah kode order_id. Yang disimpan antar chunk hanya agregat per chunk.
+        cube = object.__new__(cls)
+        cube.sketch_columns = list(sketch_columns)
+        cube.precision = precision
+        cube.quantile_alpha = quantile_alpha
+        cube.statuses = list(statuses)
+        cube.first_day = first_day
+        cube.orders_additive = True
+        cube.sketches = {}
+
+        cells, payment_values, orders, category_orders = [], [], [], []
+        seen_orders = np.zeros(n_orders, dtype=bool)
+        dtypes = None
+        for df in chunks:
+            df = df[df[TIMESTAMP_COLUMN].notna().to_numpy()]
+            if not len(df):
+                continue
+            keys = _cube_keys(df)
+            dtypes = {col: df[col].dtype for col in ('order_status', CATEGORY_COLUMN, 'payment_type')}
+            cells.append(_cube_cells(keys, df))
+            payment_values.append(_payment_values(keys, df, quantile_alpha))
+            by_day_status, by_day_status_category = _distinct_orders(keys, df)
+            orders.append(by_day_status)
+            category_orders.append(by_day_status_category)
+
+            # Order unik per cell boleh dijumlahkan antar chunk hanya kalau tidak ada order yang
+            # muncul di lebih dari satu chunk
+            if cube.orders_additive:
+                codes = np.unique(df['order_id'].dropna().to_numpy(dtype=np.int64))
+                cube.orders_additive = _orders_additive(keys, df) and not seen_orders[codes].any()
+                seen_orders[codes] = True
+
+            for col, sketch in cube._build_sketches(keys, df).items():
+                cube.sketches[col] = cube.sketches[col].union(sketch) if col in cube.sketches else sketch
+
+        if dtypes is None:
+            raise ValueError("Dataset tidak berisi baris dengan order_purchase_timestamp")
+        measures = [c for c in cells[0].columns if c not in DIMENSIONS]
+        cube.cells = _merge_tables(cells, DIMENSIONS, measures, dtypes)
+        cube.payment_values = _merge_tables(payment_values, PAYMENT_VALUE_KEYS, ['rows'], dtypes)
+        cube.orders_by_day_status = _merge_tables(orders, ['day', 'order_status'], ['order_id'], dtypes)
+        cube.orders_by_day_status_category = _merge_tables(
+            category_orders, ['day', 'order_status', CATEGORY_COLUMN], ['order_id'], dtypes
+        )
+        return cube
+
+    def _build_sketches(self, keys, df, columns=None):
+        day_index = ((keys['day'] - self.first_day) // pd.Timedelta(days=1)).to_numpy()
+        status_codes = pd.Categorical(keys['order_status'], categories=self.statuses).codes
+        has_status = status_codes >= 0
+        sketches = {}
+        for col in self.sketch_columns if columns is None else columns:
+            keep = has_status & df[col].notna().to_numpy()
+            sketches[col] = DailyDistinctSketch(
+                day_index[keep], status_codes[keep], len(self.statuses),
+                df[col][keep].to_numpy(), p=self.precision
+            )
+        return sketches
+
+    def append(self, new_rows, df, remapped=()):
+        # Update cube dengan baris baru; df = dataset lengkap (sudah termasuk new_rows).
+        # - cell & histogram nilai: agregat baris baru dijumlahkan ke cell lama
+        # - order unik: dihitung ulang hanya untuk hari yang tersentuh baris baru
+        # - HLL: register baris baru di-union (max) ke sketch lama. Sketch meng-hash kode ID, jadi
+        #   kolom di `remapped` (kode lama berubah karena ID baru disisipkan) dibangun ulang penuh.
+        # Return cube baru; cube lama tidak diubah, jadi aman dibaca sesi lain selama update.
+        new_rows = new_rows[new_rows[TIMESTAMP_COLUMN].notna().to_numpy()]
+        if not len(new_rows):
+            return self
+        keys = _cube_keys(new_rows)
+
+        # Status baru / tanggal sebelum hari pertama mengubah layout sketch -> bangun ulang
+        known_status = keys['order_status'].isna() | keys['order_status'].isin(self.statuses)
+        if not known_status.all() or keys['day'].min() < self.first_day:
+            return DailyCube(df, self.sketch_columns, self.precision, self.quantile_alpha)
+
+        cube = copy.copy(self)
+        dtypes = {col: df[col].dtype for col in ('order_status', CATEGORY_COLUMN, 'payment_type')}
+        measures = [c for c in self.cells.columns if c not in DIMENSIONS]
+        cube.cells = _merge_tables([self.cells, _cube_cells(keys, new_rows)], DIMENSIONS, measures, dtypes)
+        cube.payment_values = _merge_tables(
+            [self.payment_values, _payment_values(keys, new_rows, self.quantile_alpha)],
+            PAYMENT_VALUE_KEYS, ['rows'], dtypes
+        )
+
+        # Order bisa punya baris lama & baru di hari yang sama: nunique ulang untuk hari itu saja
+        touched = keys['day'].unique()
+        df = df[df[TIMESTAMP_COLUMN].notna().to_numpy()]
+        day = df[TIMESTAMP_COLUMN].dt.floor('D')
+        in_touched = day.isin(touched).to_numpy()
+        by_day_status, by_day_status_category = _distinct_orders(_cube_keys(df[in_touched]), df[in_touched])
+        cube.orders_by_day_status = pd.concat([
+            self.orders_by_day_status[~self.orders_by_day_status['day'].isin(touched)].astype(
+                {'order_status': dtypes['order_status']}),
+            by_day_status
+        ], ignore_index=True).sort_values(['day', 'order_status'], ignore_index=True)
+        cube.orders_by_day_status_category = pd.concat([
+            self.orders_by_day_status_category[~self.orders_by_day_status_category['day'].isin(touched)].astype(
+                {'order_status': dtypes['order_status'], CATEGORY_COLUMN: dtypes[CATEGORY_COLUMN]}),
+            by_day_status_category
+        ], ignore_index=True).sort_values(['day', 'order_status', CATEGORY_COLUMN], ignore_index=True)
+
+        if self.orders_additive:
+            new_orders = df['order_id'].isin(new_rows['order_id'].dropna().unique()).to_numpy()
+            cube.orders_additive = _orders_additive(_cube_keys(df[new_orders]), df[new_orders])
+
+        new_sketches = cube._build_sketches(keys, new_rows)
+        cube.sketches = {col: self.sketches[col].union(sketch) for col, sketch in new_sketches.items()}
+        rebuild = [col for col in self.sketch_columns if col in remapped]
+        if rebuild:
+            cube.sketches.update(cube._build_sketches(_cube_keys(df), df, rebuild))
+        return cube
+
+    def select(self, years=None, start_date=None, end_date=None, statuses=None):
+        return CubeView(self, years, start_date, end_date, statuses)
+
+
+def _cell_mask(frame, years, start_date, end_date, statuses):
+    day = frame['day']
+    mask = np.ones(len(frame), dtype=bool)
+    if years is not None:
+        mask &= day.dt.year.isin(years).to_numpy()
+    if start_date is not None and end_date is not None:
+        mask &= ((day >= pd.Timestamp(start_date)) & (day <= pd.Timestamp(end_date))).to_numpy()
+    if statuses is not None:
+        mask &= frame['order_status'].isin(statuses).to_numpy()
+    return mask
+
+
+class CubeView:
+    # Hasil filter sidebar di atas cube; setiap method mengembalikan bentuk yang sama
+    # dengan agregasi raw rows di dasboard.py
+
+    def __init__(self, cube, years=None, start_date=None, end_date=None, statuses=None):
+        self.cube = cube
+        self.years, self.start_date, self.end_date, self.statuses = years, start_date, end_date, statuses
+        filters = self._filters = (years, start_date, end_date, statuses)
+        self.cells = cube.cells[_cell_mask(cube.cells, *filters)]
+        self._orders = cube.orders_by_day_status[_cell_mask(cube.orders_by_day_status, *filters)]
+        self._category_orders = cube.orders_by_day_status_category[
+            _cell_mask(cube.orders_by_day_status_category, *filters)
+        ]
+
+    # ----- Distinct approx (HyperLogLog) -----
+    def _day_slices(self):
+        cube = self.cube
+        n_days = next(iter(cube.sketches.values())).n_days if cube.sketches else 0
+
+        def day_of(value):
+            return (pd.Timestamp(value) - cube.first_day) // pd.Timedelta(days=1)
+
+        if self.years is None:
+            slices = [(0, n_days)]
+        else:
+            slices = [(day_of(f'{y}-01-01'), day_of(f'{int(y) + 1}-01-01')) for y in sorted(set(self.years))]
+        if self.start_date is not None and self.end_date is not None:
+            lo, hi = day_of(self.start_date), day_of(self.end_date) + 1
+            slices = [(max(a, lo), min(b, hi)) for a, b in slices]
+        return [(max(a, 0), min(b, n_days)) for a, b in slices if min(b, n_days) > max(a, 0)]
+
+    def approx_distinct(self, col):
+        # Return (estimasi, standard error relatif)
+        statuses = self.cube.statuses if self.statuses is None else self.statuses
+        codes = [i for i, s in enumerate(self.cube.statuses) if s in set(statuses)]
+        estimate = self.cube.sketches[col].estimate(self._day_slices(), codes)
+        return estimate, relative_error(self.cube.precision)
+
+    # ----- KPI -----
+    @property
+    def can_count_orders(self):
+        return self.cube.orders_additive
+
+    def total_orders(self):
+        return int(self._orders['order_id'].sum())
+
+    def total_revenue(self):
+        return float(self.cells['payment_sum'].sum())
+
+    def avg_order_value(self):
+        count = self.cells['payment_count'].sum()
+        return self.cells['payment_sum'].sum() / count if count else np.nan
+
+    # ----- Pertanyaan Bisnis 1 -----
+    def revenue_by_category(self):
+        # Sama dengan groupby kategori di df_filtered_q1 (sebelum sort)
+        q1 = self.cells[self.cells['q1_row'] & self.cells[CATEGORY_COLUMN].notna()]
+        grouped = q1.groupby(CATEGORY_COLUMN, observed=True)[
+            ['price_sum', 'price_count', 'product_count', 'review_sum', 'review_count']
+        ].sum()
+        orders = self._category_orders.groupby(CATEGORY_COLUMN, observed=True)['order_id'].sum()
+
+        result = pd.DataFrame({
+            'category': grouped.index,
+            'total_revenue': grouped['price_sum'].to_numpy(),
+            'avg_order_value': (grouped['price_sum'] / grouped['price_count']).to_numpy(),
+            'total_orders': orders.reindex(grouped.index, fill_value=0).to_numpy(),
+            'total_items': grouped['product_count'].to_numpy(),
+            'avg_review': (grouped['review_sum'] / grouped['review_count'].replace(0, np.nan)).to_numpy()
+        })
+        return result
+
+    # ----- Pertanyaan Bisnis 2 -----
+    def payment_measures(self):
+        # Semua measure per metode bayar dalam satu groupby di cell cube (M2 lewat rumus Chan)
+        return _sum_cells(self.cells[self.cells['payment_type'].notna().to_numpy()], 'payment_type', [
+            'rows', 'order_id_count', 'payment_sum', 'payment_m2', 'payment_count',
+            'installments_sum', 'installments_count'
+        ])
+
+    def payment_quantiles(self, qs=(0.5,)):
+        # Kuantil total_payment_value per metode bayar dari histogram nilai gabungan: error relatif
+        # <= quantile_alpha (interpolasi dua nilai bucket tetap dalam batas itu), exact kalau None
+        values = self.cube.payment_values[_cell_mask(self.cube.payment_values, *self._filters)]
+        hist = values.groupby(['payment_type', 'value'], observed=True)['rows'].sum()
+        payment_type = hist.index.get_level_values('payment_type')
+        groups = pd.factorize(payment_type)[0]
+        index = payment_type[np.r_[True, groups[1:] != groups[:-1]]] if len(hist) else payment_type
+        return pd.DataFrame({
+            q: grouped_quantiles(groups, hist.index.get_level_values('value').to_numpy(), hist.to_numpy(), q)
+            for q in qs
+        }, index=pd.Index(index, name='payment_type'))
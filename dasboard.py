@@ -4,9 +4,26 @@ import seaborn as sns
 import streamlit as st
 from datetime import datetime
 import numpy as np
+from data_loader import DASHBOARD_COLUMNS, LoadedDataset, compact_frame, memory_report
+from data_sources import dataset_version, get_data_source, load_config, month_bounds
+from filter_index import FilterIndex
+from daily_cube import QUANTILE_ALPHA, DailyCube
+from payment_analytics import PaymentAnalytics
+from figure_cache import FigureCache, filter_state_hash
+from incremental import LiveDataset
+from streaming import StreamingDataset
+from sql_engine import DuckDbAnalytics
+from customer_features import CustomerFeatureStore
+import shared_dataset
+import data_table
+import rfm
+import charts
+import analytics
+import profiler
 
 # Set style untuk visualisasi
-sns.set_style("whitegrid")
+FIGURE_STYLE = "whitegrid"
+sns.set_style(FIGURE_STYLE)
 plt.rcParams['figure.figsize'] = (10, 6)
 
 # ===========================
@@ -20,38 +37,139 @@ st.set_page_config(
 )
 # LOAD DATA
 # ===========================
-@st.cache_data
-def load_data():
-    # Load main dataset
-    df = pd.read_csv(r'C:\Users\ASUS\OneDrive\New folder\OneDrive\Pictures\Documents\2. Kursus Dicoding\ANS_Projek Fundamental Analisis Data\Dasboard\all_data_ans.csv')  # ← GANTI PATH INI
-    
-    # Load translation
-    df_translation = pd.read_csv(r'C:\Users\ASUS\OneDrive\New folder\OneDrive\Pictures\Documents\2. Kursus Dicoding\ANS_Projek Fundamental Analisis Data\Data\product_category_name_translation.csv')  # ← GANTI PATH INI
-    
-    # Merge untuk translate kategori
-    df = df.merge(
-        df_translation,
-        on='product_category_name',
-        how='left'
+# Sumber data dipilih lewat environment variable / dashboard.toml (lihat data_sources.py)
+DATA_CONFIG = load_config()
+
+# Profiler per rerun (opt-in): wall / CPU time, baris, cache hit/miss & alokasi memori per bagian,
+# satu instance per sesi. Ditampilkan di panel sidebar dan/atau ditulis sebagai log JSON Lines
+if DATA_CONFIG.profiler_log:
+    profiler.configure_log(DATA_CONFIG.profiler_log)
+if 'rerun_profiler' not in st.session_state:
+    st.session_state.rerun_profiler = profiler.RerunProfiler(
+        enabled=DATA_CONFIG.profiler or bool(DATA_CONFIG.profiler_log)
     )
-    # Convert kolom datetime
-    datetime_columns = [
-        'order_purchase_timestamp',
-        'order_approved_at', 
-        'order_delivered_carrier_date',
-        'order_delivered_customer_date',
-        'order_estimated_delivery_date',
-        'shipping_limit_date'
-    ]
-    
-    for col in datetime_columns:
-        if col in df.columns:
-            df[col] = pd.to_datetime(df[col], errors='coerce')
-    
-    return df
+run_profiler = st.session_state.rerun_profiler
+run_profiler.begin_run()
+
+@st.cache_data
+def load_data(years=None, statuses=None, months=(None, None)):
+    # CSV: baca snapshot Parquet (partisi tahun/bulan, hasil merge + datetime sudah bertipe) dengan
+    # column projection, fallback ke parsing CSV hanya kalau snapshot belum ada / file sumber berubah.
+    # Kalau pushdown aktif, filter tahun, bulan (dari rentang tanggal) & status ikut dikirim ke
+    # sumber data, jadi hanya folder bulan terpilih yang dibaca.
+    profiler.note_miss()
+    source = get_data_source(DATA_CONFIG)
+    version = dataset_version(DATA_CONFIG, source)  # diambil saat load, ikut jadi cache key turunan
+    df = source.load(columns=DASHBOARD_COLUMNS, years=years, statuses=statuses,
+                     start_date=months[0], end_date=months[1])
+
+    # Kompaksi dtype: categorical, ID -> kode integer (+ lookup table), downcast numerik
+    df, id_lookup = compact_frame(df)
+    return LoadedDataset(df, id_lookup, version)
+
+@st.cache_resource
+def load_shared_dataset():
+    # Mode shared_dir: dataset Arrow memory-mapped, satu objek per proses untuk semua sesi
+    # (cache_data di atas mengembalikan salinan hasil unpickle di setiap rerun), halaman file
+    # dibagi antar proses worker lewat page cache OS
+    profiler.note_miss()
+    return shared_dataset.open_dataset(DATA_CONFIG)
+
+def current_dataset(years=None, statuses=None, months=(None, None)):
+    return load_shared_dataset() if SHARED_MODE else load_data(years, statuses, months)
+
+@st.cache_data
+def load_filter_options():
+    # Opsi sidebar (tahun, status, batas tanggal) tanpa memuat seluruh dataset
+    profiler.note_miss()
+    return get_data_source(DATA_CONFIG).filter_options()
+
+@st.cache_resource
+def load_filter_index(years=None, statuses=None, months=(None, None)):
+    # Index filter (urut timestamp + bitmap status) dibangun sekali per dataset yang dimuat
+    profiler.note_miss()
+    return FilterIndex(current_dataset(years, statuses, months).df)
 
-# Load data
-df = load_data()
+@st.cache_resource
+def load_daily_cube(years=None, statuses=None, months=(None, None)):
+    # Pre-agregasi (hari, status, kategori, metode bayar) untuk KPI, Q1, dan Q2
+    profiler.note_miss()
+    return DailyCube(current_dataset(years, statuses, months).df)
+
+@st.cache_resource(max_entries=2)
+def load_customer_features(dataset_version_id, _df):
+    # Feature store RFM (prefix sum per customer per hari) dibangun sekali per versi dataset;
+    # kalau feature_store_dir diisi, disimpan ke disk dan dipakai ulang setelah restart
+    profiler.note_miss()
+    return CustomerFeatureStore.open(_df, dataset_version_id, DATA_CONFIG.feature_store_dir)
+
+@st.cache_resource
+def load_figure_cache():
+    # Cache gambar chart (PNG/SVG) dipakai bersama semua sesi, LRU dengan batas memori
+    return FigureCache(max_bytes=DATA_CONFIG.figure_cache_mb * 1024 ** 2, fmt=DATA_CONFIG.figure_format)
+
+@st.cache_resource
+def load_live_dataset():
+    # Mode incremental: dataset + index + cube hidup di worker, baris baru di-append saat refresh
+    profiler.note_miss()
+    return LiveDataset(DATA_CONFIG)
+
+@st.cache_resource
+def load_streaming_dataset():
+    # Mode streaming: versi lazy load_data() — hanya kamus ID / kategori yang dipegang di RAM,
+    # baris dibaca per bulan saat dibutuhkan. cache_resource: lookup ID tidak disalin tiap rerun.
+    profiler.note_miss()
+    return StreamingDataset(DATA_CONFIG)
+
+@st.cache_resource
+def load_streaming_cube():
+    # Cube dibangun sekali dengan satu pass streaming atas seluruh dataset
+    profiler.note_miss()
+    return load_streaming_dataset().daily_cube()
+
+@st.cache_resource
+def load_sql_engine():
+    # Engine duckdb: semua agregasi dijalankan sebagai query SQL, tidak ada DataFrame di worker
+    profiler.note_miss()
+    return DuckDbAnalytics(DATA_CONFIG)
+
+# Engine SQL mengalahkan mode lain; mode streaming (dataset lebih besar dari RAM) mengalahkan
+# pushdown & incremental
+SQL_MODE = DATA_CONFIG.engine == 'duckdb'
+STREAMING_MODE = DATA_CONFIG.streaming and not SQL_MODE
+PUSHDOWN_MODE = DATA_CONFIG.pushdown and not STREAMING_MODE and not SQL_MODE
+LIVE_MODE = DATA_CONFIG.incremental and not DATA_CONFIG.pushdown and not STREAMING_MODE and not SQL_MODE
+# Dataset bersama antar sesi & proses (memory map): hanya mode biasa, dataset lengkap yang tidak berubah
+SHARED_MODE = bool(DATA_CONFIG.shared_dir) and not PUSHDOWN_MODE and not LIVE_MODE and not STREAMING_MODE and not SQL_MODE
+# Baris tidak dipegang di RAM: df_filtered adalah seleksi lazy (StreamingSelection / SqlView)
+LAZY_ROWS = STREAMING_MODE or SQL_MODE
+# RFM dari feature store customer: hanya kalau df berisi seluruh dataset (bukan hasil pushdown)
+FEATURE_STORE_MODE = not LAZY_ROWS and not PUSHDOWN_MODE
+
+# Load data (mode pushdown: data baru dimuat setelah filter sidebar dipilih)
+with run_profiler.section('load_data', cached=True):
+    if SQL_MODE:
+        sql_engine = load_sql_engine()
+        df, id_lookup, dataset_version_id = None, {}, sql_engine.version
+        filter_options = sql_engine.filter_options
+    elif STREAMING_MODE:
+        streaming_dataset = load_streaming_dataset()
+        df, id_lookup, dataset_version_id = None, streaming_dataset.id_lookup, streaming_dataset.version
+        filter_options = streaming_dataset.filter_options
+    elif PUSHDOWN_MODE:
+        filter_options = load_filter_options()
+    elif LIVE_MODE:
+        live_dataset = load_live_dataset()
+        live_state = live_dataset.state
+        df, id_lookup, dataset_version_id = live_state.df, live_state.id_lookup, live_state.version
+        filter_index = live_state.filter_index
+        filter_options = filter_index.options()
+    else:
+        df, id_lookup, dataset_version_id = current_dataset()
+        filter_index = load_filter_index()
+        filter_options = filter_index.options()
+    if not PUSHDOWN_MODE and df is not None:
+        profiler.set_rows(len(df))
 
 # ===========================
 # SIDEBAR - FILTER
@@ -61,19 +179,17 @@ st.sidebar.markdown("---")
 
 # Filter berdasarkan tahun
 st.sidebar.subheader("Periode Analisis")
-years = sorted(df['order_purchase_timestamp'].dt.year.dropna().unique())
+years = filter_options['years']
 selected_years = st.sidebar.multiselect(
     "Pilih Tahun:",
     options=years,
     default=years
 )
 
-# Filter data berdasarkan tahun
-df_filtered = df[df['order_purchase_timestamp'].dt.year.isin(selected_years)]
-
 # Filter berdasarkan tanggal pembelian
-min_date = df_filtered['order_purchase_timestamp'].min().date()
-max_date = df_filtered['order_purchase_timestamp'].max().date()
+year_bounds = filter_options['year_bounds'].loc[selected_years]
+min_date = year_bounds['min'].min().date()
+max_date = year_bounds['max'].max().date()
 
 date_range = st.sidebar.date_input(
     "Rentang Tanggal Detail:",
@@ -82,25 +198,151 @@ date_range = st.sidebar.date_input(
     max_value=max_date
 )
 
-if len(date_range) == 2:
-    start_date, end_date = date_range
-    df_filtered = df_filtered[
-        (df_filtered['order_purchase_timestamp'].dt.date >= start_date) & 
-        (df_filtered['order_purchase_timestamp'].dt.date <= end_date)
-    ]
-
 # Filter berdasarkan status order
 st.sidebar.markdown("---")
 order_statuses = st.sidebar.multiselect(
     "Status Order:",
-    options=sorted(df['order_status'].dropna().unique()),
+    options=filter_options['statuses'],
     default=['delivered']  # Default hanya yang delivered untuk analisis revenue
 )
-df_filtered = df_filtered[df_filtered['order_status'].isin(order_statuses)]
+
+start_date, end_date = date_range if len(date_range) == 2 else (None, None)
+
+if LIVE_MODE:
+    # Cek data baru berkala; kalau ada baris baru, seluruh halaman dijalankan ulang dengan state baru
+    @st.fragment(run_every=DATA_CONFIG.refresh_seconds or None)
+    def live_refresh():
+        st.button("🔄 Refresh data", width="stretch")
+        live_dataset.refresh()
+        if live_dataset.state.version != dataset_version_id:
+            st.rerun()
+        st.caption(f"Data dimuat: {datetime.fromtimestamp(live_state.loaded_at):%Y-%m-%d %H:%M:%S}, "
+                   f"{len(df):,} baris")
+
+    with st.sidebar:
+        live_refresh()
+
+with run_profiler.section('sidebar_filter', cached=True):
+    if SQL_MODE:
+        # select() engine SQL mengembalikan SqlView dengan method yang sama dengan CubeView
+        daily_cube = sql_engine
+    elif STREAMING_MODE:
+        daily_cube = load_streaming_cube()
+    elif PUSHDOWN_MODE:
+        # Tahun, bulan & status sudah difilter di sumber data, hanya baris yang dibutuhkan yang dimuat.
+        # Rentang tanggal dibulatkan ke bulan penuh (= unit partisi); filter harian tetap di FilterIndex.
+        load_key = (tuple(selected_years), tuple(order_statuses),
+                    month_bounds(start_date, end_date) if start_date is not None else (None, None))
+        df, id_lookup, dataset_version_id = load_data(*load_key)
+        filter_index = load_filter_index(*load_key)
+        daily_cube = load_daily_cube(*load_key)
+    elif LIVE_MODE:
+        daily_cube = live_state.daily_cube
+    else:
+        daily_cube = load_daily_cube()
+
+    # Filter yang sama di atas cube: KPI, Q1, Q2 cukup menjumlahkan cell cube
+    cube_view = daily_cube.select(
+        years=selected_years,
+        start_date=start_date,
+        end_date=end_date,
+        statuses=order_statuses
+    )
+
+    if SQL_MODE:
+        # SqlView juga menjawab operasi df_filtered (nunique, periode, RFM) dengan query
+        df_filtered = cube_view
+    elif STREAMING_MODE:
+        # Tidak ada df di RAM: df_filtered = seleksi lazy, tiap pemakaian satu pass per bulan (lihat streaming.py)
+        df_filtered = streaming_dataset.select(
+            years=selected_years,
+            start_date=start_date,
+            end_date=end_date,
+            statuses=order_statuses
+        )
+    else:
+        # Tahun -> slice, rentang tanggal -> binary search, status -> bitmap (lihat filter_index.py).
+        # RowSelection: hanya posisi baris, kolom diambil saat dibutuhkan (df bisa read-only / shared)
+        df_filtered = filter_index.select_rows(
+            df,
+            years=selected_years,
+            start_date=start_date,
+            end_date=end_date,
+            statuses=order_statuses
+        )
+    if not LAZY_ROWS:
+        profiler.set_rows(len(df_filtered))
+
+# Mode distinct count: approx (HyperLogLog per hari dari cube) atau exact untuk audit
+exact_distinct = st.sidebar.toggle(
+    "🎯 Distinct count exact (audit)",
+    value=False,
+    help="Off: jumlah pembeli unik diestimasi dengan HyperLogLog. On: nunique() exact di raw rows."
+)
+
+def count_distinct(col):
+    # Return (nilai, standard error relatif) — error None berarti angka exact
+    if col == 'order_id' and cube_view.can_count_orders:
+        # Order unik additive di cube: exact dan tetap murah
+        return cube_view.total_orders(), None
+    if exact_distinct:
+        return (df_filtered.nunique(col) if LAZY_ROWS else df_filtered[col].nunique()), None
+    return cube_view.approx_distinct(col)
+
+def format_distinct(value, error):
+    if error is None:
+        return f"{value:,}"
+    return f"≈{value:,.0f} (±{error:.1%})"
+
+def distinct_help(error):
+    if error is None:
+        return None
+    return f"Estimasi HyperLogLog, standard error ±{error:.1%}. Aktifkan 'Distinct count exact' untuk angka audit."
+
+# Chart: gambar yang sudah pernah dirender untuk state filter + tema yang sama diambil dari cache,
+# matplotlib hanya dipanggil saat cache miss
+figure_cache = load_figure_cache()
+figure_state = filter_state_hash(
+    dataset_version_id, sorted(selected_years), start_date, end_date, sorted(order_statuses)
+)
+figure_theme = (FIGURE_STYLE, st.context.theme.type)
+
+def show_figure(chart_id, state, draw):
+    with run_profiler.section(f'chart:{chart_id}', cached=DATA_CONFIG.figure_cache_mb > 0):
+        if DATA_CONFIG.figure_cache_mb <= 0:
+            fig = draw()
+            st.pyplot(fig)
+            plt.close(fig)
+            return
+        def draw_on_miss():
+            # draw() hanya dipanggil saat gambar belum ada di cache
+            profiler.note_miss()
+            return draw()
+
+        image = figure_cache.render(chart_id, state, figure_theme, draw_on_miss)
+        st.image(image.decode('utf-8') if figure_cache.fmt == 'svg' else image, width='stretch')
 
 st.sidebar.markdown("---")
-st.sidebar.info(f"📊 Total Orders: {df_filtered['order_id'].nunique():,}")
-st.sidebar.info(f"📅 Periode: {df_filtered['order_purchase_timestamp'].min().strftime('%Y-%m-%d')} s/d {df_filtered['order_purchase_timestamp'].max().strftime('%Y-%m-%d')}")
+with run_profiler.section('sidebar_summary'):
+    total_orders, total_orders_error = count_distinct('order_id')
+    st.sidebar.info(f"📊 Total Orders: {format_distinct(total_orders, total_orders_error)}")
+    if LAZY_ROWS:
+        period_start, period_end = df_filtered.period()
+    else:
+        period_start, period_end = df_filtered['order_purchase_timestamp'].min(), df_filtered['order_purchase_timestamp'].max()
+    st.sidebar.info(f"📅 Periode: {period_start.strftime('%Y-%m-%d')} s/d {period_end.strftime('%Y-%m-%d')}")
+
+# Pemakaian RAM dataset yang dipegang worker ini
+with st.sidebar.expander("🧠 Memory Dataset"):
+    # Mode streaming: hanya lookup ID yang tinggal di RAM; engine SQL: tidak ada data di worker
+    mem_report = memory_report(pd.DataFrame() if df is None else df, id_lookup)
+    st.metric("Total", f"{mem_report['memory_mb'].sum():,.1f} MB")
+    st.dataframe(mem_report[['column', 'dtype', 'memory_mb', 'share_pct']].round(2), width="stretch")
+    cache_stats = figure_cache.stats()
+    st.caption(
+        f"Cache chart: {cache_stats['entries']} gambar, {cache_stats['memory_mb']:.1f} / {cache_stats['max_mb']:.0f} MB "
+        f"(hit {cache_stats['hits']}, miss {cache_stats['misses']})"
+    )
 
 # ===========================
 # HEADER
@@ -115,272 +357,337 @@ st.markdown("---")
 # ===========================
 st.subheader("📈 Performance Summary")
 
-col1, col2, col3, col4 = st.columns(4)
+with run_profiler.section('kpi'):
+    col1, col2, col3, col4 = st.columns(4)
 
-with col1:
-    total_orders = df_filtered['order_id'].nunique()
-    st.metric(
-        label="Total Pesanan",
-        value=f"{total_orders:,}"
-    )
+    with col1:
+        st.metric(
+            label="Total Pesanan",
+            value=format_distinct(total_orders, total_orders_error),
+            help=distinct_help(total_orders_error)
+        )
 
-with col2:
-    total_revenue = df_filtered['total_payment_value'].sum()
-    st.metric(
-        label="Total Pendapatan",
-        value=f"R$ {total_revenue:,.2f}"
-    )
+    with col2:
+        total_revenue = cube_view.total_revenue()
+        st.metric(
+            label="Total Pendapatan",
+            value=f"R$ {total_revenue:,.2f}"
+        )
 
-with col3:
-    avg_order_value = df_filtered['total_payment_value'].mean()
-    st.metric(
-        label="Rata-rata Nilai Pesanan",
-        value=f"R$ {avg_order_value:,.2f}"
-    )
+    with col3:
+        avg_order_value = cube_view.avg_order_value()
+        st.metric(
+            label="Rata-rata Nilai Pesanan",
+            value=f"R$ {avg_order_value:,.2f}"
+        )
 
-with col4:
-    unique_customers = df_filtered['customer_unique_id'].nunique()
-    st.metric(
-        label="Jumlah Pembeli Unik",
-        value=f"{unique_customers:,}"
-    )
+    with col4:
+        # Customer bisa belanja di banyak hari -> tidak additive di cube: HLL atau nunique exact
+        unique_customers, unique_customers_error = count_distinct('customer_unique_id')
+        st.metric(
+            label="Jumlah Pembeli Unik",
+            value=format_distinct(unique_customers, unique_customers_error),
+            help=distinct_help(unique_customers_error)
+        )
 
 st.markdown("---")
 
 # ===========================
-# PERTANYAAN BISNIS 1 - REVISI TOTAL
+# TAMPILAN PER BAGIAN
 # ===========================
-st.subheader("❓ Pertanyaan Bisnis 1: Kategori Produk dengan Kontribusi Pendapatan Terbesar")
-st.markdown("**Kategori produk apa yang memberikan kontribusi pendapatan terbesar pada E-Commerce selama periode 2016–2018?**")
+# st.tabs / st.expander tetap mengeksekusi isi yang tersembunyi. Karena itu setiap pertanyaan bisnis
+# berjalan sebagai fragment dengan pemilih tampilan: hanya tampilan yang dipilih yang dihitung,
+# dan mengganti tampilan hanya menjalankan ulang fragment itu, bukan seluruh script.
+VIEW_CHARTS = "📊 Visualisasi"
+VIEW_DATA = "📋 Data"
+VIEW_INSIGHT = "💡 Insight & Kesimpulan"
+VIEW_RFM_SEGMENTS = "📊 Visualisasi Segmentasi"
+VIEW_RFM_METRICS = "📈 Analisis RFM"
+VIEW_HIDDEN = "🙈 Sembunyikan"
+
+SECTION_VIEWS = [VIEW_CHARTS, VIEW_DATA, VIEW_INSIGHT]
+RFM_VIEWS = [VIEW_RFM_SEGMENTS, VIEW_RFM_METRICS, VIEW_DATA, VIEW_INSIGHT]
+
+def section_view(key, views):
+    # Return tampilan yang dipilih, None = bagian disembunyikan (tidak ada yang dihitung)
+    view = st.radio("Tampilan", views + [VIEW_HIDDEN], key=key, horizontal=True, label_visibility="collapsed")
+    return None if view == VIEW_HIDDEN else view
+
+# Tabel data berhalaman: search & sort di server (lihat data_table.py), browser hanya menerima satu
+# halaman. Hasil search + sort dipakai ulang saat pindah halaman; state = versi dataset + filter
+@st.cache_resource(max_entries=16)
+def search_and_sort(table_key, state, search_col, search_text, sort_col, ascending, _table):
+    profiler.note_miss()
+    return _table.search(search_col, search_text).sort(sort_col, ascending)
 
-df_filtered_q1 = df_filtered.dropna(subset=['product_id', 'price', 'product_category_name_english'])
+def paged_dataframe(key, table, state, column_config=None):
+    col_search, col_text, col_sort, col_order = st.columns([2, 3, 2, 1])
+    searchable = table.searchable_columns()
+    search_col = col_search.selectbox("Cari di kolom", searchable, key=f'{key}_search_col') if searchable else None
+    search_text = col_text.text_input("Cari", key=f'{key}_search', disabled=not searchable,
+                                      placeholder="Awalan ID / bagian nama")
+    # None = urutan asli tabel
+    sort_col = col_sort.selectbox("Urutkan", table.columns, index=None, key=f'{key}_sort', placeholder="Urutan asli")
+    ascending = col_order.toggle("Naik", value=False, key=f'{key}_ascending')
 
-# LOGIKA Perhitungan yang Dipakai:
-# - Total_Revenue = sum(price) 
-# - Total_Orders = nunique(order_id) 
-# - Avg_Order_Value = mean(price)
-# - Revenue_Contribution = (Total_Revenue / total_all_revenue) * 100
+    with run_profiler.section(f'table:{key}', cached=True):
+        view = search_and_sort(key, state, search_col, search_text.strip(), sort_col, ascending, table)
+        profiler.set_rows(len(view))
 
-revenue_by_category = df_filtered_q1.groupby('product_category_name_english').agg({
-    'price': ['sum', 'mean'],  # sum = Total Revenue, mean = Avg Order Value
-    'order_id': 'nunique',     # nunique = Total Orders (unique)
-    'product_id': 'count',     # count = Total Items
-    'review_score_avg': 'mean' # Review score
-}).reset_index()
+    col_size, col_page, col_info = st.columns([1, 1, 3])
+    size = col_size.selectbox("Baris per halaman", data_table.PAGE_SIZES, key=f'{key}_size')
+    pages = max(1, -(-len(view) // size))
+    if st.session_state.get(f'{key}_page', 1) > pages:
+        # Hasil search / filter lebih sedikit dari halaman yang sedang dibuka
+        st.session_state[f'{key}_page'] = pages
+    number = col_page.number_input("Halaman", min_value=1, max_value=pages, step=1, key=f'{key}_page')
+
+    page = view.page(number, size)
+    st.dataframe(page.frame, column_config=column_config, hide_index=True, width="stretch")
+    if page.total_rows:
+        last_row = page.first_row + len(page.frame) - 1
+        col_info.caption(f"Baris {page.first_row:,}–{last_row:,} dari {page.total_rows:,} (halaman {page.number:,} / {page.pages:,})")
+    else:
+        col_info.caption("Tidak ada baris yang cocok")
+
+# Format angka saat tampil (nilai di tabel tetap numerik, jadi sort tetap berdasarkan angka)
+REVENUE_FORMAT = "R$ %.2f"
+PERCENT_FORMAT = "%.2f%%"
+SCORE_FORMAT = "%.2f"
+
+# ===========================
+# PERTANYAAN BISNIS 1 - REVISI TOTAL
+# ===========================
+st.subheader("❓ Pertanyaan Bisnis 1: Kategori Produk dengan Kontribusi Pendapatan Terbesar")
+st.markdown("**Kategori produk apa yang memberikan kontribusi pendapatan terbesar pada E-Commerce selama periode 2016–2018?**")
 
-revenue_by_category.columns = ['category', 'total_revenue', 'avg_order_value', 'total_orders', 'total_items', 'avg_review']
-revenue_by_category = revenue_by_category.sort_values('total_revenue', ascending=False)
+@st.fragment
+@run_profiler.profiled('q1')
+def business_question_1():
+    view = section_view('q1_view', SECTION_VIEWS)
+    if view is None:
+        return
 
-# Hitung persentase kontribusi
-total_all_revenue = revenue_by_category['total_revenue'].sum()
-revenue_by_category['revenue_contribution_pct'] = (revenue_by_category['total_revenue'] / total_all_revenue) * 100
+    # LOGIKA Perhitungan yang Dipakai (baris dengan product_id, price, kategori tidak kosong):
+    # - Total_Revenue = sum(price) 
+    # - Total_Orders = nunique(order_id) 
+    # - Avg_Order_Value = mean(price)
+    # - Revenue_Contribution = (Total_Revenue / total_all_revenue) * 100
 
-tab1, tab2 = st.tabs(["📊 Visualisasi", "📋 Data"])
+    revenue_by_category = analytics.revenue_by_category(cube_view, df_filtered)
+    total_all_revenue = revenue_by_category['total_revenue'].sum()
 
-with tab1:
-    col1, col2 = st.columns(2)
+    if view == VIEW_CHARTS:
+        col1, col2 = st.columns(2)
     
-    with col1:
-        st.markdown("##### Top 10 Kategori Berdasarkan Total Pendapatan")
+        with col1:
+            st.markdown("##### Top 10 Kategori Berdasarkan Total Pendapatan")
         
-        top_10_categories = revenue_by_category.head(10).copy()
+            top_10_categories = revenue_by_category.head(10).copy()
         
-        fig, ax = plt.subplots(figsize=(10, 8))
-        bars = ax.barh(range(len(top_10_categories)), top_10_categories['total_revenue'], 
-                        color='#2ecc71', alpha=0.8)
-        ax.set_yticks(range(len(top_10_categories)))
-        ax.set_yticklabels(top_10_categories['category'])
-        ax.set_xlabel('Total Pendapatan (R$)', fontsize=20, fontweight='bold')
-        ax.set_ylabel('Product Category', fontsize=20, fontweight='bold')
-        ax.set_title('Top 10 Product Categories by Total Revenue', fontsize=14, fontweight='bold', pad=20)
-        ax.grid(True, alpha=0.5, axis='x')
-        
-        # Tambahkan nilai dan persentase
-        for i, (bar, row) in enumerate(zip(bars, top_10_categories.itertuples())):
-            value = row.total_revenue
-            pct = row.revenue_contribution_pct
-            ax.text(value, i, f' R$ {value/1000:.0f}K ({pct:.1f}%)', 
-                    va='center', fontsize=14, fontweight='bold')
-        
-        plt.tight_layout()
-        st.pyplot(fig)
-        plt.close()
+            def draw_q1_top10_revenue():
+                fig, ax = plt.subplots(figsize=(10, 8))
+                bars = ax.barh(range(len(top_10_categories)), top_10_categories['total_revenue'], 
+                                color='#2ecc71', alpha=0.8)
+                ax.set_yticks(range(len(top_10_categories)))
+                ax.set_yticklabels(top_10_categories['category'])
+                ax.set_xlabel('Total Pendapatan (R$)', fontsize=20, fontweight='bold')
+                ax.set_ylabel('Product Category', fontsize=20, fontweight='bold')
+                ax.set_title('Top 10 Product Categories by Total Revenue', fontsize=14, fontweight='bold', pad=20)
+                ax.grid(True, alpha=0.5, axis='x')
         
-    with col2:
-        st.markdown("##### Kontribusi Pendapatan per Kategori (%)")
-        
-        # Pie chart untuk top 5
-        top_5_revenue = revenue_by_category.head(5).copy()
-        others_revenue = revenue_by_category.iloc[5:]['total_revenue'].sum()
-        
-        pie_data = pd.concat([
-            top_5_revenue[['category', 'total_revenue']].set_index('category')['total_revenue'],
-            pd.Series({'Others': others_revenue})
-        ])
-        
-        fig, ax = plt.subplots(figsize=(10, 8))
-        colors = ['#3498db', '#2ecc71', '#f39c12', '#e74c3c', '#9b59b6', '#95a5a6']
-        wedges, texts, autotexts = ax.pie(
-            pie_data.values, 
-            labels=pie_data.index,
-            autopct='%1.1f%%',
-            colors=colors,
-            startangle=90,
-            textprops={'fontsize': 14}
-        )
-        ax.set_title('Distribusi Pendapatan: Top 5 Categories vs Others', 
-                    fontsize=14, fontweight='bold', pad=20)
+                # Tambahkan nilai dan persentase
+                for i, (bar, row) in enumerate(zip(bars, top_10_categories.itertuples())):
+                    value = row.total_revenue
+                    pct = row.revenue_contribution_pct
+                    ax.text(value, i, f' R$ {value/1000:.0f}K ({pct:.1f}%)', 
+                            va='center', fontsize=14, fontweight='bold')
         
-        for autotext in autotexts:
-            autotext.set_color('white')
-            autotext.set_fontweight('bold')
-            autotext.set_fontsize(24)
+                plt.tight_layout()
+                return fig
         
-        plt.tight_layout()
-        st.pyplot(fig)
-        plt.close()
-    
-    # Visualisasi tambahan: Perbandingan Revenue vs Orders
-    st.markdown("##### Analisis Pendapatan vs Jumlah Pesanan (Top 15)")
-    
-    top_15 = revenue_by_category.head(15).copy()
-    
-    fig, ax1 = plt.subplots(figsize=(14, 6))
-    
-    x = range(len(top_15))
-    
-    # Bar chart untuk revenue
-    ax1.bar(x, top_15['total_revenue'], color='#3498db', alpha=0.7, label='Total Pendapatan (R$)')
-    ax1.set_xlabel('Kategori Produk', fontsize=12, fontweight='bold')
-    ax1.set_ylabel('Total Pendapatan (R$)', fontsize=12, fontweight='bold', color='#3498db')
-    ax1.tick_params(axis='y', labelcolor='#3498db')
-    ax1.set_xticks(x)
-    ax1.set_xticklabels(top_15['category'], rotation=45, ha='right')
-    
-    # Line plot untuk unique orders
-    ax2 = ax1.twinx()
-    ax2.plot(x, top_15['total_orders'], color='#e74c3c', marker='o', linewidth=2.5, 
-            markersize=8, label='Unique Orders')
-    ax2.set_ylabel('Number of Unique Orders', fontsize=12, fontweight='bold', color='#e74c3c')
-    ax2.tick_params(axis='y', labelcolor='#e74c3c')
-    
-    ax1.set_title('Pendapatan vs Jumlah Pesanan per Kategori', fontsize=14, fontweight='bold', pad=20)
-    ax1.legend(loc='upper left')
-    ax2.legend(loc='upper right')
-    ax1.grid(True, alpha=0.5, axis='y')
-    
-    plt.tight_layout()
-    st.pyplot(fig)
-    plt.close()
-
-with tab2:
-    st.markdown("##### Statistik Detail per Kategori")
-    
-    # Buat tabel statistik lengkap
-    category_stats_table = revenue_by_category.copy()
-    category_stats_table = category_stats_table[[
-        'category', 'total_revenue', 'total_orders', 'total_items',
-        'avg_order_value', 'revenue_contribution_pct', 'avg_review'
-    ]]
-    
-    # Rename columns untuk clarity
-    category_stats_table.columns = [
-        'Category', 'Total Revenue (R$)', 'Total Orders (Unique)', 'Total Items',
-        'Avg Order Value (R$)', 'Revenue Contribution (%)', 'Avg Review Score'
-    ]
-    
-    # Format numbers
-    category_stats_table['Total Revenue (R$)'] = category_stats_table['Total Revenue (R$)'].apply(lambda x: f"R$ {x:,.2f}")
-    category_stats_table['Avg Order Value (R$)'] = category_stats_table['Avg Order Value (R$)'].apply(lambda x: f"R$ {x:.2f}")
-    category_stats_table['Revenue Contribution (%)'] = category_stats_table['Revenue Contribution (%)'].apply(lambda x: f"{x:.2f}%")
-    category_stats_table['Avg Review Score'] = category_stats_table['Avg Review Score'].apply(lambda x: f"{x:.2f}" if pd.notna(x) else "N/A")
-    
-    st.dataframe(category_stats_table.head(20), use_container_width=True)
-    
-    st.markdown("---")
-    st.markdown("##### 📊 Validasi Metodologi")
-    
-    col_val1, col_val2, col_val3, col_val4 = st.columns(4)
-    
-    with col_val1:
-        st.metric(
-            "✅ Total Kategori",
-            len(revenue_by_category)
-        )
-    
-    with col_val2:
-        top_3_contribution = revenue_by_category.head(3)['revenue_contribution_pct'].sum()
-        st.metric(
-            "📈 Kontribusi Top 3",
-            f"{top_3_contribution:.1f}%"
-        )
-    
-    with col_val3:
-        top_category = revenue_by_category.iloc[0]['category']
-        st.metric(
-            "🏆 Kategori Teratas",
-            top_category[:20]
-        )
-    
-    with col_val4:
-        top_cat_revenue = revenue_by_category.iloc[0]['total_revenue']
-        st.metric(
-            "💰 Revenue Teratas",
-            f"R$ {top_cat_revenue/1000:.0f}K"
-        )
-    
-    st.markdown("---")
-with st.expander("💡 Insight & Kesimpulan"):
-    # Hitung insights otomatis dengan LOGIKA BENAR
-    top_cat = revenue_by_category.iloc[0]
-    top_cat_name = top_cat['category']
-    top_cat_revenue = top_cat['total_revenue']
-    top_cat_pct = top_cat['revenue_contribution_pct']
-    top_cat_orders = top_cat['total_orders']
-    top_cat_aov = top_cat['avg_order_value']
-    
-    top_3_total = revenue_by_category.head(3)['total_revenue'].sum()
-    top_3_pct = (top_3_total / total_all_revenue) * 100
-    
-    top_5_names = revenue_by_category.head(5)['category'].tolist()
-    top_5_total = revenue_by_category.head(5)['total_revenue'].sum()
-    top_5_pct = (top_5_total / total_all_revenue) * 100
+            show_figure('q1_top10_revenue', figure_state, draw_q1_top10_revenue)
+        
+        with col2:
+            st.markdown("##### Kontribusi Pendapatan per Kategori (%)")
+        
+            # Pie chart untuk top 5
+            top_5_revenue = revenue_by_category.head(5).copy()
+            others_revenue = revenue_by_category.iloc[5:]['total_revenue'].sum()
+        
+            pie_data = pd.concat([
+                top_5_revenue[['category', 'total_revenue']].set_index('category')['total_revenue'],
+                pd.Series({'Others': others_revenue})
+            ])
+        
+            def draw_q1_top5_pie():
+                fig, ax = plt.subplots(figsize=(10, 8))
+                colors = ['#3498db', '#2ecc71', '#f39c12', '#e74c3c', '#9b59b6', '#95a5a6']
+                wedges, texts, autotexts = ax.pie(
+                    pie_data.values, 
+                    labels=pie_data.index,
+                    autopct='%1.1f%%',
+                    colors=colors,
+                    startangle=90,
+                    textprops={'fontsize': 14}
+                )
+                ax.set_title('Distribusi Pendapatan: Top 5 Categories vs Others', 
+                            fontsize=14, fontweight='bold', pad=20)
+        
+                for autotext in autotexts:
+                    autotext.set_color('white')
+                    autotext.set_fontweight('bold')
+                    autotext.set_fontsize(24)
+        
+                plt.tight_layout()
+                return fig
+        
+            show_figure('q1_top5_pie', figure_state, draw_q1_top5_pie)
     
-    st.write(f"""
-    **Temuan Utama :**
+        # Visualisasi tambahan: Perbandingan Revenue vs Orders
+        st.markdown("##### Analisis Pendapatan vs Jumlah Pesanan (Top 15)")
     
-    1. **Kategori Teratas:** 
-       - Kategori **{top_cat_name}** memberikan kontribusi revenue terbesar dengan total **R$ {top_cat_revenue:,.2f}** ({top_cat_pct:.1f}% dari total revenue)
-       - Terdapat **{top_cat_orders:,} unique orders** dengan average order value **R$ {top_cat_aov:.2f}**
+        top_15 = revenue_by_category.head(15).copy()
     
-    2. **Dominasi Top Kategori:**
-       - Top 3 kategori berkontribusi **{top_3_pct:.1f}%** dari total revenue
-       - Top 5 kategori berkontribusi **{top_5_pct:.1f}%** dari total revenue
-       - Menunjukkan **konsentrasi revenue** yang tinggi pada beberapa kategori utama
+        def draw_q1_revenue_vs_orders():
+            fig, ax1 = plt.subplots(figsize=(14, 6))
     
-    3. **Distribusi Revenue:**
-       - Total terdapat **{len(revenue_by_category)}** kategori aktif
-       - Kategori dengan AOV tinggi: {revenue_by_category.nlargest(3, 'avg_order_value')['category'].tolist()}
-       - Kategori dengan orders terbanyak: {revenue_by_category.nlargest(3, 'total_orders')['category'].tolist()}
+            x = range(len(top_15))
     
-    **Kesimpulan Bisnis:**
+            # Bar chart untuk revenue
+            ax1.bar(x, top_15['total_revenue'], color='#3498db', alpha=0.7, label='Total Pendapatan (R$)')
+            ax1.set_xlabel('Kategori Produk', fontsize=12, fontweight='bold')
+            ax1.set_ylabel('Total Pendapatan (R$)', fontsize=12, fontweight='bold', color='#3498db')
+            ax1.tick_params(axis='y', labelcolor='#3498db')
+            ax1.set_xticks(x)
+            ax1.set_xticklabels(top_15['category'], rotation=45, ha='right')
     
-    Fokus strategi marketing dan inventory management sebaiknya **diprioritaskan** pada top 5 kategori:
-    **{', '.join([cat[:25] for cat in top_5_names])}**
+            # Line plot untuk unique orders
+            ax2 = ax1.twinx()
+            ax2.plot(x, top_15['total_orders'], color='#e74c3c', marker='o', linewidth=2.5, 
+                    markersize=8, label='Unique Orders')
+            ax2.set_ylabel('Number of Unique Orders', fontsize=12, fontweight='bold', color='#e74c3c')
+            ax2.tick_params(axis='y', labelcolor='#e74c3c')
     
-    Kategori-kategori ini terbukti memiliki:
-    - ✅ Demand tinggi (total orders besar)
-    - ✅ Revenue contribution signifikan ({top_5_pct:.1f}% dari total)
-    - ✅ Impact langsung terhadap bottom line perusahaan
+            ax1.set_title('Pendapatan vs Jumlah Pesanan per Kategori', fontsize=14, fontweight='bold', pad=20)
+            ax1.legend(loc='upper left')
+            ax2.legend(loc='upper right')
+            ax1.grid(True, alpha=0.5, axis='y')
     
-    **Rekomendasi Strategis:**
+            plt.tight_layout()
+            return fig
     
-    1. **Inventory Optimization:** Pastikan stock availability untuk top 5 kategori selalu optimal
-    2. **Marketing Focus:** Alokasi budget marketing terbesar untuk kategori dengan kontribusi revenue tertinggi
-    3. **Cross-Selling:** Leverage kategori top performer untuk cross-sell produk dari kategori lain
-    4. **Pricing Strategy:** Monitor AOV dan adjust pricing untuk maximize revenue dari kategori unggulan
-    5. **Product Development:** Pertimbangkan ekspansi SKU dalam kategori high-performing
-    """)
+        show_figure('q1_revenue_vs_orders', figure_state, draw_q1_revenue_vs_orders)
+
+    elif view == VIEW_DATA:
+        st.markdown("##### Statistik Detail per Kategori")
+    
+        # Buat tabel statistik lengkap
+        category_stats_table = revenue_by_category.copy()
+        category_stats_table = category_stats_table[[
+            'category', 'total_revenue', 'total_orders', 'total_items',
+            'avg_order_value', 'revenue_contribution_pct', 'avg_review'
+        ]]
+    
+        # Rename columns untuk clarity
+        category_stats_table.columns = [
+            'Category', 'Total Revenue (R$)', 'Total Orders (Unique)', 'Total Items',
+            'Avg Order Value (R$)', 'Revenue Contribution (%)', 'Avg Review Score'
+        ]
+    
+        # Angka tetap numerik, format R$ / % saat tampil
+        paged_dataframe('q1_categories', data_table.PagedTable(category_stats_table), figure_state, {
+            'Total Revenue (R$)': st.column_config.NumberColumn(format=REVENUE_FORMAT),
+            'Avg Order Value (R$)': st.column_config.NumberColumn(format=REVENUE_FORMAT),
+            'Revenue Contribution (%)': st.column_config.NumberColumn(format=PERCENT_FORMAT),
+            'Avg Review Score': st.column_config.NumberColumn(format=SCORE_FORMAT)
+        })
+    
+        st.markdown("---")
+        st.markdown("##### 📊 Validasi Metodologi")
+    
+        col_val1, col_val2, col_val3, col_val4 = st.columns(4)
+    
+        with col_val1:
+            st.metric(
+                "✅ Total Kategori",
+                len(revenue_by_category)
+            )
+    
+        with col_val2:
+            top_3_contribution = revenue_by_category.head(3)['revenue_contribution_pct'].sum()
+            st.metric(
+                "📈 Kontribusi Top 3",
+                f"{top_3_contribution:.1f}%"
+            )
+    
+        with col_val3:
+            top_category = revenue_by_category.iloc[0]['category']
+            st.metric(
+                "🏆 Kategori Teratas",
+                top_category[:20]
+            )
+    
+        with col_val4:
+            top_cat_revenue = revenue_by_category.iloc[0]['total_revenue']
+            st.metric(
+                "💰 Revenue Teratas",
+                f"R$ {top_cat_revenue/1000:.0f}K"
+            )
+
+    else:
+        # Hitung insights otomatis dengan LOGIKA BENAR
+        top_cat = revenue_by_category.iloc[0]
+        top_cat_name = top_cat['category']
+        top_cat_revenue = top_cat['total_revenue']
+        top_cat_pct = top_cat['revenue_contribution_pct']
+        top_cat_orders = top_cat['total_orders']
+        top_cat_aov = top_cat['avg_order_value']
+    
+        top_3_total = revenue_by_category.head(3)['total_revenue'].sum()
+        top_3_pct = (top_3_total / total_all_revenue) * 100
+    
+        top_5_names = revenue_by_category.head(5)['category'].tolist()
+        top_5_total = revenue_by_category.head(5)['total_revenue'].sum()
+        top_5_pct = (top_5_total / total_all_revenue) * 100
+    
+        st.write(f"""
+        **Temuan Utama :**
+    
+        1. **Kategori Teratas:** 
+           - Kategori **{top_cat_name}** memberikan kontribusi revenue terbesar dengan total **R$ {top_cat_revenue:,.2f}** ({top_cat_pct:.1f}% dari total revenue)
+           - Terdapat **{top_cat_orders:,} unique orders** dengan average order value **R$ {top_cat_aov:.2f}**
+    
+        2. **Dominasi Top Kategori:**
+           - Top 3 kategori berkontribusi **{top_3_pct:.1f}%** dari total revenue
+           - Top 5 kategori berkontribusi **{top_5_pct:.1f}%** dari total revenue
+           - Menunjukkan **konsentrasi revenue** yang tinggi pada beberapa kategori utama
+    
+        3. **Distribusi Revenue:**
+           - Total terdapat **{len(revenue_by_category)}** kategori aktif
+           - Kategori dengan AOV tinggi: {revenue_by_category.nlargest(3, 'avg_order_value')['category'].tolist()}
+           - Kategori dengan orders terbanyak: {revenue_by_category.nlargest(3, 'total_orders')['category'].tolist()}
+    
+        **Kesimpulan Bisnis:**
+    
+        Fokus strategi marketing dan inventory management sebaiknya **diprioritaskan** pada top 5 kategori:
+        **{', '.join([cat[:25] for cat in top_5_names])}**
+    
+        Kategori-kategori ini terbukti memiliki:
+        - ✅ Demand tinggi (total orders besar)
+        - ✅ Revenue contribution signifikan ({top_5_pct:.1f}% dari total)
+        - ✅ Impact langsung terhadap bottom line perusahaan
+    
+        **Rekomendasi Strategis:**
+    
+        1. **Inventory Optimization:** Pastikan stock availability untuk top 5 kategori selalu optimal
+        2. **Marketing Focus:** Alokasi budget marketing terbesar untuk kategori dengan kontribusi revenue tertinggi
+        3. **Cross-Selling:** Leverage kategori top performer untuk cross-sell produk dari kategori lain
+        4. **Pricing Strategy:** Monitor AOV dan adjust pricing untuk maximize revenue dari kategori unggulan
+        5. **Product Development:** Pertimbangkan ekspansi SKU dalam kategori high-performing
+        """)
+
+business_question_1()
 
 st.markdown("---")
 
@@ -390,175 +697,182 @@ st.markdown("---")
 st.subheader("❓ Pertanyaan Bisnis 2: Metode Pembayaran Paling Sering Digunakan dan Nilai Transaksi Tertinggi")
 st.markdown("**Metode pembayaran apa yang paling sering digunakan pelanggan dan memiliki nilai transaksi tertinggi selama periode 2016–2018?**")
 
-tab3, tab4 = st.tabs(["📊 Visualisasi", "📋 Data"])
+@st.fragment
+@run_profiler.profiled('q2')
+def business_question_2():
+    view = section_view('q2_view', SECTION_VIEWS)
+    if view is None:
+        return
 
-with tab3:
-    col1, col2 = st.columns(2)
+    # Satu hasil agregasi per metode bayar (lihat payment_analytics.py) untuk semua tampilan
+    payments = PaymentAnalytics(cube_view)
+    payment_freq = payments.frequency()
+    payment_revenue = payments.revenue()
+    payment_analysis = payments.analysis()
+
+    if view == VIEW_CHARTS:
+        col1, col2 = st.columns(2)
     
-    with col1:
-        st.markdown("##### Frekuensi Penggunaan Metode Pembayaran")
-        
-        payment_freq = df_filtered['payment_type'].value_counts().reset_index()
-        payment_freq.columns = ['payment_type', 'frequency']
-        
-        fig, ax = plt.subplots(figsize=(10, 6))
-        bars = ax.bar(range(len(payment_freq)), payment_freq['frequency'], 
-                        color='#9b59b6', alpha=0.8)
-        ax.set_xticks(range(len(payment_freq)))
-        ax.set_xticklabels(payment_freq['payment_type'], rotation=45, ha='right')
-        ax.set_xlabel('Metode Pembayaran', fontsize=12, fontweight='bold')
-        ax.set_ylabel('Frekuensi (Jumlah Transaksi)', fontsize=12, fontweight='bold')
-        ax.set_title('Frekuensi Penggunaan Metode Pembayaran', fontsize=14, fontweight='bold', pad=20)
-        ax.grid(True, alpha=0.3, axis='y')
-        
-        # Tambahkan nilai dan persentase
-        total_transactions = payment_freq['frequency'].sum()
-        for i, (bar, row) in enumerate(zip(bars, payment_freq.itertuples())):
-            value = row.frequency
-            pct = (value / total_transactions) * 100
-            ax.text(i, value, f'{value:,}\n({pct:.1f}%)', 
-                   ha='center', va='bottom', fontsize=10, fontweight='bold')
-        
-        plt.tight_layout()
-        st.pyplot(fig)
-        plt.close()
+        with col1:
+            st.markdown("##### Frekuensi Penggunaan Metode Pembayaran")
+        
+            def draw_q2_payment_freq():
+                fig, ax = plt.subplots(figsize=(10, 6))
+                bars = ax.bar(range(len(payment_freq)), payment_freq['frequency'], 
+                                color='#9b59b6', alpha=0.8)
+                ax.set_xticks(range(len(payment_freq)))
+                ax.set_xticklabels(payment_freq['payment_type'], rotation=45, ha='right')
+                ax.set_xlabel('Metode Pembayaran', fontsize=12, fontweight='bold')
+                ax.set_ylabel('Frekuensi (Jumlah Transaksi)', fontsize=12, fontweight='bold')
+                ax.set_title('Frekuensi Penggunaan Metode Pembayaran', fontsize=14, fontweight='bold', pad=20)
+                ax.grid(True, alpha=0.3, axis='y')
+        
+                # Tambahkan nilai dan persentase
+                total_transactions = payment_freq['frequency'].sum()
+                for i, (bar, row) in enumerate(zip(bars, payment_freq.itertuples())):
+                    value = row.frequency
+                    pct = (value / total_transactions) * 100
+                    ax.text(i, value, f'{value:,}\n({pct:.1f}%)', 
+                           ha='center', va='bottom', fontsize=10, fontweight='bold')
+        
+                plt.tight_layout()
+                return fig
+        
+            show_figure('q2_payment_freq', figure_state, draw_q2_payment_freq)
     
-    with col2:
-        st.markdown("##### Total Pendapatan per Metode Pembayaran")
-        
-        payment_revenue = df_filtered.groupby('payment_type')['total_payment_value'].sum().reset_index()
-        payment_revenue.columns = ['payment_type', 'total_revenue']
-        payment_revenue = payment_revenue.sort_values('total_revenue', ascending=False)
-        
-        fig, ax = plt.subplots(figsize=(10, 6))
-        bars = ax.bar(range(len(payment_revenue)), payment_revenue['total_revenue'], 
-                        color='#e67e22', alpha=0.8)
-        ax.set_xticks(range(len(payment_revenue)))
-        ax.set_xticklabels(payment_revenue['payment_type'], rotation=45, ha='right')
-        ax.set_xlabel('Metode Pembayaran', fontsize=12, fontweight='bold')
-        ax.set_ylabel('Total Pendapatan (R$)', fontsize=12, fontweight='bold')
-        ax.set_title('Total Pendapatan per Metode Pembayaran', fontsize=14, fontweight='bold', pad=20)
-        ax.grid(True, alpha=0.3, axis='y')
-        
-        # Tambahkan nilai
-        total_all = payment_revenue['total_revenue'].sum()
-        for i, (bar, row) in enumerate(zip(bars, payment_revenue.itertuples())):
-            value = row.total_revenue
-            pct = (value / total_all) * 100
-            ax.text(i, value, f'R$ {value/1000:.0f}K\n({pct:.1f}%)', 
-                    ha='center', va='bottom', fontsize=10, fontweight='bold')
-        
-        plt.tight_layout()
-        st.pyplot(fig)
-        plt.close()
-    
-    # Visualisasi gabungan
-    st.markdown("##### Perbandingan Komprehensif: Frekuensi vs Pendapatan vs Rata-rata Nilai Transaksi")
-    
-    payment_analysis = df_filtered.groupby('payment_type').agg({
-        'order_id': 'count',
-        'total_payment_value': ['sum', 'mean']
-    }).reset_index()
-    payment_analysis.columns = ['payment_type', 'frequency', 'total_revenue', 'avg_transaction']
-    payment_analysis = payment_analysis.sort_values('total_revenue', ascending=False)
-    
-    fig, (ax1, ax2, ax3) = plt.subplots(1, 3, figsize=(18, 5))
-    
-    # Chart 1: Frequency
-    bars1 = ax1.bar(payment_analysis['payment_type'], payment_analysis['frequency'], 
-                    color='#3498db', alpha=0.8)
-    ax1.set_xlabel('Metode Pembayaran', fontsize=11, fontweight='bold')
-    ax1.set_ylabel('Frekuensi', fontsize=11, fontweight='bold')
-    ax1.set_title('Frekuensi Penggunaan', fontsize=12, fontweight='bold')
-    ax1.tick_params(axis='x', rotation=45)
-    ax1.grid(True, alpha=0.3, axis='y')
-    for bar, value in zip(bars1, payment_analysis['frequency']):
-        ax1.text(bar.get_x() + bar.get_width()/2, value, f'{value:,}', 
-                ha='center', va='bottom', fontsize=9, fontweight='bold')
-    
-    # Chart 2: Total Revenue
-    bars2 = ax2.bar(payment_analysis['payment_type'], payment_analysis['total_revenue'], 
-                color='#2ecc71', alpha=0.8)
-    ax2.set_xlabel('Metode Pembayaran', fontsize=11, fontweight='bold')
-    ax2.set_ylabel('Total Pendapatan (R$)', fontsize=11, fontweight='bold')
-    ax2.set_title('Total Pendapatan', fontsize=12, fontweight='bold')
-    ax2.tick_params(axis='x', rotation=45)
-    ax2.grid(True, alpha=0.3, axis='y')
-    for bar, value in zip(bars2, payment_analysis['total_revenue']):
-        ax2.text(bar.get_x() + bar.get_width()/2, value, f'R$ {value/1000:.0f}K', 
-                ha='center', va='bottom', fontsize=9, fontweight='bold')
-    
-    # Chart 3: Avg Transaction Value
-    bars3 = ax3.bar(payment_analysis['payment_type'], payment_analysis['avg_transaction'], 
-                    color='#e74c3c', alpha=0.8)
-    ax3.set_xlabel('Metode Pembayaran', fontsize=11, fontweight='bold')
-    ax3.set_ylabel('Rata-rata Nilai Transaksi (R$)', fontsize=11, fontweight='bold')
-    ax3.set_title('Rata-rata Nilai Transaksi', fontsize=12, fontweight='bold')
-    ax3.tick_params(axis='x', rotation=45)
-    ax3.grid(True, alpha=0.3, axis='y')
-    for bar, value in zip(bars3, payment_analysis['avg_transaction']):
-        ax3.text(bar.get_x() + bar.get_width()/2, value, f'R$ {value:.0f}', 
-                ha='center', va='bottom', fontsize=9, fontweight='bold')
-    
-    plt.tight_layout()
-    st.pyplot(fig)
-    plt.close()
-
-with tab4:
-    st.markdown("##### Statistik Detail Metode Pembayaran")
-    
-    payment_stats = df_filtered.groupby('payment_type').agg({
-        'order_id': 'count',
-        'total_payment_value': ['sum', 'mean', 'median', 'std'],
-        'max_installments': 'mean'
-    }).round(2)
-    payment_stats.columns = ['Total Transactions', 'Total Revenue (R$)', 'Avg Transaction (R$)', 
-                            'Median Transaction (R$)', 'Std Transaction (R$)', 'Avg Installments']
-    
-    # Tambahkan persentase
-    payment_stats['Transaction Share (%)'] = (payment_stats['Total Transactions'] / 
-                                              payment_stats['Total Transactions'].sum() * 100).round(2)
-    payment_stats['Revenue Share (%)'] = (payment_stats['Total Revenue (R$)'] / 
-                                          payment_stats['Total Revenue (R$)'].sum() * 100).round(2)
-    
-    payment_stats = payment_stats.sort_values('Total Revenue (R$)', ascending=False)
-    st.dataframe(payment_stats, use_container_width=True)
-    
-    # Summary
-    col_p1, col_p2, col_p3 = st.columns(3)
-    with col_p1:
-        most_used = payment_freq.iloc[0]['payment_type']
-        st.metric("Metode Paling Sering", most_used)
-    with col_p2:
-        highest_revenue = payment_revenue.iloc[0]['payment_type']
-        st.metric("Pendapatan Tertinggi", highest_revenue)
-    with col_p3:
-        highest_avg = payment_analysis.sort_values('avg_transaction', ascending=False).iloc[0]['payment_type']
-        st.metric("Rata-rata Nilai Transaksi Tertinggi", highest_avg)
-
-with st.expander("💡 Insight & Kesimpulan"):
-    most_freq_method = payment_freq.iloc[0]['payment_type']
-    most_freq_count = payment_freq.iloc[0]['frequency']
-    most_freq_pct = (most_freq_count / payment_freq['frequency'].sum()) * 100
-    
-    highest_rev_method = payment_revenue.iloc[0]['payment_type']
-    highest_rev_value = payment_revenue.iloc[0]['total_revenue']
-    highest_rev_pct = (highest_rev_value / payment_revenue['total_revenue'].sum()) * 100
-    
-    highest_avg_method = payment_analysis.sort_values('avg_transaction', ascending=False).iloc[0]['payment_type']
-    highest_avg_value = payment_analysis.sort_values('avg_transaction', ascending=False).iloc[0]['avg_transaction']
-    
-    st.write(f"""
-    **Temuan Utama:**
-    - Metode pembayaran **{most_freq_method}** adalah yang paling sering digunakan dengan **{most_freq_count:,} transaksi** ({most_freq_pct:.1f}%)
-    - Metode **{highest_rev_method}** menghasilkan revenue tertinggi sebesar **R$ {highest_rev_value:,.2f}** ({highest_rev_pct:.1f}% dari total revenue)
-    - Metode **{highest_avg_method}** memiliki nilai transaksi rata-rata tertinggi sebesar **R$ {highest_avg_value:,.2f}**
-    
-    **Kesimpulan:**
-    Metode pembayaran {most_freq_method} mendominasi baik dari segi frekuensi penggunaan maupun kontribusi revenue. 
-    Perusahaan sebaiknya memastikan infrastruktur payment gateway untuk metode ini selalu optimal dan mempertimbangkan 
-    program insentif untuk metode pembayaran lain guna mendiversifikasi opsi pembayaran pelanggan.
-    """)
+        with col2:
+            st.markdown("##### Total Pendapatan per Metode Pembayaran")
+        
+            def draw_q2_payment_revenue():
+                fig, ax = plt.subplots(figsize=(10, 6))
+                bars = ax.bar(range(len(payment_revenue)), payment_revenue['total_revenue'], 
+                                color='#e67e22', alpha=0.8)
+                ax.set_xticks(range(len(payment_revenue)))
+                ax.set_xticklabels(payment_revenue['payment_type'], rotation=45, ha='right')
+                ax.set_xlabel('Metode Pembayaran', fontsize=12, fontweight='bold')
+                ax.set_ylabel('Total Pendapatan (R$)', fontsize=12, fontweight='bold')
+                ax.set_title('Total Pendapatan per Metode Pembayaran', fontsize=14, fontweight='bold', pad=20)
+                ax.grid(True, alpha=0.3, axis='y')
+        
+                # Tambahkan nilai
+                total_all = payment_revenue['total_revenue'].sum()
+                for i, (bar, row) in enumerate(zip(bars, payment_revenue.itertuples())):
+                    value = row.total_revenue
+                    pct = (value / total_all) * 100
+                    ax.text(i, value, f'R$ {value/1000:.0f}K\n({pct:.1f}%)', 
+                            ha='center', va='bottom', fontsize=10, fontweight='bold')
+        
+                plt.tight_layout()
+                return fig
+        
+            show_figure('q2_payment_revenue', figure_state, draw_q2_payment_revenue)
+    
+        # Visualisasi gabungan
+        st.markdown("##### Perbandingan Komprehensif: Frekuensi vs Pendapatan vs Rata-rata Nilai Transaksi")
+    
+        def draw_q2_payment_comparison():
+            fig, (ax1, ax2, ax3) = plt.subplots(1, 3, figsize=(18, 5))
+    
+            # Chart 1: Frequency
+            bars1 = ax1.bar(payment_analysis['payment_type'], payment_analysis['frequency'], 
+                            color='#3498db', alpha=0.8)
+            ax1.set_xlabel('Metode Pembayaran', fontsize=11, fontweight='bold')
+            ax1.set_ylabel('Frekuensi', fontsize=11, fontweight='bold')
+            ax1.set_title('Frekuensi Penggunaan', fontsize=12, fontweight='bold')
+            ax1.tick_params(axis='x', rotation=45)
+            ax1.grid(True, alpha=0.3, axis='y')
+            for bar, value in zip(bars1, payment_analysis['frequency']):
+                ax1.text(bar.get_x() + bar.get_width()/2, value, f'{value:,}', 
+                        ha='center', va='bottom', fontsize=9, fontweight='bold')
+    
+            # Chart 2: Total Revenue
+            bars2 = ax2.bar(payment_analysis['payment_type'], payment_analysis['total_revenue'], 
+                        color='#2ecc71', alpha=0.8)
+            ax2.set_xlabel('Metode Pembayaran', fontsize=11, fontweight='bold')
+            ax2.set_ylabel('Total Pendapatan (R$)', fontsize=11, fontweight='bold')
+            ax2.set_title('Total Pendapatan', fontsize=12, fontweight='bold')
+            ax2.tick_params(axis='x', rotation=45)
+            ax2.grid(True, alpha=0.3, axis='y')
+            for bar, value in zip(bars2, payment_analysis['total_revenue']):
+                ax2.text(bar.get_x() + bar.get_width()/2, value, f'R$ {value/1000:.0f}K', 
+                        ha='center', va='bottom', fontsize=9, fontweight='bold')
+    
+            # Chart 3: Avg Transaction Value
+            bars3 = ax3.bar(payment_analysis['payment_type'], payment_analysis['avg_transaction'], 
+                            color='#e74c3c', alpha=0.8)
+            ax3.set_xlabel('Metode Pembayaran', fontsize=11, fontweight='bold')
+            ax3.set_ylabel('Rata-rata Nilai Transaksi (R$)', fontsize=11, fontweight='bold')
+            ax3.set_title('Rata-rata Nilai Transaksi', fontsize=12, fontweight='bold')
+            ax3.tick_params(axis='x', rotation=45)
+            ax3.grid(True, alpha=0.3, axis='y')
+            for bar, value in zip(bars3, payment_analysis['avg_transaction']):
+                ax3.text(bar.get_x() + bar.get_width()/2, value, f'R$ {value:.0f}', 
+                        ha='center', va='bottom', fontsize=9, fontweight='bold')
+    
+            plt.tight_layout()
+            return fig
+    
+        show_figure('q2_payment_comparison', figure_state, draw_q2_payment_comparison)
+
+    elif view == VIEW_DATA:
+        st.markdown("##### Statistik Detail Metode Pembayaran")
+    
+        # count/sum/mean/std/cicilan dari cell cube, median dari histogram nilai pembayaran
+        payment_stats = payments.stats().round(2)
+        payment_stats.columns = ['Total Transactions', 'Total Revenue (R$)', 'Avg Transaction (R$)', 
+                                'Median Transaction (R$)', 'Std Transaction (R$)', 'Avg Installments']
+    
+        # Tambahkan persentase
+        payment_stats['Transaction Share (%)'] = (payment_stats['Total Transactions'] / 
+                                                  payment_stats['Total Transactions'].sum() * 100).round(2)
+        payment_stats['Revenue Share (%)'] = (payment_stats['Total Revenue (R$)'] / 
+                                              payment_stats['Total Revenue (R$)'].sum() * 100).round(2)
+    
+        payment_stats = payment_stats.sort_values('Total Revenue (R$)', ascending=False)
+        st.dataframe(payment_stats, width="stretch", column_config={
+            col: st.column_config.NumberColumn(format=PERCENT_FORMAT if '(%)' in col else REVENUE_FORMAT)
+            for col in payment_stats.columns if '(R$)' in col or '(%)' in col
+        })
+        if not SQL_MODE:
+            st.caption(f"Median dari histogram nilai pembayaran (bucket logaritmik): error relatif "
+                       f"paling besar {QUANTILE_ALPHA:.1%} dari median exact.")
+    
+        # Summary
+        col_p1, col_p2, col_p3 = st.columns(3)
+        with col_p1:
+            most_used = payment_freq.iloc[0]['payment_type']
+            st.metric("Metode Paling Sering", most_used)
+        with col_p2:
+            highest_revenue = payment_revenue.iloc[0]['payment_type']
+            st.metric("Pendapatan Tertinggi", highest_revenue)
+        with col_p3:
+            highest_avg, _ = payments.top('avg_transaction')
+            st.metric("Rata-rata Nilai Transaksi Tertinggi", highest_avg)
+
+    else:
+        most_freq_method = payment_freq.iloc[0]['payment_type']
+        most_freq_count = payment_freq.iloc[0]['frequency']
+        most_freq_pct = payments.frequency_share[most_freq_method]
+    
+        highest_rev_method = payment_revenue.iloc[0]['payment_type']
+        highest_rev_value = payment_revenue.iloc[0]['total_revenue']
+        highest_rev_pct = payments.revenue_share[highest_rev_method]
+    
+        highest_avg_method, highest_avg_value = payments.top('avg_transaction')
+    
+        st.write(f"""
+        **Temuan Utama:**
+        - Metode pembayaran **{most_freq_method}** adalah yang paling sering digunakan dengan **{most_freq_count:,} transaksi** ({most_freq_pct:.1f}%)
+        - Metode **{highest_rev_method}** menghasilkan revenue tertinggi sebesar **R$ {highest_rev_value:,.2f}** ({highest_rev_pct:.1f}% dari total revenue)
+        - Metode **{highest_avg_method}** memiliki nilai transaksi rata-rata tertinggi sebesar **R$ {highest_avg_value:,.2f}**
+    
+        **Kesimpulan:**
+        Metode pembayaran {most_freq_method} mendominasi baik dari segi frekuensi penggunaan maupun kontribusi revenue. 
+        Perusahaan sebaiknya memastikan infrastruktur payment gateway untuk metode ini selalu optimal dan mempertimbangkan 
+        program insentif untuk metode pembayaran lain guna mendiversifikasi opsi pembayaran pelanggan.
+        """)
+
+business_question_2()
 
 st.markdown("---")
 
@@ -568,315 +882,350 @@ st.markdown("---")
 st.subheader("❓ Pertanyaan Bisnis 3: Segmentasi Pelanggan Berdasarkan RFM Analysis")
 st.markdown("**Bagaimana segmentasi pelanggan E-Commerce berdasarkan Recency, Frequency, dan Monetary (RFM) selama periode 2016–2018, serta segmen pelanggan mana yang memberikan kontribusi pendapatan terbesar?**")
 
+def customer_features():
+    # Mode incremental: feature store hidup di LiveDataset dan di-append bersama index & cube saat
+    # refresh; mode biasa: dibangun sekali per versi dataset
+    if LIVE_MODE:
+        return live_dataset.customer_features(live_state)
+    return load_customer_features(dataset_version_id, df)
+
 # Hitung RFM
-@st.cache_data
-def calculate_rfm(df_input):
-    # Tentukan tanggal analisis
-    snapshot_date = df_input['order_purchase_timestamp'].max() + pd.Timedelta(days=1)
-    
-    rfm = df_input.groupby('customer_unique_id').agg({
-        'order_purchase_timestamp': lambda x: (snapshot_date - x.max()).days,  # Recency
-        'order_id': 'count',  # Frequency
-        'total_payment_value': 'sum'  # Monetary
-    }).reset_index()
-    
-    rfm.columns = ['customer_id', 'recency', 'frequency', 'monetary']
-    
-    # Buat scoring 
-    rfm['r_score'] = pd.qcut(rfm['recency'], q=5, labels=[5, 4, 3, 2, 1], duplicates='drop')
-    rfm['f_score'] = pd.qcut(rfm['frequency'].rank(method='first'), q=5, labels=[1, 2, 3, 4, 5], duplicates='drop')
-    rfm['m_score'] = pd.qcut(rfm['monetary'], q=5, labels=[1, 2, 3, 4, 5], duplicates='drop')
-    
-    # Gabungkan score
-    rfm['rfm_score'] = rfm['r_score'].astype(str) + rfm['f_score'].astype(str) + rfm['m_score'].astype(str)
-    rfm['rfm_score_sum'] = rfm['r_score'].astype(int) + rfm['f_score'].astype(int) + rfm['m_score'].astype(int)
-    
-    # Segmentasi
-    def segment_customer(row):
-        r, f, m = int(row['r_score']), int(row['f_score']), int(row['m_score'])
-        
-        if r >= 4 and f >= 4 and m >= 4:
-            return 'Champions'
-        elif r >= 3 and f >= 3 and m >= 3:
-            return 'Loyal Customers'
-        elif r >= 4 and f <= 2:
-            return 'Promising'
-        elif r >= 3 and f <= 2 and m <= 2:
-            return 'New Customers'
-        elif r <= 2 and f >= 3 and m >= 3:
-            return 'At Risk'
-        elif r <= 2 and f <= 2 and m >= 3:
-            return 'Cant Lose Them'
-        elif r <= 2 and f >= 2 and m <= 2:
-            return 'Hibernating'
-        else:
-            return 'Lost'
-    
-    rfm['segment'] = rfm.apply(segment_customer, axis=1)
-    
-    return rfm
+# Cache key = versi dataset + parameter filter + aturan segmen. df_filtered diberi prefix "_"
+# supaya Streamlit tidak meng-hash seluruh DataFrame di setiap rerun.
+@st.cache_data(max_entries=DATA_CONFIG.rfm_cache_entries, ttl=DATA_CONFIG.rfm_cache_ttl)
+def calculate_rfm(dataset_version_id, years, start_date, end_date, statuses, segment_rules, _df_input):
+    # Scoring + segmentasi vectorized (lihat rfm.py), aturan segmen dari rfm_segments.toml.
+    # _df_input = CustomerFeatureStore (mode biasa & incremental: agregat per customer dari selisih
+    # prefix sum), StreamingSelection / SqlView (mode streaming / engine SQL), atau df_filtered
+    profiler.note_miss()
+    return analytics.rfm_scores(_df_input, analytics.Filters(years, start_date, end_date, statuses), segment_rules)
 
-rfm_data = calculate_rfm(df_filtered)
+@st.fragment
+@run_profiler.profiled('q3')
+def business_question_3():
+    view = section_view('q3_view', RFM_VIEWS)
+    if view is None:
+        return
 
-tab5, tab6, tab7 = st.tabs(["📊 Visualisasi Segmentasi", "📈 Analisis RFM", "📋 Data"])
+    segment_rules = rfm.load_segment_rules()
+    with run_profiler.section('calculate_rfm', cached=True):
+        rfm_data = calculate_rfm(
+            dataset_version_id,
+            tuple(sorted(selected_years)),
+            start_date,
+            end_date,
+            tuple(sorted(order_statuses)),
+            segment_rules,
+            customer_features() if FEATURE_STORE_MODE else df_filtered
+        )
+        profiler.set_rows(len(rfm_data))
+    # Chart RFM juga bergantung pada aturan segmen
+    rfm_figure_state = filter_state_hash(figure_state, segment_rules)
 
-with tab5:
-    st.markdown("##### Distribusi Customer Segmentation")
+    if view == VIEW_RFM_SEGMENTS:
+        st.markdown("##### Distribusi Customer Segmentation")
     
-    col1, col2 = st.columns(2)
+        col1, col2 = st.columns(2)
     
-    with col1:
-        # Pie chart distribusi segmen
-        segment_dist = rfm_data['segment'].value_counts()
-        
-        fig, ax = plt.subplots(figsize=(10, 8))
-        colors_seg = ['#2ecc71', '#3498db', '#f39c12', '#9b59b6', '#e74c3c', '#1abc9c', '#e67e22', '#95a5a6']
-        wedges, texts, autotexts = ax.pie(
-            segment_dist.values,
-            labels=segment_dist.index,
-            autopct='%1.1f%%',
-            colors=colors_seg,
-            startangle=90,
-            textprops={'fontsize': 10}
-        )
-        ax.set_title('Customer Segmentation Distribution', fontsize=14, fontweight='bold', pad=20)
+        with col1:
+            # Pie chart distribusi segmen
+            segment_dist = rfm_data['segment'].value_counts()
+            colors_seg = ['#2ecc71', '#3498db', '#f39c12', '#9b59b6', '#e74c3c', '#1abc9c', '#e67e22', '#95a5a6']
+        
+            def draw_rfm_segment_pie():
+                fig, ax = plt.subplots(figsize=(10, 8))
+                wedges, texts, autotexts = ax.pie(
+                    segment_dist.values,
+                    labels=segment_dist.index,
+                    autopct='%1.1f%%',
+                    colors=colors_seg,
+                    startangle=90,
+                    textprops={'fontsize': 10}
+                )
+                ax.set_title('Customer Segmentation Distribution', fontsize=14, fontweight='bold', pad=20)
+        
+                for autotext in autotexts:
+                    autotext.set_color('white')
+                    autotext.set_fontweight('bold')
+        
+                plt.tight_layout()
+                return fig
+        
+            show_figure('rfm_segment_pie', rfm_figure_state, draw_rfm_segment_pie)
+    
+        with col2:
+            # Bar chart jumlah customer per segmen
+            def draw_rfm_segment_count():
+                fig, ax = plt.subplots(figsize=(10, 8))
+                bars = ax.barh(range(len(segment_dist)), segment_dist.values, color=colors_seg, alpha=0.8)
+                ax.set_yticks(range(len(segment_dist)))
+                ax.set_yticklabels(segment_dist.index)
+                ax.set_xlabel('Jumlah Customer', fontsize=12, fontweight='bold')
+                ax.set_ylabel('Customer Segment', fontsize=12, fontweight='bold')
+                ax.set_title('Jumlah Customer per Segmen', fontsize=14, fontweight='bold', pad=20)
+                ax.grid(True, alpha=0.3, axis='x')
+        
+                for i, (bar, value) in enumerate(zip(bars, segment_dist.values)):
+                    pct = (value / segment_dist.sum()) * 100
+                    ax.text(value, i, f' {value:,} ({pct:.1f}%)', va='center', fontsize=10, fontweight='bold')
+        
+                plt.tight_layout()
+                return fig
+        
+            show_figure('rfm_segment_count', rfm_figure_state, draw_rfm_segment_count)
+    
+        # Revenue contribution per segment
+        st.markdown("##### Kontribusi Pendapatan per Segmen Customer")
+    
+        segment_revenue = rfm_data.groupby('segment').agg({
+            'monetary': 'sum',
+            'customer_id': 'count',
+            'frequency': 'sum'
+        }).reset_index()
+        segment_revenue.columns = ['segment', 'total_revenue', 'customer_count', 'total_orders']
+        segment_revenue = segment_revenue.sort_values('total_revenue', ascending=False)
+    
+        col_rev1, col_rev2 = st.columns(2)
+    
+        with col_rev1:
+            def draw_rfm_segment_revenue():
+                fig, ax = plt.subplots(figsize=(12, 6))
+                bars = ax.bar(range(len(segment_revenue)), segment_revenue['total_revenue'], 
+                                color=colors_seg, alpha=0.8)
+                ax.set_xticks(range(len(segment_revenue)))
+                ax.set_xticklabels(segment_revenue['segment'], rotation=45, ha='right')
+                ax.set_xlabel('Customer Segment', fontsize=12, fontweight='bold')
+                ax.set_ylabel('Total Pendapatan (R$)', fontsize=12, fontweight='bold')
+                ax.set_title('Total Pendapatan per Segmen Customer', fontsize=14, fontweight='bold', pad=20)
+                ax.grid(True, alpha=0.3, axis='y')
         
-        for autotext in autotexts:
-            autotext.set_color('white')
-            autotext.set_fontweight('bold')
+                total_rfm_revenue = segment_revenue['total_revenue'].sum()
+                for i, (bar, row) in enumerate(zip(bars, segment_revenue.itertuples())):
+                    value = row.total_revenue
+                    pct = (value / total_rfm_revenue) * 100
+                    ax.text(i, value, f'R$ {value/1000:.0f}K\n({pct:.1f}%)', 
+                            ha='center', va='bottom', fontsize=9, fontweight='bold')
         
-        plt.tight_layout()
-        st.pyplot(fig)
-        plt.close()
+                plt.tight_layout()
+                return fig
+        
+            show_figure('rfm_segment_revenue', rfm_figure_state, draw_rfm_segment_revenue)
     
-    with col2:
-        # Bar chart jumlah customer per segmen
-        fig, ax = plt.subplots(figsize=(10, 8))
-        bars = ax.barh(range(len(segment_dist)), segment_dist.values, color=colors_seg, alpha=0.8)
-        ax.set_yticks(range(len(segment_dist)))
-        ax.set_yticklabels(segment_dist.index)
-        ax.set_xlabel('Jumlah Customer', fontsize=12, fontweight='bold')
-        ax.set_ylabel('Customer Segment', fontsize=12, fontweight='bold')
-        ax.set_title('Jumlah Customer per Segmen', fontsize=14, fontweight='bold', pad=20)
-        ax.grid(True, alpha=0.3, axis='x')
-        
-        for i, (bar, value) in enumerate(zip(bars, segment_dist.values)):
-            pct = (value / segment_dist.sum()) * 100
-            ax.text(value, i, f' {value:,} ({pct:.1f}%)', va='center', fontsize=10, fontweight='bold')
-        
-        plt.tight_layout()
-        st.pyplot(fig)
-        plt.close()
-    
-    # Revenue contribution per segment
-    st.markdown("##### Kontribusi Pendapatan per Segmen Customer")
-    
-    segment_revenue = rfm_data.groupby('segment').agg({
-        'monetary': 'sum',
-        'customer_id': 'count',
-        'frequency': 'sum'
-    }).reset_index()
-    segment_revenue.columns = ['segment', 'total_revenue', 'customer_count', 'total_orders']
-    segment_revenue = segment_revenue.sort_values('total_revenue', ascending=False)
-    
-    col_rev1, col_rev2 = st.columns(2)
-    
-    with col_rev1:
-        fig, ax = plt.subplots(figsize=(12, 6))
-        bars = ax.bar(range(len(segment_revenue)), segment_revenue['total_revenue'], 
-                        color=colors_seg, alpha=0.8)
-        ax.set_xticks(range(len(segment_revenue)))
-        ax.set_xticklabels(segment_revenue['segment'], rotation=45, ha='right')
-        ax.set_xlabel('Customer Segment', fontsize=12, fontweight='bold')
-        ax.set_ylabel('Total Pendapatan (R$)', fontsize=12, fontweight='bold')
-        ax.set_title('Total Pendapatan per Segmen Customer', fontsize=14, fontweight='bold', pad=20)
-        ax.grid(True, alpha=0.3, axis='y')
-        
-        total_rfm_revenue = segment_revenue['total_revenue'].sum()
-        for i, (bar, row) in enumerate(zip(bars, segment_revenue.itertuples())):
-            value = row.total_revenue
-            pct = (value / total_rfm_revenue) * 100
-            ax.text(i, value, f'R$ {value/1000:.0f}K\n({pct:.1f}%)', 
-                    ha='center', va='bottom', fontsize=9, fontweight='bold')
-        
-        plt.tight_layout()
-        st.pyplot(fig)
-        plt.close()
-    
-    with col_rev2:
-        # Average revenue per customer per segment
-        segment_revenue['avg_revenue_per_customer'] = segment_revenue['total_revenue'] / segment_revenue['customer_count']
-        
-        fig, ax = plt.subplots(figsize=(12, 6))
-        bars = ax.bar(range(len(segment_revenue)), segment_revenue['avg_revenue_per_customer'], 
-                        color=colors_seg, alpha=0.8)
-        ax.set_xticks(range(len(segment_revenue)))
-        ax.set_xticklabels(segment_revenue['segment'], rotation=45, ha='right')
-        ax.set_xlabel('Customer Segment', fontsize=12, fontweight='bold')
-        ax.set_ylabel('Rata-rata Pendapatan per Customer (R$)', fontsize=12, fontweight='bold')
-        ax.set_title('Rata-rata Pendapatan per Customer berdasarkan Segmen', fontsize=14, fontweight='bold', pad=20)
-        ax.grid(True, alpha=0.3, axis='y')
-        
-        for i, (bar, value) in enumerate(zip(bars, segment_revenue['avg_revenue_per_customer'])):
-            ax.text(i, value, f'R$ {value:.0f}', ha='center', va='bottom', fontsize=9, fontweight='bold')
-        
-        plt.tight_layout()
-        st.pyplot(fig)
-        plt.close()
-
-with tab6:
-    st.markdown("##### Analisis RFM Metrics")
-    
-    col_rfm1, col_rfm2, col_rfm3 = st.columns(3)
-    
-    with col_rfm1:
-        st.markdown("**Recency Distribution**")
-        fig, ax = plt.subplots(figsize=(8, 5))
-        ax.hist(rfm_data['recency'], bins=30, color='#3498db', alpha=0.7, edgecolor='black')
-        ax.set_xlabel('Recency (days)', fontsize=11, fontweight='bold')
-        ax.set_ylabel('Frequency', fontsize=11, fontweight='bold')
-        ax.set_title('Distribution of Recency', fontsize=12, fontweight='bold')
-        ax.axvline(rfm_data['recency'].median(), color='red', linestyle='--', linewidth=2, label=f'Median: {rfm_data["recency"].median():.0f} days')
-        ax.legend()
-        ax.grid(True, alpha=0.3)
-        plt.tight_layout()
-        st.pyplot(fig)
-        plt.close()
-        
-        st.metric("Avg Recency", f"{rfm_data['recency'].mean():.0f} days")
-        st.metric("Median Recency", f"{rfm_data['recency'].median():.0f} days")
-    
-    with col_rfm2:
-        st.markdown("**Frequency Distribution**")
-        fig, ax = plt.subplots(figsize=(8, 5))
-        ax.hist(rfm_data['frequency'], bins=30, color='#2ecc71', alpha=0.7, edgecolor='black')
-        ax.set_xlabel('Frequency (orders)', fontsize=11, fontweight='bold')
-        ax.set_ylabel('Count', fontsize=11, fontweight='bold')
-        ax.set_title('Distribution of Frequency', fontsize=12, fontweight='bold')
-        ax.axvline(rfm_data['frequency'].median(), color='red', linestyle='--', linewidth=2, label=f'Median: {rfm_data["frequency"].median():.0f} orders')
-        ax.legend()
-        ax.grid(True, alpha=0.3)
-        plt.tight_layout()
-        st.pyplot(fig)
-        plt.close()
-        
-        st.metric("Avg Frequency", f"{rfm_data['frequency'].mean():.2f} orders")
-        st.metric("Median Frequency", f"{rfm_data['frequency'].median():.0f} orders")
-    
-    with col_rfm3:
-        st.markdown("**Monetary Distribution**")
-        fig, ax = plt.subplots(figsize=(8, 5))
-        ax.hist(rfm_data['monetary'], bins=30, color='#e74c3c', alpha=0.7, edgecolor='black')
-        ax.set_xlabel('Monetary (R$)', fontsize=11, fontweight='bold')
-        ax.set_ylabel('Count', fontsize=11, fontweight='bold')
-        ax.set_title('Distribution of Monetary Value', fontsize=12, fontweight='bold')
-        ax.axvline(rfm_data['monetary'].median(), color='blue', linestyle='--', linewidth=2, label=f'Median: R$ {rfm_data["monetary"].median():.0f}')
-        ax.legend()
-        ax.grid(True, alpha=0.3)
-        plt.tight_layout()
-        st.pyplot(fig)
-        plt.close()
-        
-        st.metric("Avg Monetary", f"R$ {rfm_data['monetary'].mean():.2f}")
-        st.metric("Median Monetary", f"R$ {rfm_data['monetary'].median():.2f}")
-    
-    # Scatter plots
-    st.markdown("##### Hubungan antar RFM Metrics")
-    
-    col_scatter1, col_scatter2 = st.columns(2)
-    
-    with col_scatter1:
-        fig, ax = plt.subplots(figsize=(10, 6))
-        scatter = ax.scatter(rfm_data['frequency'], rfm_data['monetary'], 
-                            c=rfm_data['recency'], cmap='viridis', alpha=0.6, s=50)
-        ax.set_xlabel('Frequency (orders)', fontsize=12, fontweight='bold')
-        ax.set_ylabel('Monetary (R$)', fontsize=12, fontweight='bold')
-        ax.set_title('Frequency vs Monetary (colored by Recency)', fontsize=13, fontweight='bold')
-        ax.grid(True, alpha=0.3)
-        cbar = plt.colorbar(scatter, ax=ax)
-        cbar.set_label('Recency (days)', fontsize=11)
-        plt.tight_layout()
-        st.pyplot(fig)
-        plt.close()
-    
-    with col_scatter2:
-        fig, ax = plt.subplots(figsize=(10, 6))
-        scatter = ax.scatter(rfm_data['recency'], rfm_data['monetary'], 
-                            c=rfm_data['frequency'], cmap='plasma', alpha=0.6, s=50)
-        ax.set_xlabel('Recency (days)', fontsize=12, fontweight='bold')
-        ax.set_ylabel('Monetary (R$)', fontsize=12, fontweight='bold')
-        ax.set_title('Recency vs Monetary (colored by Frequency)', fontsize=13, fontweight='bold')
-        ax.grid(True, alpha=0.3)
-        cbar = plt.colorbar(scatter, ax=ax)
-        cbar.set_label('Frequency (orders)', fontsize=11)
-        plt.tight_layout()
-        st.pyplot(fig)
-        plt.close()
-
-with tab7:
-    st.markdown("##### Statistik Detail per Segmen Customer")
-    
-    segment_stats = rfm_data.groupby('segment').agg({
-        'customer_id': 'count',
-        'recency': ['mean', 'median'],
-        'frequency': ['mean', 'median', 'sum'],
-        'monetary': ['mean', 'median', 'sum']
-    }).round(2)
-    
-    segment_stats.columns = ['Customer Count', 'Avg Recency', 'Median Recency', 
-                            'Avg Frequency', 'Median Frequency', 'Total Orders',
-                            'Avg Monetary', 'Median Monetary', 'Total Revenue']
-    
-    # Tambahkan persentase
-    segment_stats['Customer %'] = (segment_stats['Customer Count'] / segment_stats['Customer Count'].sum() * 100).round(2)
-    segment_stats['Revenue %'] = (segment_stats['Total Revenue'] / segment_stats['Total Revenue'].sum() * 100).round(2)
-    
-    segment_stats = segment_stats.sort_values('Total Revenue', ascending=False)
-    st.dataframe(segment_stats, use_container_width=True)
-    
-    # Top segment summary
-    col_seg1, col_seg2, col_seg3, col_seg4 = st.columns(4)
-    
-    top_segment = segment_stats.index[0]
-    with col_seg1:
-        st.metric("Segmen dengan Pendapatan Tertinggi", top_segment)
-    with col_seg2:
-        top_revenue = segment_stats.loc[top_segment, 'Total Revenue']
-        st.metric("Pendapatan Segmen Teratas", f"R$ {top_revenue:,.2f}")
-    with col_seg3:
-        top_pct = segment_stats.loc[top_segment, 'Revenue %']
-        st.metric("Kontribusi Pendapatan", f"{top_pct:.1f}%")
-    with col_seg4:
-        top_customers = segment_stats.loc[top_segment, 'Customer Count']
-        st.metric("Jumlah Customer", f"{int(top_customers):,}")
-
-with st.expander("💡 Insight & Kesimpulan"):
-    top_seg_name = segment_stats.index[0]
-    top_seg_revenue = segment_stats.loc[top_seg_name, 'Total Pendapatan']
-    top_seg_pct = segment_stats.loc[top_seg_name, 'Pendapatan %']
-    top_seg_customers = int(segment_stats.loc[top_seg_name, 'Customer Count'])
-    top_seg_avg_monetary = segment_stats.loc[top_seg_name, 'Avg Monetary']
-    
-    champions_count = int(segment_stats.loc['Champions', 'Customer Count']) if 'Champions' in segment_stats.index else 0
-    champions_revenue = segment_stats.loc['Champions', 'Total Pendapatan'] if 'Champions' in segment_stats.index else 0
-    
-    st.write(f"""
-    **Temuan Utama:**
-    - Segmen **{top_seg_name}** memberikan kontribusi pendapatan terbesar dengan total **R$ {top_seg_revenue:,.2f}** atau **{top_seg_pct:.1f}%** dari total pendapatan
-    - Terdapat **{top_seg_customers:,} customers** di segmen {top_seg_name} dengan rata-rata nilai belanja **R$ {top_seg_avg_monetary:,.2f}**
-    - Segmen **Champions** (customer terbaik) terdiri dari **{champions_count:,} customers** yang berkontribusi **R$ {champions_revenue:,.2f}**
-    - Customer dengan recency rendah (baru bertransaksi) dan frequency tinggi menunjukkan loyalitas yang baik
-    
-    **Rekomendasi Strategi:**
-    1. **Champions & Loyal Customers**: Pertahankan dengan program loyalitas premium, early access, dan exclusive benefits
-    2. **Promising**: Nurture dengan email marketing dan special offers untuk meningkatkan frequency
-    3. **At Risk & Cant Lose Them**: Win-back campaign dengan discount dan personalized recommendations
-    4. **Hibernating & Lost**: Reactivation campaign dengan incentive besar atau survey untuk memahami alasan churn
-    
-    **Kesimpulan:**
-    Fokus retention pada segmen {top_seg_name} dan Champions sangat critical karena memberikan kontribusi pendapatan terbesar. 
-    Implementasi strategi marketing yang terpersonalisasi per segmen akan memaksimalkan customer lifetime value (CLV).
-    """)
+        with col_rev2:
+            # Average revenue per customer per segment
+            segment_revenue['avg_revenue_per_customer'] = segment_revenue['total_revenue'] / segment_revenue['customer_count']
+        
+            def draw_rfm_segment_avg_revenue():
+                fig, ax = plt.subplots(figsize=(12, 6))
+                bars = ax.bar(range(len(segment_revenue)), segment_revenue['avg_revenue_per_customer'], 
+                                color=colors_seg, alpha=0.8)
+                ax.set_xticks(range(len(segment_revenue)))
+                ax.set_xticklabels(segment_revenue['segment'], rotation=45, ha='right')
+                ax.set_xlabel('Customer Segment', fontsize=12, fontweight='bold')
+                ax.set_ylabel('Rata-rata Pendapatan per Customer (R$)', fontsize=12, fontweight='bold')
+                ax.set_title('Rata-rata Pendapatan per Customer berdasarkan Segmen', fontsize=14, fontweight='bold', pad=20)
+                ax.grid(True, alpha=0.3, axis='y')
+        
+                for i, (bar, value) in enumerate(zip(bars, segment_revenue['avg_revenue_per_customer'])):
+                    ax.text(i, value, f'R$ {value:.0f}', ha='center', va='bottom', fontsize=9, fontweight='bold')
+        
+                plt.tight_layout()
+                return fig
+        
+            show_figure('rfm_segment_avg_revenue', rfm_figure_state, draw_rfm_segment_avg_revenue)
+
+    elif view == VIEW_RFM_METRICS:
+        st.markdown("##### Analisis RFM Metrics")
+    
+        col_rfm1, col_rfm2, col_rfm3 = st.columns(3)
+    
+        with col_rfm1:
+            st.markdown("**Recency Distribution**")
+            def draw_rfm_recency_hist():
+                fig, ax = plt.subplots(figsize=(8, 5))
+                ax.hist(rfm_data['recency'], bins=30, color='#3498db', alpha=0.7, edgecolor='black')
+                ax.set_xlabel('Recency (days)', fontsize=11, fontweight='bold')
+                ax.set_ylabel('Frequency', fontsize=11, fontweight='bold')
+                ax.set_title('Distribution of Recency', fontsize=12, fontweight='bold')
+                ax.axvline(rfm_data['recency'].median(), color='red', linestyle='--', linewidth=2, label=f'Median: {rfm_data["recency"].median():.0f} days')
+                ax.legend()
+                ax.grid(True, alpha=0.3)
+                plt.tight_layout()
+                return fig
+        
+            show_figure('rfm_recency_hist', rfm_figure_state, draw_rfm_recency_hist)
+        
+            st.metric("Avg Recency", f"{rfm_data['recency'].mean():.0f} days")
+            st.metric("Median Recency", f"{rfm_data['recency'].median():.0f} days")
+    
+        with col_rfm2:
+            st.markdown("**Frequency Distribution**")
+            def draw_rfm_frequency_hist():
+                fig, ax = plt.subplots(figsize=(8, 5))
+                ax.hist(rfm_data['frequency'], bins=30, color='#2ecc71', alpha=0.7, edgecolor='black')
+                ax.set_xlabel('Frequency (orders)', fontsize=11, fontweight='bold')
+                ax.set_ylabel('Count', fontsize=11, fontweight='bold')
+                ax.set_title('Distribution of Frequency', fontsize=12, fontweight='bold')
+                ax.axvline(rfm_data['frequency'].median(), color='red', linestyle='--', linewidth=2, label=f'Median: {rfm_data["frequency"].median():.0f} orders')
+                ax.legend()
+                ax.grid(True, alpha=0.3)
+                plt.tight_layout()
+                return fig
+        
+            show_figure('rfm_frequency_hist', rfm_figure_state, draw_rfm_frequency_hist)
+        
+            st.metric("Avg Frequency", f"{rfm_data['frequency'].mean():.2f} orders")
+            st.metric("Median Frequency", f"{rfm_data['frequency'].median():.0f} orders")
+    
+        with col_rfm3:
+            st.markdown("**Monetary Distribution**")
+            def draw_rfm_monetary_hist():
+                fig, ax = plt.subplots(figsize=(8, 5))
+                ax.hist(rfm_data['monetary'], bins=30, color='#e74c3c', alpha=0.7, edgecolor='black')
+                ax.set_xlabel('Monetary (R$)', fontsize=11, fontweight='bold')
+                ax.set_ylabel('Count', fontsize=11, fontweight='bold')
+                ax.set_title('Distribution of Monetary Value', fontsize=12, fontweight='bold')
+                ax.axvline(rfm_data['monetary'].median(), color='blue', linestyle='--', linewidth=2, label=f'Median: R$ {rfm_data["monetary"].median():.0f}')
+                ax.legend()
+                ax.grid(True, alpha=0.3)
+                plt.tight_layout()
+                return fig
+        
+            show_figure('rfm_monetary_hist', rfm_figure_state, draw_rfm_monetary_hist)
+        
+            st.metric("Avg Monetary", f"R$ {rfm_data['monetary'].mean():.2f}")
+            st.metric("Median Monetary", f"R$ {rfm_data['monetary'].median():.2f}")
+    
+        # Scatter plots
+        st.markdown("##### Hubungan antar RFM Metrics")
+    
+        col_scatter1, col_scatter2 = st.columns(2)
+    
+        with col_scatter1:
+            def draw_rfm_freq_vs_monetary():
+                fig, ax = plt.subplots(figsize=(10, 6))
+                charts.rfm_scatter(
+                    ax, rfm_data['frequency'], rfm_data['monetary'], rfm_data['recency'],
+                    cmap='viridis', label='Recency (days)',
+                    max_points=DATA_CONFIG.scatter_max_points, mode=DATA_CONFIG.scatter_mode
+                )
+                ax.set_xlabel('Frequency (orders)', fontsize=12, fontweight='bold')
+                ax.set_ylabel('Monetary (R$)', fontsize=12, fontweight='bold')
+                ax.set_title('Frequency vs Monetary (colored by Recency)', fontsize=13, fontweight='bold')
+                ax.grid(True, alpha=0.3)
+                plt.tight_layout()
+                return fig
+        
+            show_figure('rfm_freq_vs_monetary', rfm_figure_state, draw_rfm_freq_vs_monetary)
+    
+        with col_scatter2:
+            def draw_rfm_recency_vs_monetary():
+                fig, ax = plt.subplots(figsize=(10, 6))
+                charts.rfm_scatter(
+                    ax, rfm_data['recency'], rfm_data['monetary'], rfm_data['frequency'],
+                    cmap='plasma', label='Frequency (orders)',
+                    max_points=DATA_CONFIG.scatter_max_points, mode=DATA_CONFIG.scatter_mode
+                )
+                ax.set_xlabel('Recency (days)', fontsize=12, fontweight='bold')
+                ax.set_ylabel('Monetary (R$)', fontsize=12, fontweight='bold')
+                ax.set_title('Recency vs Monetary (colored by Frequency)', fontsize=13, fontweight='bold')
+                ax.grid(True, alpha=0.3)
+                plt.tight_layout()
+                return fig
+        
+            show_figure('rfm_recency_vs_monetary', rfm_figure_state, draw_rfm_recency_vs_monetary)
+
+    else:
+        # Statistik per segmen dipakai tabel Data dan Insight
+        segment_stats = analytics.segment_stats(rfm_data)
+
+        if view == VIEW_DATA:
+            st.markdown("##### Statistik Detail per Segmen Customer")
+            st.dataframe(segment_stats, width="stretch", column_config={
+                col: st.column_config.NumberColumn(format=PERCENT_FORMAT if col.endswith('%') else REVENUE_FORMAT)
+                for col in segment_stats.columns if 'Monetary' in col or 'Revenue' in col or col.endswith('%')
+            })
+    
+            # Top segment summary
+            col_seg1, col_seg2, col_seg3, col_seg4 = st.columns(4)
+    
+            top_segment = segment_stats.index[0]
+            with col_seg1:
+                st.metric("Segmen dengan Pendapatan Tertinggi", top_segment)
+            with col_seg2:
+                top_revenue = segment_stats.loc[top_segment, 'Total Revenue']
+                st.metric("Pendapatan Segmen Teratas", f"R$ {top_revenue:,.2f}")
+            with col_seg3:
+                top_pct = segment_stats.loc[top_segment, 'Revenue %']
+                st.metric("Kontribusi Pendapatan", f"{top_pct:.1f}%")
+            with col_seg4:
+                top_customers = segment_stats.loc[top_segment, 'Customer Count']
+                st.metric("Jumlah Customer", f"{int(top_customers):,}")
+
+        else:
+            top_seg_name = segment_stats.index[0]
+            top_seg_revenue = segment_stats.loc[top_seg_name, 'Total Revenue']
+            top_seg_pct = segment_stats.loc[top_seg_name, 'Revenue %']
+            top_seg_customers = int(segment_stats.loc[top_seg_name, 'Customer Count'])
+            top_seg_avg_monetary = segment_stats.loc[top_seg_name, 'Avg Monetary']
+    
+            champions_count = int(segment_stats.loc['Champions', 'Customer Count']) if 'Champions' in segment_stats.index else 0
+            champions_revenue = segment_stats.loc['Champions', 'Total Revenue'] if 'Champions' in segment_stats.index else 0
+    
+            st.write(f"""
+            **Temuan Utama:**
+            - Segmen **{top_seg_name}** memberikan kontribusi pendapatan terbesar dengan total **R$ {top_seg_revenue:,.2f}** atau **{top_seg_pct:.1f}%** dari total pendapatan
+            - Terdapat **{top_seg_customers:,} customers** di segmen {top_seg_name} dengan rata-rata nilai belanja **R$ {top_seg_avg_monetary:,.2f}**
+            - Segmen **Champions** (customer terbaik) terdiri dari **{champions_count:,} customers** yang berkontribusi **R$ {champions_revenue:,.2f}**
+            - Customer dengan recency rendah (baru bertransaksi) dan frequency tinggi menunjukkan loyalitas yang baik
+    
+            **Rekomendasi Strategi:**
+            1. **Champions & Loyal Customers**: Pertahankan dengan program loyalitas premium, early access, dan exclusive benefits
+            2. **Promising**: Nurture dengan email marketing dan special offers untuk meningkatkan frequency
+            3. **At Risk & Cant Lose Them**: Win-back campaign dengan discount dan personalized recommendations
+            4. **Hibernating & Lost**: Reactivation campaign dengan incentive besar atau survey untuk memahami alasan churn
+    
+            **Kesimpulan:**
+            Fokus retention pada segmen {top_seg_name} dan Champions sangat critical karena memberikan kontribusi pendapatan terbesar. 
+            Implementasi strategi marketing yang terpersonalisasi per segmen akan memaksimalkan customer lifetime value (CLV).
+            """)
+
+business_question_3()
+
+st.markdown("---")
+
+# ===========================
+# DETAIL ORDER (DRILL-DOWN)
+# ===========================
+st.subheader("🔎 Detail Order")
+st.markdown("Baris order hasil filter sidebar, dibaca per halaman. ID dapat dicari berdasarkan awalannya.")
+
+ORDER_TABLE_COLUMNS = [
+    'order_id', 'order_purchase_timestamp', 'order_status', 'customer_unique_id', 'product_id',
+    'product_category_name_english', 'price', 'payment_type', 'total_payment_value', 'max_installments',
+    'review_score_avg'
+]
+
+@st.fragment
+@run_profiler.profiled('orders')
+def order_details():
+    view = section_view('orders_view', [VIEW_DATA])
+    if view is None:
+        return
+    if LAZY_ROWS:
+        # Mode streaming / engine SQL: baris tidak dipegang di RAM
+        st.info("Detail order hanya tersedia di mode in-memory (bukan streaming / engine duckdb).")
+        return
+
+    table = data_table.PagedTable(df_filtered, id_lookup, ORDER_TABLE_COLUMNS)
+    paged_dataframe('orders', table, figure_state, {
+        'order_purchase_timestamp': st.column_config.DatetimeColumn(format="YYYY-MM-DD HH:mm:ss"),
+        'price': st.column_config.NumberColumn(format=REVENUE_FORMAT),
+        'total_payment_value': st.column_config.NumberColumn(format=REVENUE_FORMAT),
+        'review_score_avg': st.column_config.NumberColumn(format=SCORE_FORMAT)
+    })
+
+order_details()
 
 # ===========================
 # FOOTER
@@ -887,4 +1236,26 @@ st.markdown("""
         <p>📊 Dashboard Analisis E-Commerce | Periode 2016-2018</p>
         <p>Dibuat dengan ❤️ menggunakan Streamlit | © 2024</p>
     </div>
-""", unsafe_allow_html=True)
\ No newline at end of file
+""", unsafe_allow_html=True)
+
+# ===========================
+# PROFILER RERUN
+# ===========================
+# Rerun ini selesai; panel menampilkan rerun ini + riwayat (termasuk rerun fragment saja)
+run_profiler.end_run()
+if DATA_CONFIG.profiler:
+    with st.sidebar.expander("⏱️ Profiler Rerun"):
+        last_run = run_profiler.last_run()
+        st.metric("Rerun terakhir", f"{last_run['wall_ms']:,.0f} ms")
+        sections = run_profiler.sections_frame(last_run)
+        # Bagian bersarang (chart di dalam pertanyaan bisnis) diberi indentasi
+        sections['section'] = ['\u2003' * depth + name for depth, name in zip(sections['depth'], sections['section'])]
+        st.dataframe(sections.drop(columns='depth').round(2), hide_index=True, width="stretch")
+        st.caption("Riwayat rerun sesi ini")
+        st.dataframe(run_profiler.history_frame().round(1), hide_index=True, width="stretch")
+        st.download_button(
+            "⬇️ Unduh log (JSON Lines)",
+            run_profiler.export_jsonl(),
+            file_name=f"profiler-{run_profiler.session_id}.jsonl",
+            mime="application/x-ndjson"
+        )
@@ -0,0 +1,512 @@
+import csv
+import io
+import json
+import os
+import shutil
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+# ===========================
+# KONFIGURASI SUMBER DATA
+# ===========================
+# Default mengikuti struktur folder projek (Dasboard/ dan Data/), bisa diganti lewat
+# environment variable / dashboard.toml (lihat data_sources.load_config)
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+MAIN_DATA_PATH = os.path.join(BASE_DIR, 'all_data_ans.csv')
+TRANSLATION_PATH = os.path.join(BASE_DIR, os.pardir, 'Data', 'product_category_name_translation.csv')
+
+DATETIME_COLUMNS = [
+    'order_purchase_timestamp',
+    'order_approved_at',
+    'order_delivered_carrier_date',
+    'order_delivered_customer_date',
+    'order_estimated_delivery_date',
+    'shipping_limit_date'
+]
+
+# Kolom yang benar-benar dipakai dashboard (dipakai untuk column projection)
+DASHBOARD_COLUMNS = [
+    'order_id',
+    'customer_unique_id',
+    'order_status',
+    'order_purchase_timestamp',
+    'product_id',
+    'price',
+    'product_category_name_english',
+    'review_score_avg',
+    'payment_type',
+    'total_payment_value',
+    'max_installments'
+]
+
+# Skema kompaksi dtype setelah load:
+# - 'category' : kolom kardinalitas rendah -> pandas Categorical
+# - 'id'       : ID hash (string 32 karakter) -> kode integer + lookup table
+COLUMN_SCHEMA = {
+    'order_status': 'category',
+    'payment_type': 'category',
+    'product_category_name': 'category',
+    'product_category_name_english': 'category',
+    'order_id': 'id',
+    'customer_unique_id': 'id',
+    'product_id': 'id'
+}
+
+# Naikkan versi ini kalau logika preparasi / layout snapshot berubah, supaya snapshot lama tidak dipakai lagi
+SNAPSHOT_VERSION = 2
+SNAPSHOT_FINGERPRINT_FILE = '_fingerprint.json'
+# Skema gabungan dataset yang ditulis per chunk (lihat write_snapshot dengan iterator Table)
+COMMON_METADATA_FILE = '_common_metadata'
+
+# Layout partisi per bulan pembelian (hive): <folder>/purchase_year=2018/purchase_month=03/part-0.parquet
+# Bulan ditulis 2 digit supaya urutan folder = urutan waktu. Baris tanpa timestamp masuk folder
+# __HIVE_DEFAULT_PARTITION__ (kolom partisi = null).
+PARTITION_COLUMNS = ['purchase_year', 'purchase_month']
+PARTITIONING = ds.partitioning(
+    pa.schema([('purchase_year', pa.int16()), ('purchase_month', pa.int8())]), flavor='hive'
+)
+
+
+# ===========================
+# PARSING CSV (JALUR LAMBAT)
+# ===========================
+def prepare_source_frame(df, df_translation):
+    # Merge untuk translate kategori
+    df = df.merge(
+        df_translation,
+        on='product_category_name',
+        how='left'
+    )
+
+    # Convert kolom datetime
+    for col in DATETIME_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_datetime(df[col], errors='coerce')
+
+    return df
+
+
+def read_source_csv(main_path=MAIN_DATA_PATH, translation_path=TRANSLATION_PATH, workers=None):
+    # Load main dataset + translation. Baris diurutkan seperti saat snapshot partisi dibaca, supaya
+    # jalur CSV dan jalur snapshot menghasilkan posisi baris yang sama.
+    # workers=1: parser pandas satu thread; selain itu parser paralel per rentang byte (lihat bawah)
+    df_translation = pd.read_csv(translation_path)
+    if workers == 1:
+        df = prepare_source_frame(pd.read_csv(main_path), df_translation)
+    else:
+        df = read_csv_parallel(main_path, df_translation, workers)
+    return sort_by_partition(df)
+
+
+def read_appended_rows(main_path, translation_path, offset):
+    # Parse hanya byte CSV setelah `offset` (baris yang di-append sejak load terakhir).
+    # Baris terakhir yang belum lengkap (penulis masih menulis) dibiarkan untuk refresh berikutnya.
+    # Return (df_baru, offset_baru)
+    with open(main_path, 'rb') as f:
+        header = f.readline()
+        f.seek(offset)
+        data = f.read()
+    end = data.rfind(b'\n') + 1
+    if end == 0:
+        return None, offset
+
+    df = pd.read_csv(io.BytesIO(header + data[:end]))
+    df_translation = pd.read_csv(translation_path)
+    return prepare_source_frame(df, df_translation), offset + end
+
+
+# ===========================
+# PARSING CSV PARALEL
+# ===========================
+# File dipecah menjadi rentang byte (batas selalu di awal baris) dan tiap rentang diparse pyarrow
+# di thread pool. Parser pyarrow melepas GIL, jadi thread sudah memakai semua core tanpa biaya
+# pickle hasil antar proses. Timestamp diparse di worker dengan format eksplisit (tanpa inferensi
+# per kolom); nilai yang tidak cocok jadi NaT, sama dengan to_datetime(errors='coerce').
+# Chunk digabung dengan concat_tables (zero-copy, hanya daftar chunk) lalu dikonversi ke pandas
+# sekali. Syarat: tidak ada newline di dalam field ber-quote.
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+MIN_CHUNK_BYTES = 4 * 1024 * 1024
+# Ukuran rentang byte saat snapshot dibangun tanpa memuat seluruh CSV (mode streaming)
+STREAM_CHUNK_BYTES = 64 * 1024 * 1024
+
+
+def csv_byte_ranges(path, n_chunks, min_chunk_bytes=MIN_CHUNK_BYTES):
+    # Return (nama kolom, [(awal, akhir), ...]) — rentang setelah header, dipotong di awal baris
+    with open(path, 'rb') as f:
+        header = f.readline()
+        data_start, size = f.tell(), os.fstat(f.fileno()).st_size
+        n_chunks = max(1, min(n_chunks, (size - data_start) // min_chunk_bytes))
+        bounds = [data_start]
+        for i in range(1, n_chunks):
+            f.seek(data_start + (size - data_start) * i // n_chunks)
+            f.readline()
+            bounds.append(max(f.tell(), bounds[-1]))
+        bounds.append(size)
+    columns = next(csv.reader([header.decode('utf-8-sig')]))
+    return columns, [(lo, hi) for lo, hi in zip(bounds[:-1], bounds[1:]) if hi > lo]
+
+
+def _read_csv_range(buffer, start, end, columns):
+    # buffer: isi file memory-mapped; slice tidak menyalin byte
+    timestamp_columns = [col for col in DATETIME_COLUMNS if col in columns]
+    table = pa_csv.read_csv(
+        pa.BufferReader(buffer.slice(start, end - start)),
+        read_options=pa_csv.ReadOptions(column_names=columns, use_threads=False),
+        convert_options=pa_csv.ConvertOptions(
+            column_types={col: pa.string() for col in timestamp_columns},
+            strings_can_be_null=True
+        )
+    )
+    for col in timestamp_columns:
+        parsed = pc.strptime(table[col], format=TIMESTAMP_FORMAT, unit='ns', error_is_null=True)
+        table = table.set_column(table.schema.get_field_index(col), col, parsed)
+    return table
+
+
+def read_csv_parallel(main_path, df_translation, workers=None):
+    # Hasil sama dengan prepare_source_frame(pd.read_csv(main_path), df_translation)
+    workers = workers or os.cpu_count() or 1
+    columns, ranges = csv_byte_ranges(main_path, workers * 2)
+    with pa.memory_map(main_path) as source, ThreadPoolExecutor(workers) as pool:
+        buffer = source.read_buffer()
+        tables = list(pool.map(lambda r: _read_csv_range(buffer, r[0], r[1], columns), ranges))
+    if not tables:
+        return prepare_source_frame(pd.read_csv(main_path), df_translation)
+
+    # Chunk dengan tipe hasil inferensi berbeda (mis. int vs double) dipromosikan ke tipe bersama
+    table = pa.concat_tables(tables, promote_options='permissive')
+    return translate_categories(table, df_translation).to_pandas(split_blocks=True, self_destruct=True)
+
+
+def translate_categories(table, df_translation):
+    # Translate kategori dengan lookup (setara merge left, kunci translation unik)
+    keys = pa.array(df_translation['product_category_name'].astype(str))
+    position = pc.index_in(table['product_category_name'].cast(pa.string()), value_set=keys)
+    for col in df_translation.columns.drop('product_category_name'):
+        table = table.append_column(col, pc.take(pa.array(df_translation[col]), position))
+    return table
+
+
+def iter_csv_tables(main_path, df_translation, workers=None, chunk_bytes=STREAM_CHUNK_BYTES):
+    # Versi streaming read_csv_parallel: yield Table Arrow per rentang byte (urutan file), paling
+    # banyak `workers` rentang diparse sekaligus, jadi RAM terpakai ~ workers * chunk_bytes
+    # berapa pun ukuran file
+    workers = workers or os.cpu_count() or 1
+    n_chunks = -(-os.path.getsize(main_path) // chunk_bytes)
+    columns, ranges = csv_byte_ranges(main_path, n_chunks)
+    with pa.memory_map(main_path) as source, ThreadPoolExecutor(workers) as pool:
+        buffer = source.read_buffer()
+        for i in range(0, len(ranges), workers):
+            batch = ranges[i:i + workers]
+            for table in pool.map(lambda r: _read_csv_range(buffer, r[0], r[1], columns), batch):
+                yield translate_categories(table, df_translation)
+
+
+# ===========================
+# PENYIMPANAN PARTISI TAHUN/BULAN
+# ===========================
+# Filter tahun & rentang tanggal sidebar menjadi predicate di kolom partisi, sehingga pyarrow
+# hanya membuka folder bulan yang dipilih (partition pruning) alih-alih seluruh dataset.
+def partition_table(data):
+    # DataFrame / Table Arrow -> Table Arrow + kolom partisi dari order_purchase_timestamp
+    table = pa.Table.from_pandas(data, preserve_index=False) if isinstance(data, pd.DataFrame) else data
+    ts = table['order_purchase_timestamp']
+    table = table.append_column('purchase_year', pc.strftime(ts, format='%Y'))
+    return table.append_column('purchase_month', pc.strftime(ts, format='%m'))
+
+
+def sort_by_partition(df):
+    # Urutan baca dataset partisi: bulan pembelian naik, tanpa timestamp di akhir, lalu urutan asli
+    ts = df['order_purchase_timestamp']
+    month = (ts.dt.year * 12 + ts.dt.month).to_numpy(dtype='float64', na_value=np.inf)
+    order = np.argsort(month, kind='stable')
+    return df.take(order).reset_index(drop=True)
+
+
+def write_partitioned(data, path, existing_data_behavior='overwrite_or_ignore', basename_template=None):
+    # use_threads=False: urutan baris di dalam satu bulan sama dengan urutan di data.
+    # Return skema kolom data (tanpa kolom partisi) yang ditulis
+    table = partition_table(data)
+    ds.write_dataset(
+        table, path, format='parquet',
+        partitioning=PARTITION_COLUMNS, partitioning_flavor='hive',
+        file_options=ds.ParquetFileFormat().make_write_options(compression='zstd'),
+        basename_template=basename_template,
+        existing_data_behavior=existing_data_behavior, use_threads=False
+    )
+    return pa.schema([field for field in table.schema if field.name not in PARTITION_COLUMNS])
+
+
+def write_common_schema(path, schemas):
+    # Tipe kolom bisa berbeda antar chunk (int vs double, chunk yang semuanya kosong = null):
+    # simpan skema gabungan + tipe kolom partisi supaya seluruh dataset dibaca dengan satu tipe
+    schema = pa.unify_schemas(schemas, promote_options='permissive')
+    for field in PARTITIONING.schema:
+        schema = schema.append(field)
+    pq.write_metadata(schema, os.path.join(path, COMMON_METADATA_FILE))
+
+
+def open_partitioned(path, partition_base_dir=None):
+    # path: folder dataset, atau list file di dalamnya (partition_base_dir = folder dataset)
+    try:
+        schema = pq.read_schema(os.path.join(partition_base_dir or path, COMMON_METADATA_FILE))
+    except (OSError, TypeError, pa.ArrowInvalid):
+        schema = None
+    return ds.dataset(path, format='parquet', schema=schema, partitioning=PARTITIONING,
+                      partition_base_dir=partition_base_dir)
+
+
+def is_partitioned(dataset):
+    # Folder Parquet lama (tanpa subfolder purchase_year=...) tetap bisa dibaca, tapi tanpa pruning
+    return bool(dataset.files) and all('purchase_year=' in path for path in dataset.files)
+
+
+def read_partitioned(dataset, columns=None, filters=None):
+    # Kolom partisi hanya dipakai untuk pruning, tidak ikut dikembalikan
+    names = [col for col in dataset.schema.names if col not in PARTITION_COLUMNS]
+    columns = names if columns is None else [col for col in columns if col in names]
+    return dataset.to_table(columns=columns, filter=filters).to_pandas()
+
+
+# ===========================
+# SNAPSHOT PARQUET
+# ===========================
+def snapshot_path_for(main_path):
+    # Snapshot (folder partisi tahun/bulan) disimpan di samping file CSV utama
+    return os.path.splitext(main_path)[0] + '.snapshot'
+
+
+def source_fingerprint(*paths):
+    # Ukuran + waktu modifikasi cukup untuk mendeteksi file sumber yang berubah
+    fingerprint = {'version': SNAPSHOT_VERSION, 'sources': []}
+    for path in paths:
+        stat = os.stat(path)
+        fingerprint['sources'].append({
+            'name': os.path.basename(path),
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns
+        })
+    return fingerprint
+
+
+def write_snapshot(data, snapshot_path, fingerprint):
+    # data: DataFrame, atau iterator Table Arrow (lihat iter_csv_tables) yang ditulis satu per satu;
+    # nama file per chunk menjaga urutan baris di dalam tiap bulan.
+    # Tulis ke folder sementara lalu tukar, supaya pembaca tidak pernah melihat snapshot setengah jadi.
+    # Fingerprint ditulis terakhir: folder tanpa fingerprint tidak pernah dianggap valid.
+    tmp_path = snapshot_path + '.tmp'
+    old_path = snapshot_path + '.old'
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    if isinstance(data, pd.DataFrame):
+        write_partitioned(data, tmp_path)
+    else:
+        schemas = [write_partitioned(table, tmp_path, basename_template=f'part-{i:05d}-{{i}}.parquet')
+                   for i, table in enumerate(data)]
+        if not schemas:
+            raise ValueError("CSV tidak berisi baris data")
+        write_common_schema(tmp_path, schemas)
+    with open(os.path.join(tmp_path, SNAPSHOT_FINGERPRINT_FILE), 'w') as f:
+        json.dump(fingerprint, f)
+
+    shutil.rmtree(old_path, ignore_errors=True)
+    if os.path.exists(snapshot_path):
+        os.replace(snapshot_path, old_path)
+    os.replace(tmp_path, snapshot_path)
+    shutil.rmtree(old_path, ignore_errors=True)
+
+
+def open_snapshot(snapshot_path, fingerprint):
+    # Dataset pyarrow snapshot (belum dibaca), None kalau snapshot tidak ada / sudah kadaluarsa
+    try:
+        with open(os.path.join(snapshot_path, SNAPSHOT_FINGERPRINT_FILE)) as f:
+            stored = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if stored != fingerprint:
+        return None
+
+    try:
+        dataset = open_partitioned(snapshot_path)
+    except (OSError, pa.ArrowInvalid):
+        return None
+    return dataset if dataset.files else None
+
+
+def read_snapshot(snapshot_path, fingerprint, columns=None, filters=None):
+    # Return None kalau snapshot tidak ada / sudah kadaluarsa.
+    # filters: expression pyarrow, boleh memakai kolom partisi (lihat data_sources._arrow_filter)
+    dataset = open_snapshot(snapshot_path, fingerprint)
+    if dataset is None:
+        return None
+    return read_partitioned(dataset, columns=columns, filters=filters)
+
+
+def prepare_snapshot(main_path=MAIN_DATA_PATH, translation_path=TRANSLATION_PATH, workers=None):
+    # Parse CSV sekali, merge + convert datetime, lalu simpan sebagai snapshot bertipe
+    fingerprint = source_fingerprint(main_path, translation_path)
+    df = read_source_csv(main_path, translation_path, workers)
+    write_snapshot(df, snapshot_path_for(main_path), fingerprint)
+    return df
+
+
+def load_dataset(main_path=MAIN_DATA_PATH, translation_path=TRANSLATION_PATH, columns=None, workers=None):
+    fingerprint = source_fingerprint(main_path, translation_path)
+    snapshot_path = snapshot_path_for(main_path)
+
+    df = read_snapshot(snapshot_path, fingerprint, columns=columns)
+    if df is not None:
+        return df
+
+    # Fallback ke CSV, sekalian bangun snapshot untuk cold start berikutnya
+    df = read_source_csv(main_path, translation_path, workers)
+    try:
+        write_snapshot(df, snapshot_path, fingerprint)
+    except (OSError, pa.ArrowException):
+        # Folder read-only / tipe kolom tidak didukung: tetap jalan tanpa snapshot
+        pass
+
+    if columns is not None:
+        df = df[[col for col in columns if col in df.columns]]
+    return df
+
+
+class LoadedDataset(NamedTuple):
+    # Hasil load_data() di dashboard
+    df: pd.DataFrame
+    id_lookup: dict      # kolom ID -> Index ID asli (lihat compact_frame)
+    version: str         # fingerprint dataset saat load, dipakai sebagai cache key turunan
+
+
+# ===========================
+# KOMPAKSI DTYPE
+# ===========================
+def _id_codes(codes, n_ids, index, name, nullable=None):
+    # Kode (-1 = NaN) -> Series int32/int64, NaN lewat nullable Int.
+    # nullable=None: nullable Int hanya kalau ada NaN; True/False dipaksa (dtype sama antar chunk)
+    dtype = 'int32' if n_ids < 2**31 else 'int64'
+    if (codes < 0).any() if nullable is None else nullable:
+        codes = pd.array(codes, dtype=dtype.capitalize())
+        codes[codes < 0] = pd.NA
+    else:
+        codes = codes.astype(dtype)
+    return pd.Series(codes, index=index, name=name)
+
+
+def encode_ids(values):
+    # String ID -> kode integer (int32 kalau muat). NaN tetap NaN lewat nullable Int.
+    # sort=True: urutan kode = urutan string, jadi groupby/rank menghasilkan urutan yang sama
+    codes, uniques = pd.factorize(values, sort=True, use_na_sentinel=True)
+    return _id_codes(codes, len(uniques), values.index, values.name), pd.Index(uniques, name=values.name)
+
+
+def merge_ids(codes, lookup, new_values):
+    # Tambah ID dari baris baru ke lookup yang sudah ada. Lookup tetap terurut, jadi kode lama
+    # di-remap (satu gather) supaya hasilnya sama dengan encode_ids() pada dataset lengkap.
+    # Return (kode_lama, kode_baru, lookup_baru)
+    added = pd.Index(new_values.dropna().unique()).difference(lookup)
+    if len(added):
+        merged = lookup.append(added).sort_values()
+        remap = merged.get_indexer(lookup)
+        old = codes.to_numpy(dtype=np.int64, na_value=-1)
+        old = np.where(old >= 0, remap[np.maximum(old, 0)], -1)
+        codes = _id_codes(old, len(merged), codes.index, codes.name)
+        lookup = pd.Index(merged, name=lookup.name)
+    new = lookup.get_indexer(new_values)
+    return codes, _id_codes(new, len(lookup), new_values.index, new_values.name), lookup
+
+
+def _downcast_float(values):
+    # Float hanya di-downcast kalau lossless (nilai uang seperti 29.99 tetap float64)
+    as_float32 = values.astype('float32')
+    lossless = (as_float32.astype('float64') == values) | values.isna()
+    return as_float32 if lossless.all() else values
+
+
+def compact_frame(df, schema=COLUMN_SCHEMA):
+    # Return (df_kompak, id_lookup) — id_lookup[col][kode] = ID asli
+    df = df.copy()
+    id_lookup = {}
+
+    for col in df.columns:
+        kind = schema.get(col)
+        if kind == 'category':
+            df[col] = df[col].astype('category')
+        elif kind == 'id':
+            df[col], id_lookup[col] = encode_ids(df[col])
+        elif pd.api.types.is_integer_dtype(df[col]):
+            df[col] = pd.to_numeric(df[col], downcast='integer')
+        elif pd.api.types.is_float_dtype(df[col]):
+            df[col] = _downcast_float(df[col])
+
+    return df, id_lookup
+
+
+def compact_append(df, id_lookup, new_rows, schema=COLUMN_SCHEMA):
+    # Tambah baris baru (belum dikompaksi) ke df hasil compact_frame tanpa mengompaksi ulang
+    # seluruh dataset. Hasil sama dengan compact_frame(concat(semua baris)).
+    # Return (df_gabungan, id_lookup_baru)
+    id_lookup = dict(id_lookup)
+    columns = {}
+    for col in df.columns:
+        old = df[col]
+        new = new_rows[col] if col in new_rows.columns else pd.Series(np.nan, index=new_rows.index)
+        kind = schema.get(col)
+        if kind == 'category':
+            columns[col] = pd.api.types.union_categoricals(
+                [old, new.astype(object).astype('category')], sort_categories=True, ignore_order=True
+            )
+        elif kind == 'id':
+            old_codes, new_codes, id_lookup[col] = merge_ids(old, id_lookup[col], new)
+            columns[col] = pd.concat([old_codes, new_codes], ignore_index=True)
+        elif pd.api.types.is_integer_dtype(old) and pd.api.types.is_integer_dtype(new):
+            columns[col] = pd.to_numeric(pd.concat([old.astype('int64'), new], ignore_index=True), downcast='integer')
+        elif pd.api.types.is_float_dtype(old):
+            combined = pd.concat([old.astype('float64'), new.astype('float64')], ignore_index=True)
+            columns[col] = _downcast_float(combined) if old.dtype == 'float32' else combined
+        else:
+            columns[col] = pd.concat([old, new], ignore_index=True)
+    return pd.DataFrame(columns), id_lookup
+
+
+def decode_ids(codes, id_lookup, col):
+    # Kode integer -> ID asli (untuk ditampilkan ke user)
+    return id_lookup[col].take(codes)
+
+
+def memory_report(df, id_lookup=None):
+    # Pemakaian RAM per kolom (deep), termasuk lookup table ID
+    usage = df.memory_usage(deep=True, index=False)
+    report = pd.DataFrame({
+        'column': usage.index,
+        'dtype': [str(df[col].dtype) for col in usage.index],
+        'bytes': usage.values
+    })
+
+    lookup_rows = [
+        {'column': f'{col} (lookup)', 'dtype': str(index.dtype), 'bytes': index.memory_usage(deep=True)}
+        for col, index in (id_lookup or {}).items()
+    ]
+    if lookup_rows:
+        report = pd.concat([report, pd.DataFrame(lookup_rows)], ignore_index=True)
+
+    report['memory_mb'] = report['bytes'] / 1024**2
+    report['share_pct'] = report['bytes'] / report['bytes'].sum() * 100
+    return report.sort_values('bytes', ascending=False).reset_index(drop=True)
+
+
+if __name__ == '__main__':
+    # Pemakaian: python data_loader.py [path_csv_utama] [path_translation]
+    args = sys.argv[1:]
+    main_path = args[0] if len(args) > 0 else MAIN_DATA_PATH
+    translation_path = args[1] if len(args) > 1 else TRANSLATION_PATH
+    df = prepare_snapshot(main_path, translation_path)
+    print(f"Snapshot ditulis ke {snapshot_path_for(main_path)} ({len(df):,} baris)")
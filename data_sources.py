@@ -0,0 +1,502 @@
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import tomllib
+from dataclasses import dataclass
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+from data_loader import (
+    DATETIME_COLUMNS,
+    MAIN_DATA_PATH,
+    TRANSLATION_PATH,
+    is_partitioned,
+    iter_csv_tables,
+    load_dataset,
+    open_partitioned,
+    open_snapshot,
+    read_appended_rows,
+    read_partitioned,
+    read_snapshot,
+    snapshot_path_for,
+    source_fingerprint,
+    write_partitioned,
+    write_snapshot
+)
+
+TIMESTAMP_COLUMN = 'order_purchase_timestamp'
+STATUS_COLUMN = 'order_status'
+
+DEFAULT_CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'dashboard.toml')
+
+
+# ===========================
+# KONFIGURASI
+# ===========================
+@dataclass(frozen=True)
+class DataConfig:
+    source: str = 'csv'                  # csv | parquet | sqlite | duckdb
+    path: str = MAIN_DATA_PATH           # file CSV / folder Parquet / file database
+    translation_path: str = TRANSLATION_PATH
+    table: str = 'orders'                # nama tabel untuk sqlite / duckdb
+    pushdown: bool = False               # push filter tahun & status sidebar ke sumber data
+    rfm_cache_entries: int = 32          # maksimum hasil RFM yang disimpan di cache
+    rfm_cache_ttl: int = 3600            # umur maksimum hasil RFM di cache (detik)
+    figure_cache_mb: int = 64            # batas memori cache gambar chart (MB), 0 = nonaktif
+    figure_format: str = 'png'           # png | svg
+    scatter_max_points: int = 20_000     # di atas ini scatter RFM pindah ke mode besar
+    scatter_mode: str = 'hexbin'         # hexbin | sample
+    incremental: bool = False            # tambah baris baru tanpa reload penuh (mode non-pushdown)
+    refresh_seconds: int = 30            # interval cek data baru (detik), 0 = hanya tombol refresh
+    ingest_workers: int = 0              # thread parsing CSV, 0 = semua core, 1 = parser pandas
+    streaming: bool = False              # out-of-core: agregasi dibaca per bulan, dataset tidak dimuat utuh
+    engine: str = 'pandas'               # pandas | duckdb (semua agregasi sebagai query SQL)
+    feature_store_dir: str = ''          # folder file feature store customer (RFM), '' = hanya di memori
+    profiler: bool = False               # panel debug profiler per rerun di sidebar
+    profiler_log: str = ''               # file log JSON Lines per rerun (juga mengaktifkan profiler tanpa panel)
+    shared_dir: str = ''                 # folder dataset Arrow memory-mapped bersama semua sesi/proses, '' = nonaktif
+
+
+ENV_VARS = {
+    'source': 'DASHBOARD_DATA_SOURCE',
+    'path': 'DASHBOARD_DATA_PATH',
+    'translation_path': 'DASHBOARD_TRANSLATION_PATH',
+    'table': 'DASHBOARD_DB_TABLE',
+    'pushdown': 'DASHBOARD_PUSHDOWN',
+    'rfm_cache_entries': 'DASHBOARD_RFM_CACHE_ENTRIES',
+    'rfm_cache_ttl': 'DASHBOARD_RFM_CACHE_TTL',
+    'figure_cache_mb': 'DASHBOARD_FIGURE_CACHE_MB',
+    'figure_format': 'DASHBOARD_FIGURE_FORMAT',
+    'scatter_max_points': 'DASHBOARD_SCATTER_MAX_POINTS',
+    'scatter_mode': 'DASHBOARD_SCATTER_MODE',
+    'incremental': 'DASHBOARD_INCREMENTAL',
+    'refresh_seconds': 'DASHBOARD_REFRESH_SECONDS',
+    'ingest_workers': 'DASHBOARD_INGEST_WORKERS',
+    'streaming': 'DASHBOARD_STREAMING',
+    'engine': 'DASHBOARD_ENGINE',
+    'feature_store_dir': 'DASHBOARD_FEATURE_STORE_DIR',
+    'profiler': 'DASHBOARD_PROFILER',
+    'profiler_log': 'DASHBOARD_PROFILER_LOG',
+    'shared_dir': 'DASHBOARD_SHARED_DIR'
+}
+
+
+def _parse_bool(value):
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+def load_config(config_path=None, environ=None):
+    # Prioritas: environment variable > file TOML (bagian [data]) > default
+    environ = os.environ if environ is None else environ
+    config_path = config_path or environ.get('DASHBOARD_CONFIG', DEFAULT_CONFIG_PATH)
+
+    values = {}
+    if os.path.exists(config_path):
+        with open(config_path, 'rb') as f:
+            values.update(tomllib.load(f).get('data', {}))
+
+    for field, env_name in ENV_VARS.items():
+        if env_name in environ:
+            values[field] = environ[env_name]
+
+    for field in ('pushdown', 'incremental', 'streaming', 'profiler'):
+        if field in values:
+            values[field] = _parse_bool(values[field])
+    for field in ('rfm_cache_entries', 'rfm_cache_ttl', 'figure_cache_mb', 'scatter_max_points',
+                  'refresh_seconds', 'ingest_workers'):
+        if field in values:
+            values[field] = int(values[field])
+    return DataConfig(**values)
+
+
+# ===========================
+# HELPER FILTER
+# ===========================
+def year_ranges(years):
+    # Tahun -> rentang [awal tahun, awal tahun berikutnya), supaya bisa dipush sebagai range predicate
+    return [(pd.Timestamp(year=int(y), month=1, day=1), pd.Timestamp(year=int(y) + 1, month=1, day=1))
+            for y in sorted(set(years))]
+
+
+def date_bounds(start_date, end_date):
+    # Rentang tanggal inklusif per hari -> [start_date 00:00, end_date + 1 hari 00:00), sama dengan FilterIndex
+    return pd.Timestamp(start_date).normalize(), pd.Timestamp(end_date).normalize() + pd.Timedelta(days=1)
+
+
+def month_bounds(start_date, end_date):
+    # Perluas rentang tanggal ke bulan penuh: hasil load per bulan bisa dipakai ulang untuk
+    # rentang tanggal lain di bulan yang sama (filter harian tetap dilakukan FilterIndex)
+    start = pd.Timestamp(start_date).to_period('M')
+    end = pd.Timestamp(end_date).to_period('M')
+    return start.start_time.date(), end.end_time.date()
+
+
+def apply_row_filters(df, years=None, statuses=None, start_date=None, end_date=None):
+    # Filter yang sama dengan sidebar: tahun pembelian, rentang tanggal & status order (None = tanpa filter)
+    mask = pd.Series(True, index=df.index)
+    if years is not None:
+        mask &= df[TIMESTAMP_COLUMN].dt.year.isin(years)
+    if start_date is not None and end_date is not None:
+        start, end = date_bounds(start_date, end_date)
+        mask &= (df[TIMESTAMP_COLUMN] >= start) & (df[TIMESTAMP_COLUMN] < end)
+    if statuses is not None:
+        mask &= df[STATUS_COLUMN].isin(statuses)
+    return df[mask]
+
+
+def _arrow_filter(years=None, statuses=None, start_date=None, end_date=None, partitioned=False):
+    # partitioned=True: predicate tahun / bulan juga dievaluasi di kolom partisi, jadi folder
+    # bulan yang tidak terpilih tidak dibuka sama sekali
+    exprs = []
+    ts = ds.field(TIMESTAMP_COLUMN)
+    if years is not None:
+        year_expr = ds.scalar(False)
+        for start, end in year_ranges(years):
+            year_expr = year_expr | ((ts >= start.to_pydatetime()) & (ts < end.to_pydatetime()))
+        if partitioned:
+            year_expr = ds.field('purchase_year').isin([int(y) for y in years]) & year_expr
+        exprs.append(year_expr)
+    if start_date is not None and end_date is not None:
+        start, end = date_bounds(start_date, end_date)
+        date_expr = (ts >= start.to_pydatetime()) & (ts < end.to_pydatetime())
+        if partitioned:
+            last = end - pd.Timedelta(days=1)
+            month = ds.field('purchase_year').cast(pa.int32()) * 12 + ds.field('purchase_month').cast(pa.int32())
+            date_expr = (month >= start.year * 12 + start.month) & (month <= last.year * 12 + last.month) & date_expr
+        exprs.append(date_expr)
+    if statuses is not None:
+        exprs.append(ds.field(STATUS_COLUMN).isin(list(statuses)))
+
+    expr = None
+    for e in exprs:
+        expr = e if expr is None else expr & e
+    return expr
+
+
+def sql_where(years=None, statuses=None, start_date=None, end_date=None):
+    # Filter sidebar -> (klausa WHERE, parameter) untuk query SQL berparameter (sqlite / duckdb)
+    clauses, params = [], []
+    if years is not None:
+        ranges = year_ranges(years)
+        if ranges:
+            clauses.append('(' + ' OR '.join(
+                f'({TIMESTAMP_COLUMN} >= ? AND {TIMESTAMP_COLUMN} < ?)' for _ in ranges) + ')')
+            for start, end in ranges:
+                params += [str(start), str(end)]
+        else:
+            clauses.append('1 = 0')
+    if start_date is not None and end_date is not None:
+        clauses.append(f'{TIMESTAMP_COLUMN} >= ? AND {TIMESTAMP_COLUMN} < ?')
+        params += [str(bound) for bound in date_bounds(start_date, end_date)]
+    if statuses is not None:
+        if statuses:
+            clauses.append(f'{STATUS_COLUMN} IN ({", ".join("?" for _ in statuses)})')
+            params += list(statuses)
+        else:
+            clauses.append('1 = 0')
+    return (' WHERE ' + ' AND '.join(clauses)) if clauses else '', params
+
+
+def filter_options_from_frame(df):
+    # Opsi sidebar: daftar tahun, status, dan batas tanggal per tahun
+    ts = df[TIMESTAMP_COLUMN].dropna()
+    year_bounds = ts.groupby(ts.dt.year).agg(['min', 'max'])
+    return {
+        'years': sorted(year_bounds.index.tolist()),
+        'statuses': sorted(df[STATUS_COLUMN].dropna().unique()),
+        'year_bounds': year_bounds
+    }
+
+
+def file_versions(paths):
+    # (nama, ukuran, mtime) tiap file: berubah kalau isi file sumber berubah
+    versions = []
+    for path in sorted(paths):
+        stat = os.stat(path)
+        versions.append([os.path.basename(path), stat.st_size, stat.st_mtime_ns])
+    return versions
+
+
+# Field DataConfig yang menentukan isi dataset. Field lain (cache, chart, profiler, mode engine, ...)
+# tidak ikut versi, jadi mengubahnya tidak membatalkan cache RFM / chart, dataset bersama, atau
+# feature store, dan proses dengan pengaturan UI berbeda tetap berbagi file yang sama
+VERSION_FIELDS = ('source', 'path', 'translation_path', 'table')
+
+
+def dataset_version(config, source):
+    # Fingerprint pendek dataset: identitas sumber data + versi file sumber
+    identity = {field: getattr(config, field) for field in VERSION_FIELDS}
+    payload = json.dumps({'config': identity, 'source': source.version()}, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()[:16]
+
+
+# ===========================
+# SUMBER DATA
+# ===========================
+class DataSource:
+    def load(self, columns=None, years=None, statuses=None, start_date=None, end_date=None):
+        raise NotImplementedError
+
+    def version(self):
+        raise NotImplementedError
+
+    def filter_options(self):
+        return filter_options_from_frame(self.load(columns=[TIMESTAMP_COLUMN, STATUS_COLUMN]))
+
+    # Ingest incremental: checkpoint() = posisi data yang sudah dimuat, load_new() = baris setelahnya.
+    # None dari checkpoint() berarti backend tidak mendukung append -> dashboard reload penuh.
+    def checkpoint(self):
+        return None
+
+    def load_new(self, checkpoint, columns=None):
+        # Return (baris_baru atau None, checkpoint_baru), atau None kalau data lama ikut berubah
+        return None
+
+    # Mode streaming: dataset pyarrow (lazy, dipartisi per bulan) yang dibaca per chunk.
+    # None berarti backend tidak bisa di-scan tanpa memuat seluruh tabel.
+    def scan(self):
+        return None
+
+
+def _tail_digest(path, offset, size=4096):
+    # Hash byte terakhir sebelum offset: kalau berubah (atau hash awal file berubah), file ditulis
+    # ulang, bukan di-append
+    with open(path, 'rb') as f:
+        f.seek(max(offset - size, 0))
+        return hashlib.sha1(f.read(min(offset, size))).hexdigest()
+
+
+def _with_filter_columns(columns, years, statuses, start_date=None):
+    # Kolom filter perlu ikut dibaca kalau filter diterapkan di pandas
+    if columns is None:
+        return None
+    by_time = years if years is not None else start_date
+    extra = [c for c, used in ((TIMESTAMP_COLUMN, by_time), (STATUS_COLUMN, statuses))
+             if used is not None and c not in columns]
+    return list(columns) + extra
+
+
+class CsvSource(DataSource):
+    # Default backend: CSV + translation, lewat snapshot Parquet kalau tersedia
+    def __init__(self, path=MAIN_DATA_PATH, translation_path=TRANSLATION_PATH, workers=None):
+        self.path = path
+        self.translation_path = translation_path
+        self.workers = workers
+
+    def version(self):
+        return source_fingerprint(self.path, self.translation_path)
+
+    def load(self, columns=None, years=None, statuses=None, start_date=None, end_date=None):
+        fingerprint = source_fingerprint(self.path, self.translation_path)
+        snapshot_path = snapshot_path_for(self.path)
+        # Snapshot selalu dipartisi per tahun/bulan -> hanya folder bulan terpilih yang dibaca
+        filters = _arrow_filter(years, statuses, start_date, end_date, partitioned=True)
+
+        if filters is not None:
+            df = read_snapshot(snapshot_path, fingerprint, columns=columns, filters=filters)
+            if df is not None:
+                return df
+
+        # Snapshot belum valid: load_dataset parse CSV + bangun snapshot, lalu filter di pandas
+        df = load_dataset(self.path, self.translation_path,
+                          columns=_with_filter_columns(columns, years, statuses, start_date),
+                          workers=self.workers)
+        df = apply_row_filters(df, years, statuses, start_date, end_date)
+        if columns is not None:
+            df = df[[c for c in columns if c in df.columns]]
+        return df
+
+    def scan(self):
+        # Snapshot dibangun langsung dari CSV per rentang byte, tanpa memuat seluruh file
+        fingerprint = source_fingerprint(self.path, self.translation_path)
+        snapshot_path = snapshot_path_for(self.path)
+        dataset = open_snapshot(snapshot_path, fingerprint)
+        if dataset is None:
+            df_translation = pd.read_csv(self.translation_path)
+            write_snapshot(iter_csv_tables(self.path, df_translation, self.workers), snapshot_path, fingerprint)
+            dataset = open_snapshot(snapshot_path, fingerprint)
+        return dataset
+
+    def checkpoint(self):
+        offset = os.path.getsize(self.path)
+        return {
+            'offset': offset,
+            'head': _tail_digest(self.path, min(offset, 4096)),
+            'tail': _tail_digest(self.path, offset),
+            'translation': file_versions([self.translation_path])
+        }
+
+    def load_new(self, checkpoint, columns=None):
+        offset = checkpoint['offset']
+        if (os.path.getsize(self.path) < offset
+                or _tail_digest(self.path, min(offset, 4096)) != checkpoint['head']
+                or _tail_digest(self.path, offset) != checkpoint['tail']
+                or file_versions([self.translation_path]) != checkpoint['translation']):
+            return None
+
+        df, new_offset = read_appended_rows(self.path, self.translation_path, offset)
+        if df is not None and columns is not None:
+            df = df[[c for c in columns if c in df.columns]]
+        return df, dict(checkpoint, offset=new_offset, tail=_tail_digest(self.path, new_offset))
+
+
+class ParquetSource(DataSource):
+    # Folder berisi file Parquet yang sudah di-merge dengan translation, sebaiknya dipartisi per
+    # tahun/bulan pembelian (hasil export_dataset) supaya filter sidebar bisa memangkas folder
+    def __init__(self, path):
+        self.path = path
+
+    def _dataset(self, files=None):
+        # files: subset file di dalam folder (untuk ingest incremental)
+        if files is None:
+            return open_partitioned(self.path)
+        return open_partitioned(files, partition_base_dir=self.path)
+
+    def version(self):
+        return file_versions(self._dataset().files)
+
+    def load(self, columns=None, years=None, statuses=None, start_date=None, end_date=None):
+        dataset = self._dataset()
+        filters = _arrow_filter(years, statuses, start_date, end_date, partitioned=is_partitioned(dataset))
+        return read_partitioned(dataset, columns=columns, filters=filters)
+
+    def checkpoint(self):
+        # File Parquet baru (mis. partisi hari ini) dianggap append; file lama tidak boleh berubah
+        return {path: [os.stat(path).st_size, os.stat(path).st_mtime_ns] for path in self._dataset().files}
+
+    def load_new(self, checkpoint, columns=None):
+        current = self.checkpoint()
+        if any(current.get(path) != version for path, version in checkpoint.items()):
+            return None
+        added = sorted(path for path in current if path not in checkpoint)
+        if not added:
+            return None, checkpoint
+
+        return read_partitioned(self._dataset(added), columns=columns), current
+
+    def scan(self):
+        return self._dataset()
+
+
+class SqlSource(DataSource):
+    # Tabel orders (sudah di-merge dengan translation) di file SQLite / DuckDB
+    def __init__(self, path, table='orders', dialect='sqlite'):
+        self.path = path
+        self.table = table
+        self.dialect = dialect
+
+    def version(self):
+        return file_versions([self.path])
+
+    def _connect(self):
+        if self.dialect == 'duckdb':
+            import duckdb
+            return duckdb.connect(self.path, read_only=True)
+        return sqlite3.connect(f'file:{self.path}?mode=ro', uri=True)
+
+    def _query(self, sql, params=()):
+        con = self._connect()
+        try:
+            if self.dialect == 'duckdb':
+                return con.execute(sql, list(params)).df()
+            return pd.read_sql_query(sql, con, params=list(params))
+        finally:
+            con.close()
+
+    def _table_columns(self):
+        return self._query(f'SELECT * FROM "{self.table}" LIMIT 0').columns.tolist()
+
+    def load(self, columns=None, years=None, statuses=None, start_date=None, end_date=None):
+        if columns is None:
+            select = '*'
+        else:
+            available = self._table_columns()
+            select = ', '.join(f'"{c}"' for c in columns if c in available)
+        where, params = sql_where(years, statuses, start_date, end_date)
+        df = self._query(f'SELECT {select} FROM "{self.table}"{where}', params)
+
+        # SQLite menyimpan timestamp sebagai teks
+        for col in DATETIME_COLUMNS:
+            if col in df.columns and not pd.api.types.is_datetime64_any_dtype(df[col]):
+                df[col] = pd.to_datetime(df[col], errors='coerce')
+        return df
+
+    def filter_options(self):
+        year_expr = (f'year({TIMESTAMP_COLUMN})' if self.dialect == 'duckdb'
+                     else f"CAST(strftime('%Y', {TIMESTAMP_COLUMN}) AS INTEGER)")
+        bounds = self._query(
+            f'SELECT {year_expr} AS year, MIN({TIMESTAMP_COLUMN}) AS "min", MAX({TIMESTAMP_COLUMN}) AS "max" '
+            f'FROM "{self.table}" WHERE {TIMESTAMP_COLUMN} IS NOT NULL GROUP BY 1 ORDER BY 1'
+        )
+        statuses = self._query(
+            f'SELECT DISTINCT {STATUS_COLUMN} FROM "{self.table}" WHERE {STATUS_COLUMN} IS NOT NULL'
+        )[STATUS_COLUMN]
+
+        year_bounds = bounds.set_index('year')[['min', 'max']].apply(pd.to_datetime)
+        year_bounds.index = year_bounds.index.astype(int)
+        return {
+            'years': year_bounds.index.tolist(),
+            'statuses': sorted(statuses),
+            'year_bounds': year_bounds
+        }
+
+
+def get_data_source(config=None):
+    config = config or load_config()
+    if config.source == 'csv':
+        return CsvSource(config.path, config.translation_path, workers=config.ingest_workers or None)
+    if config.source == 'parquet':
+        return ParquetSource(config.path)
+    if config.source in ('sqlite', 'duckdb'):
+        return SqlSource(config.path, table=config.table, dialect=config.source)
+    raise ValueError(f"Sumber data tidak dikenal: {config.source!r} (pilih csv, parquet, sqlite, atau duckdb)")
+
+
+# ===========================
+# EXPORT KE BACKEND LAIN
+# ===========================
+def export_dataset(df, source, path, table='orders'):
+    # Tulis dataset yang sudah di-merge ke format backend lain
+    if source == 'parquet':
+        # Partisi tahun/bulan pembelian; folder bulan yang ditulis ulang diganti isinya
+        legacy = os.path.join(path, 'part-0.parquet')  # layout lama (satu file tanpa partisi)
+        if os.path.exists(legacy):
+            os.remove(legacy)
+        write_partitioned(df, path, existing_data_behavior='delete_matching')
+    elif source == 'sqlite':
+        con = sqlite3.connect(path)
+        try:
+            out = df.copy()
+            for col in DATETIME_COLUMNS:
+                if col in out.columns:
+                    out[col] = out[col].dt.strftime('%Y-%m-%d %H:%M:%S')
+            out.to_sql(table, con, if_exists='replace', index=False)
+            con.execute(f'CREATE INDEX IF NOT EXISTS "idx_{table}_filters" '
+                        f'ON "{table}" ({TIMESTAMP_COLUMN}, {STATUS_COLUMN})')
+            con.commit()
+        finally:
+            con.close()
+    elif source == 'duckdb':
+        import duckdb
+        con = duckdb.connect(path)
+        try:
+            con.register('df_export', df)
+            con.execute(f'CREATE OR REPLACE TABLE "{table}" AS SELECT * FROM df_export')
+        finally:
+            con.close()
+    else:
+        raise ValueError(f"Format export tidak dikenal: {source!r}")
+
+
+if __name__ == '__main__':
+    # Pemakaian: python data_sources.py <parquet|sqlite|duckdb> <path_tujuan>
+    # Membaca sumber data dari konfigurasi aktif lalu menulisnya ke backend tujuan
+    target, target_path = sys.argv[1], sys.argv[2]
+    export_dataset(get_data_source().load(), target, target_path)
+    print(f"Dataset diexport ke {target_path} ({target})")
@@ -0,0 +1,104 @@
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from filter_index import RowSelection
+
+PAGE_SIZES = (25, 50, 100, 250)
+
+
+# ===========================
+# TABEL DATA BERHALAMAN (SERVER-SIDE)
+# ===========================
+# Browser hanya menerima satu halaman baris; tabel lengkap tidak pernah diserialisasi. Search & sort
+# dijalankan di server atas posisi baris, memakai kode yang sudah ada di dataset kompak:
+# - ID (kode integer, lookup terurut): urutan kode = urutan string, search prefix = rentang kode
+#   hasil binary search di lookup, lalu satu perbandingan per baris
+# - kategori: search = lookup table kode kategori yang cocok, sort per kode
+# - angka & timestamp: sort stabil atas nilai
+# Angka tetap numerik sampai ditampilkan (format R$ / % lewat column_config di dashboard).
+
+class Page(NamedTuple):
+    frame: pd.DataFrame      # baris halaman ini, ID sudah di-decode
+    number: int              # nomor halaman (mulai 1)
+    pages: int
+    first_row: int           # nomor baris pertama halaman (mulai 1, 0 = tabel kosong)
+    total_rows: int
+
+
+def _decode(codes, lookup):
+    # Kode ID (nullable) -> ID asli, NaN tetap None
+    codes = codes.to_numpy(dtype=np.int64, na_value=-1)
+    ids = lookup.take(np.maximum(codes, 0)).to_numpy(dtype=object)
+    ids[codes < 0] = None
+    return ids
+
+
+class PagedTable:
+    # rows: DataFrame (mis. tabel agregat) atau RowSelection (baris hasil filter sidebar);
+    # id_lookup: lookup dari compact_frame untuk kolom ID yang ditampilkan sebagai string asli.
+    # search() / sort() mengembalikan PagedTable baru, page() hanya mengambil baris satu halaman.
+
+    def __init__(self, rows, id_lookup=None, columns=None, positions=None):
+        if isinstance(rows, RowSelection):
+            rows, positions = rows.df, rows.positions if positions is None else positions
+        self.df = rows
+        self.id_lookup = {col: lookup for col, lookup in (id_lookup or {}).items() if col in rows.columns}
+        self.columns = list(rows.columns if columns is None else columns)
+        self.positions = np.arange(len(rows)) if positions is None else positions
+
+    def __len__(self):
+        return len(self.positions)
+
+    def _with(self, positions):
+        return PagedTable(self.df, self.id_lookup, self.columns, positions)
+
+    def _values(self, col):
+        return self.df[col].take(self.positions)
+
+    def searchable_columns(self):
+        # Kolom yang punya index untuk search: ID, kategori, dan teks
+        return [col for col in self.columns
+                if col in self.id_lookup or isinstance(self.df[col].dtype, pd.CategoricalDtype)
+                or pd.api.types.is_string_dtype(self.df[col].dtype)]
+
+    def search(self, col, text):
+        # ID: prefix (case-sensitive, ID Olist berupa hex huruf kecil); kategori & teks: substring
+        # tanpa membedakan huruf besar/kecil. Teks kosong = tanpa filter
+        if not col or not text:
+            return self
+        if col in self.id_lookup:
+            lookup = self.id_lookup[col]
+            lo = int(lookup.searchsorted(text, side='left'))
+            hi = int(lookup.searchsorted(text + '\U0010ffff', side='left'))
+            codes = self._values(col).to_numpy(dtype=np.int64, na_value=-1)
+            mask = (codes >= lo) & (codes < hi)
+        elif isinstance(self.df[col].dtype, pd.CategoricalDtype):
+            categories = self.df[col].cat.categories
+            lut = np.r_[categories.astype(str).str.contains(text, case=False, regex=False), False]
+            # Kode -1 (NaN) -> elemen terakhir lut (False)
+            mask = lut[self._values(col).cat.codes.to_numpy()]
+        else:
+            mask = self._values(col).astype(str).str.contains(text, case=False, regex=False).to_numpy()
+        return self._with(self.positions[mask])
+
+    def sort(self, col, ascending=True):
+        # Sort stabil: baris dengan nilai sama tetap dalam urutan sebelumnya, NaN selalu di akhir
+        if not col:
+            return self
+        values = self._values(col).reset_index(drop=True)
+        order = values.sort_values(ascending=ascending, kind='stable', na_position='last').index.to_numpy()
+        return self._with(self.positions[order])
+
+    def page(self, number=1, size=PAGE_SIZES[0]):
+        pages = max(1, -(-len(self.positions) // size))
+        number = min(max(1, int(number)), pages)
+        start = (number - 1) * size
+        positions = self.positions[start:start + size]
+
+        frame = self.df[self.columns].take(positions).reset_index(drop=True)
+        for col, lookup in self.id_lookup.items():
+            if col in self.columns:
+                frame[col] = _decode(frame[col], lookup)
+        return Page(frame, number, pages, start + 1 if len(positions) else 0, len(self.positions))
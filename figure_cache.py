@@ -0,0 +1,110 @@
+import hashlib
+import io
+import json
+import threading
+from collections import OrderedDict
+
+import matplotlib.pyplot as plt
+from PIL import Image
+
+# Opsi savefig sama dengan st.pyplot supaya gambar dari cache identik dengan render langsung
+SAVEFIG_OPTIONS = {'bbox_inches': 'tight', 'dpi': 200}
+FORMATS = ('png', 'svg')
+
+# Streamlit mengecilkan gambar raster yang lebih lebar dari ini (2 x 730 px) di setiap tampil;
+# resize dilakukan sekali saat render supaya cache hit tidak perlu decode/encode ulang PNG
+MAX_IMAGE_WIDTH = 2 * 730
+
+
+def filter_state_hash(*parts):
+    # Hash stabil dari state filter (tahun, tanggal, status, versi dataset, ...)
+    payload = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode()).hexdigest()[:16]
+
+
+def _fit_width(png, max_width=MAX_IMAGE_WIDTH):
+    image = Image.open(io.BytesIO(png))
+    width, height = image.size
+    if width <= max_width:
+        return png
+    resized = image.resize((max_width, int(1.0 * height * max_width / width)), resample=Image.BILINEAR)
+    buffer = io.BytesIO()
+    resized.save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+def render_figure(fig, fmt='png'):
+    # Figure matplotlib -> bytes (PNG/SVG), figure langsung ditutup
+    buffer = io.BytesIO()
+    try:
+        fig.savefig(buffer, format=fmt, **SAVEFIG_OPTIONS)
+    finally:
+        plt.close(fig)
+    if fmt == 'png':
+        return _fit_width(buffer.getvalue())
+    return buffer.getvalue()
+
+
+class FigureCache:
+    # Cache gambar chart hasil render, key = (chart id, hash state filter, tema, format).
+    # LRU dengan batas total ukuran bytes; chart yang sudah ada di cache tidak menyentuh
+    # matplotlib sama sekali. Satu instance dipakai bersama semua sesi (st.cache_resource),
+    # jadi akses dilindungi lock.
+
+    def __init__(self, max_bytes=64 * 1024 * 1024, fmt='png'):
+        if fmt not in FORMATS:
+            raise ValueError(f"Format figure {fmt!r} tidak dikenal, pilih salah satu dari {FORMATS}")
+        self.max_bytes = max_bytes
+        self.fmt = fmt
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            image = self._entries.get(key)
+            if image is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return image
+
+    def put(self, key, image):
+        with self._lock:
+            if key in self._entries:
+                self.total_bytes -= len(self._entries.pop(key))
+            # Gambar yang lebih besar dari seluruh cap tidak disimpan
+            if len(image) > self.max_bytes:
+                return
+            self._entries[key] = image
+            self.total_bytes += len(image)
+            while self.total_bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.total_bytes -= len(evicted)
+
+    def render(self, chart_id, state, theme, draw):
+        # draw() membangun dan mengembalikan Figure; hanya dipanggil kalau cache miss
+        key = (chart_id, state, theme, self.fmt)
+        image = self.get(key)
+        if image is None:
+            image = render_figure(draw(), self.fmt)
+            self.put(key, image)
+        return image
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.total_bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'memory_mb': self.total_bytes / 1024 ** 2,
+                'max_mb': self.max_bytes / 1024 ** 2,
+                'hits': self.hits,
+                'misses': self.misses
+            }
@@ -0,0 +1,150 @@
+import numpy as np
+import pandas as pd
+
+import rfm
+
+TIMESTAMP_COLUMN = 'order_purchase_timestamp'
+STATUS_COLUMN = 'order_status'
+
+DAY_NS = 86_400 * 10**9
+
+
+def _to_ns(value):
+    # date / datetime / Timestamp -> int64 epoch nanodetik
+    return int(pd.Timestamp(value).value)
+
+
+class FilterIndex:
+    # Index filter sidebar yang dibangun sekali per dataset:
+    # - baris diurutkan berdasarkan order_purchase_timestamp (int64 epoch)
+    # - tahun & rentang tanggal -> slice hasil binary search (np.searchsorted)
+    # - status -> bitmap per status, dievaluasi hanya di dalam slice tanggal
+    # Biaya filter sebanding dengan jumlah baris di rentang tanggal, bukan seluruh dataset.
+
+    def __init__(self, df, ts_col=TIMESTAMP_COLUMN, status_col=STATUS_COLUMN, order=None):
+        self.ts_col, self.status_col = ts_col, status_col
+        ts = df[ts_col].to_numpy(dtype='datetime64[ns]').view('i8')
+
+        # NaT = int64 minimum, otomatis berada di awal urutan dan tidak masuk rentang tahun mana pun
+        self.order = np.argsort(ts, kind='stable') if order is None else order
+        self.sorted_ts = ts[self.order]
+        self._first_valid = int(np.searchsorted(self.sorted_ts, np.iinfo('i8').min, side='right'))
+
+        # Status sebagai kode (0 = NaN) dalam urutan timestamp; bitmap status = lut[kode]
+        status = df[status_col]
+        if not isinstance(status.dtype, pd.CategoricalDtype):
+            status = status.astype('category')
+        self.statuses = list(status.cat.categories)
+        codes = status.cat.codes.to_numpy() + 1
+        self.status_codes = codes.astype(np.min_scalar_type(len(self.statuses)))[self.order]
+
+        # Batas tahun -> rentang posisi [lo, hi) di array yang sudah terurut
+        valid_ts = self.sorted_ts[self._first_valid:]
+        if len(valid_ts):
+            first_year = pd.Timestamp(valid_ts[0]).year
+            last_year = pd.Timestamp(valid_ts[-1]).year
+        else:
+            first_year, last_year = 0, -1
+        self.year_slices = {}
+        for year in range(first_year, last_year + 1):
+            lo, hi = self._positions(_to_ns(f'{year}-01-01'), _to_ns(f'{year + 1}-01-01'))
+            if hi > lo:
+                self.year_slices[year] = (lo, hi)
+        self.years = sorted(self.year_slices)
+
+    def append(self, df, n_old):
+        # df = dataset lengkap dengan baris baru di akhir (posisi >= n_old). Urutan baris lama dipakai
+        # ulang: hanya baris baru yang di-sort, lalu dua run terurut di-merge (timsort, linear).
+        # Hasilnya sama dengan FilterIndex(df) yang dibangun dari nol.
+        new_ts = df[self.ts_col].iloc[n_old:].to_numpy(dtype='datetime64[ns]').view('i8')
+        new_order = np.argsort(new_ts, kind='stable')
+        perm = np.argsort(np.r_[self.sorted_ts, new_ts[new_order]], kind='stable')
+        order = np.r_[self.order, n_old + new_order][perm]
+        return FilterIndex(df, self.ts_col, self.status_col, order=order)
+
+    def _positions(self, start_ns, end_ns):
+        # Rentang posisi untuk timestamp di [start_ns, end_ns)
+        lo = max(int(np.searchsorted(self.sorted_ts, start_ns, side='left')), self._first_valid)
+        hi = max(int(np.searchsorted(self.sorted_ts, end_ns, side='left')), lo)
+        return lo, hi
+
+    def options(self):
+        # Format sama dengan DataSource.filter_options()
+        year_bounds = pd.DataFrame(
+            [(pd.Timestamp(self.sorted_ts[lo]), pd.Timestamp(self.sorted_ts[hi - 1]))
+             for lo, hi in self.year_slices.values()],
+            index=pd.Index(self.years, name=TIMESTAMP_COLUMN),
+            columns=['min', 'max']
+        )
+        return {
+            'years': self.years,
+            'statuses': sorted(self.statuses),
+            'year_bounds': year_bounds
+        }
+
+    def _slices(self, years=None, start_date=None, end_date=None):
+        if years is None:
+            slices = [(self._first_valid, len(self.sorted_ts))]
+        else:
+            slices = [self.year_slices[y] for y in sorted(set(years)) if y in self.year_slices]
+
+        # Rentang tanggal inklusif per hari: [start_date 00:00, end_date + 1 hari 00:00)
+        if start_date is not None and end_date is not None:
+            lo, hi = self._positions(_to_ns(start_date), _to_ns(end_date) + DAY_NS)
+            slices = [(max(a, lo), min(b, hi)) for a, b in slices]
+        return [(a, b) for a, b in slices if b > a]
+
+    def select(self, years=None, start_date=None, end_date=None, statuses=None):
+        # Return posisi baris (urutan asli dataframe) yang lolos semua filter
+        slices = self._slices(years, start_date, end_date)
+
+        if statuses is not None:
+            lut = np.zeros(len(self.statuses) + 1, dtype=bool)
+            wanted = set(statuses)
+            for code, status in enumerate(self.statuses, start=1):
+                lut[code] = status in wanted
+            parts = [lo + np.flatnonzero(lut[self.status_codes[lo:hi]]) for lo, hi in slices]
+        else:
+            parts = [np.arange(lo, hi) for lo, hi in slices]
+
+        positions = np.concatenate(parts) if parts else np.empty(0, dtype=np.intp)
+        return np.sort(self.order[positions])
+
+    def filter(self, df, years=None, start_date=None, end_date=None, statuses=None):
+        return df.take(self.select(years, start_date, end_date, statuses))
+
+    def select_rows(self, df, years=None, start_date=None, end_date=None, statuses=None):
+        # Seperti filter(), tapi tanpa menyalin seluruh kolom: hanya posisi baris yang disimpan
+        return RowSelection(df, self.select(years, start_date, end_date, statuses))
+
+
+class RowSelection:
+    # Pengganti df_filtered: df (read-only, mis. dataset bersama) + posisi baris yang lolos filter.
+    # Kolom baru diambil (take) saat dipakai, dan hanya kolom yang diminta. Interface sama dengan
+    # seleksi lazy lain (nunique, period, calculate_rfm), plus df_filtered[col] dan len(df_filtered).
+
+    def __init__(self, df, positions):
+        self.df = df
+        self.positions = positions
+
+    def __len__(self):
+        return len(self.positions)
+
+    def __getitem__(self, col):
+        return self.df[col].take(self.positions)
+
+    def frame(self, columns=None):
+        # DataFrame hasil filter untuk kolom tertentu (None = semua kolom)
+        df = self.df if columns is None else self.df[columns]
+        return df.take(self.positions)
+
+    def nunique(self, col):
+        return self[col].nunique()
+
+    def period(self):
+        # (min, max) order_purchase_timestamp
+        ts = self[TIMESTAMP_COLUMN]
+        return ts.min(), ts.max()
+
+    def calculate_rfm(self, rules=None):
+        return rfm.calculate_rfm(self.frame(rfm.RFM_COLUMNS), rules)
@@ -0,0 +1,112 @@
+import threading
+import time
+from typing import NamedTuple
+
+import pandas as pd
+
+from customer_features import CUSTOMER_COLUMN, CustomerFeatureStore
+from daily_cube import DailyCube
+from data_loader import DASHBOARD_COLUMNS, compact_append, compact_frame
+from data_sources import dataset_version, get_data_source
+from filter_index import FilterIndex
+
+
+# ===========================
+# INGEST INCREMENTAL
+# ===========================
+# Dataset yang tetap hidup di worker: refresh() hanya membaca baris yang ditambahkan sejak
+# checkpoint terakhir (byte offset CSV / file Parquet baru), lalu menambahkannya ke df kompak,
+# FilterIndex, DailyCube, dan feature store RFM tanpa membangun ulang dari nol. Kalau sumber data
+# tidak mendukung append atau data lama ikut berubah, refresh() jatuh ke reload penuh.
+
+class LiveState(NamedTuple):
+    df: pd.DataFrame
+    id_lookup: dict
+    version: str
+    filter_index: FilterIndex
+    daily_cube: DailyCube
+    checkpoint: object
+    loaded_at: float
+    customer_features: CustomerFeatureStore = None  # dibangun saat pertama dibutuhkan
+
+
+class LiveDataset:
+    # Satu instance dipakai bersama semua sesi (st.cache_resource). State diganti utuh (swap satu
+    # referensi) setelah update selesai, jadi sesi yang sedang render tetap membaca state lama
+    # yang konsisten.
+
+    def __init__(self, config, columns=DASHBOARD_COLUMNS):
+        self.config = config
+        self.columns = columns
+        self.source = get_data_source(config)
+        self._lock = threading.Lock()
+        self.state = self._full_load()
+
+    def _full_load(self, attempts=3):
+        # Checkpoint diambil sebelum & sesudah load: kalau sumber berubah di tengah jalan, load
+        # diulang supaya baris yang ditulis saat itu tidak hilang / terhitung dua kali
+        for _ in range(attempts):
+            checkpoint = self.source.checkpoint()
+            version = dataset_version(self.config, self.source)
+            df = self.source.load(columns=self.columns)
+            if self.source.checkpoint() == checkpoint:
+                break
+        df, id_lookup = compact_frame(df)
+        return LiveState(df, id_lookup, version, FilterIndex(df), DailyCube(df), checkpoint, time.time())
+
+    def refresh(self):
+        # Return jumlah baris baru yang di-append (-1 = reload penuh)
+        with self._lock:
+            state = self.state
+            if state.checkpoint is None:
+                # Backend tanpa dukungan append (SQL): reload penuh hanya kalau versinya berubah
+                if dataset_version(self.config, self.source) == state.version:
+                    return 0
+                self.state = self._full_load()
+                return -1
+
+            update = self.source.load_new(state.checkpoint, self.columns)
+            if update is None:
+                self.state = self._full_load()
+                return -1
+
+            new_rows, checkpoint = update
+            if new_rows is None or not len(new_rows):
+                if checkpoint != state.checkpoint:
+                    self.state = state._replace(checkpoint=checkpoint)
+                return 0
+
+            n_old = len(state.df)
+            df, id_lookup = compact_append(state.df, state.id_lookup, new_rows)
+            new_rows = df.iloc[n_old:]
+            version = dataset_version(self.config, self.source)
+            # Kolom ID yang kode lamanya bergeser (ID baru tidak semuanya di akhir urutan)
+            remapped = [col for col, lookup in state.id_lookup.items()
+                        if not id_lookup[col][:len(lookup)].equals(lookup)]
+            features = state.customer_features
+            if features is not None:
+                customer_map = None
+                if CUSTOMER_COLUMN in remapped:
+                    customer_map = id_lookup[CUSTOMER_COLUMN].get_indexer(state.id_lookup[CUSTOMER_COLUMN])
+                features = features.append(new_rows, df, version, customer_map)
+            self.state = LiveState(
+                df, id_lookup, version,
+                state.filter_index.append(df, n_old),
+                state.daily_cube.append(new_rows, df, remapped),
+                checkpoint, time.time(), features
+            )
+            return len(new_rows)
+
+    def customer_features(self, state):
+        # Feature store RFM untuk `state` (hasil baca self.state di awal rerun). Dibangun sekali
+        # saat pertama dibutuhkan (atau dibaca dari feature_store_dir), lalu di-append oleh
+        # refresh() bersama index & cube, jadi tidak dibangun ulang setiap ada baris baru.
+        if state.customer_features is not None:
+            return state.customer_features
+        with self._lock:
+            if self.state.version == state.version and self.state.customer_features is not None:
+                return self.state.customer_features
+            features = CustomerFeatureStore.open(state.df, state.version, self.config.feature_store_dir)
+            if self.state is state:
+                self.state = state._replace(customer_features=features)
+            return features
@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+
+QUANTILES = (0.25, 0.5, 0.75)
+
+
+class PaymentAnalytics:
+    # Semua angka Pertanyaan Bisnis 2 (chart, tabel, insight) dari satu hasil agregasi:
+    # satu groupby per metode bayar di cell cube + kuantil dari histogram nilai pembayaran.
+    # Tabel-tabel di bawah hanya proyeksi / urutan dari `summary`, tidak ada groupby ulang.
+
+    def __init__(self, cube_view, quantiles=QUANTILES):
+        g = cube_view.payment_measures()
+        q = cube_view.payment_quantiles(tuple(sorted(set(quantiles) | {0.5})))
+
+        n = g['payment_count']
+        mean = g['payment_sum'] / n.replace(0, np.nan)
+        var = g['payment_m2'] / (n - 1).where(n > 1)
+        self.summary = pd.DataFrame({
+            'frequency': g['rows'],                  # = value_counts() payment_type
+            'transactions': g['order_id_count'],     # = count(order_id)
+            'total_revenue': g['payment_sum'],
+            'avg_transaction': mean,
+            'median_transaction': q[0.5].reindex(g.index),
+            'std_transaction': np.sqrt(var),
+            'avg_installments': g['installments_sum'] / g['installments_count'].replace(0, np.nan)
+        })
+        self.quantiles = q.reindex(g.index)
+
+        total = self.summary[['frequency', 'total_revenue']].sum()
+        self.frequency_share = self.summary['frequency'] / total['frequency'] * 100
+        self.revenue_share = self.summary['total_revenue'] / total['total_revenue'] * 100
+
+    def frequency(self):
+        # payment_type, frequency — urut frekuensi terbanyak
+        counts = self.summary['frequency'].sort_values(ascending=False)
+        return pd.DataFrame({'payment_type': counts.index, 'frequency': counts.to_numpy()})
+
+    def revenue(self):
+        # payment_type, total_revenue — urut pendapatan terbesar
+        table = self.summary['total_revenue'].reset_index()
+        table.columns = ['payment_type', 'total_revenue']
+        return table.sort_values('total_revenue', ascending=False)
+
+    def analysis(self):
+        # payment_type, frequency (jumlah transaksi), total_revenue, avg_transaction
+        table = self.summary[['transactions', 'total_revenue', 'avg_transaction']].reset_index()
+        table.columns = ['payment_type', 'frequency', 'total_revenue', 'avg_transaction']
+        return table.sort_values('total_revenue', ascending=False)
+
+    def stats(self):
+        # count / sum / mean / median / std / rata-rata cicilan per metode bayar
+        return self.summary[['transactions', 'total_revenue', 'avg_transaction', 'median_transaction',
+                             'std_transaction', 'avg_installments']]
+
+    def top(self, column):
+        # Metode bayar dengan nilai `column` tertinggi + nilainya
+        payment_type = self.summary[column].idxmax()
+        return payment_type, self.summary.loc[payment_type, column]
@@ -0,0 +1,194 @@
+import functools
+import json
+import logging
+import os
+import threading
+import time
+import tracemalloc
+import uuid
+from collections import deque
+from contextlib import contextmanager
+
+import pandas as pd
+
+LOGGER_NAME = 'dashboard.profiler'
+HISTORY_RUNS = 20
+SECTION_COLUMNS = ['section', 'depth', 'wall_ms', 'cpu_ms', 'rows', 'cache', 'alloc_mb']
+
+logger = logging.getLogger(LOGGER_NAME)
+# Profiler yang sedang merekam di thread ini. Streamlit menjalankan script tiap sesi di thread
+# sendiri, jadi fungsi cache (load_data, calculate_rfm, ...) bisa melapor cache miss tanpa
+# menerima objek profiler sebagai argumen
+_active = threading.local()
+
+
+# ===========================
+# PROFILER PER RERUN
+# ===========================
+# Tiap rerun script (atau rerun fragment saja) = satu catatan berisi bagian-bagian yang diukur:
+# wall time, CPU time thread script, jumlah baris, status cache, dan alokasi memori (puncak
+# tracemalloc di atas alokasi saat bagian dimulai). Nonaktif = section() hanya yield objek kosong.
+# Catatan: tracemalloc & CPU time thread tidak memisahkan sesi lain yang berjalan bersamaan
+# (alokasi sesi lain ikut terhitung, kerja thread pool pyarrow / duckdb tidak terhitung CPU).
+
+class Section:
+    __slots__ = ('name', 'depth', 'wall_ms', 'cpu_ms', 'rows', 'cache', 'alloc_mb',
+                 '_wall', '_cpu', '_traced', '_peak')
+
+    def __init__(self, name, depth=0, cache=None):
+        self.name = name
+        self.depth = depth
+        self.cache = cache      # None = bukan bagian ber-cache, 'hit' / 'miss'
+        self.rows = None
+        self.wall_ms = self.cpu_ms = self.alloc_mb = None
+        self._traced = self._peak = 0
+
+    def as_dict(self):
+        return {'section': self.name, 'depth': self.depth, 'wall_ms': self.wall_ms, 'cpu_ms': self.cpu_ms,
+                'rows': self.rows, 'cache': self.cache, 'alloc_mb': self.alloc_mb}
+
+
+class RerunProfiler:
+    # Satu instance per sesi (st.session_state); riwayat HISTORY_RUNS rerun terakhir disimpan,
+    # tiap rerun yang selesai juga dikirim sebagai satu baris JSON ke logger LOGGER_NAME
+
+    def __init__(self, enabled=True, trace_memory=True, history=HISTORY_RUNS):
+        self.enabled = enabled
+        self.trace_memory = trace_memory
+        self.session_id = uuid.uuid4().hex[:12]
+        self.runs = deque(maxlen=history)
+        self._run = None
+        self._stack = []
+        self._count = 0
+
+    def begin_run(self, trigger='script'):
+        if not self.enabled:
+            return
+        if self._run is not None:
+            # Rerun sebelumnya terhenti di tengah (st.stop / exception / rerun baru)
+            self.end_run(complete=False)
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        self._count += 1
+        self._run = {'session': self.session_id, 'run': self._count, 'trigger': trigger,
+                     'started_at': time.time(), 'sections': []}
+        self._run_start = time.perf_counter()
+        self._stack = []
+        _active.profiler = self
+
+    def end_run(self, complete=True):
+        run, self._run = self._run, None
+        if run is None:
+            return None
+        if getattr(_active, 'profiler', None) is self:
+            _active.profiler = None
+        run['wall_ms'] = (time.perf_counter() - self._run_start) * 1000
+        run['complete'] = complete
+        run['sections'] = [section.as_dict() for section in run['sections']]
+        self.runs.append(run)
+        logger.info(json.dumps(run, default=str))
+        return run
+
+    @contextmanager
+    def section(self, name, cached=False):
+        # cached=True: status awal 'hit', berubah 'miss' kalau fungsi cache di dalamnya memanggil note_miss()
+        if not self.enabled:
+            yield Section(name)
+            return
+        implicit = self._run is None
+        if implicit:
+            # Rerun fragment: script utama tidak dijalankan, fragment jadi catatan rerun sendiri
+            self.begin_run(trigger=name)
+
+        section = Section(name, len(self._stack), 'hit' if cached else None)
+        self._run['sections'].append(section)
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            current, peak = tracemalloc.get_traced_memory()
+            if self._stack:
+                # Puncak bagian induk sejauh ini disimpan sebelum reset untuk bagian anak
+                self._stack[-1]._peak = max(self._stack[-1]._peak, peak)
+            tracemalloc.reset_peak()
+            section._traced, section._peak = current, current
+        self._stack.append(section)
+        section._wall, section._cpu = time.perf_counter(), time.thread_time()
+        try:
+            yield section
+        finally:
+            section.wall_ms = (time.perf_counter() - section._wall) * 1000
+            section.cpu_ms = (time.thread_time() - section._cpu) * 1000
+            if tracing and tracemalloc.is_tracing():
+                section._peak = max(section._peak, tracemalloc.get_traced_memory()[1])
+                section.alloc_mb = (section._peak - section._traced) / 1024 ** 2
+            if self._stack and self._stack[-1] is section:
+                self._stack.pop()
+            if tracing and self._stack:
+                self._stack[-1]._peak = max(self._stack[-1]._peak, section._peak)
+            if implicit:
+                self.end_run()
+
+    def profiled(self, name, cached=False):
+        # Decorator: seluruh isi fungsi (mis. fragment pertanyaan bisnis) sebagai satu bagian
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.section(name, cached):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def current(self):
+        return self._stack[-1] if self._stack else None
+
+    def last_run(self):
+        return self.runs[-1] if self.runs else None
+
+    def sections_frame(self, run=None):
+        run = run or self.last_run()
+        frame = pd.DataFrame(run['sections'] if run else [], columns=SECTION_COLUMNS)
+        frame['rows'] = frame['rows'].astype('Int64')
+        return frame
+
+    def history_frame(self):
+        return pd.DataFrame([
+            {'run': run['run'], 'trigger': run['trigger'], 'wall_ms': run['wall_ms'],
+             'sections': len(run['sections']), 'complete': run['complete']}
+            for run in self.runs
+        ], columns=['run', 'trigger', 'wall_ms', 'sections', 'complete'])
+
+    def export_jsonl(self):
+        return '\n'.join(json.dumps(run, default=str) for run in self.runs) + '\n'
+
+
+# ===========================
+# LAPORAN DARI DALAM BAGIAN
+# ===========================
+def note_miss():
+    # Dipanggil di badan fungsi ber-cache: badan hanya jalan saat cache miss
+    profiler = getattr(_active, 'profiler', None)
+    if profiler is None:
+        return
+    for section in reversed(profiler._stack):
+        if section.cache is not None:
+            section.cache = 'miss'
+            return
+
+
+def set_rows(rows):
+    # Jumlah baris yang diproses bagian terdalam yang sedang berjalan
+    profiler = getattr(_active, 'profiler', None)
+    section = profiler.current() if profiler is not None else None
+    if section is not None:
+        section.rows = int(rows)
+
+
+def configure_log(path):
+    # Log terstruktur: satu baris JSON per rerun ke file (JSON Lines) untuk monitoring.
+    # Aman dipanggil di setiap rerun: handler untuk path yang sama hanya dipasang sekali
+    logger.setLevel(logging.INFO)
+    for handler in logger.handlers:
+        if getattr(handler, 'baseFilename', None) == os.path.abspath(path):
+            return
+    handler = logging.FileHandler(path)
+    handler.setFormatter(logging.Formatter('%(message)s'))
+    logger.addHandler(handler)
@@ -0,0 +1,237 @@
+import os
+import tomllib
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_RULES_PATH = os.path.join(BASE_DIR, 'rfm_segments.toml')
+
+SCORE_LEVELS = 5
+SCORE_STRINGS = np.array([str(i) for i in range(SCORE_LEVELS * 111 + 1)], dtype=object)
+
+
+# ===========================
+# ATURAN SEGMENTASI
+# ===========================
+def load_segment_rules(path=None):
+    # Aturan segmen dibaca dari TOML supaya bisa diubah tanpa menyentuh kode
+    path = path or os.environ.get('DASHBOARD_RFM_RULES', DEFAULT_RULES_PATH)
+    with open(path, 'rb') as f:
+        rules = tomllib.load(f)
+
+    for rule in rules.get('segments', []):
+        if 'name' not in rule:
+            raise ValueError(f"Aturan segmen RFM tanpa 'name': {rule!r}")
+        for key in ('r', 'f', 'm'):
+            if key in rule:
+                lo, hi = rule[key]
+                if not 1 <= lo <= hi <= SCORE_LEVELS:
+                    raise ValueError(f"Rentang skor {key}={rule[key]!r} tidak valid di segmen {rule['name']!r}")
+    return rules
+
+
+def build_segment_lookup(rules):
+    # Evaluasi aturan sekali untuk semua 5x5x5 kombinasi skor -> lookup table index segmen
+    names = [rule['name'] for rule in rules.get('segments', [])]
+    default = rules.get('default', 'Lost')
+    if default not in names:
+        names.append(default)
+
+    levels = np.arange(1, SCORE_LEVELS + 1)
+    grid = dict(zip('rfm', np.meshgrid(levels, levels, levels, indexing='ij')))
+
+    lookup = np.full((SCORE_LEVELS,) * 3, names.index(default), dtype=np.int8)
+    assigned = np.zeros(lookup.shape, dtype=bool)
+    for i, rule in enumerate(rules.get('segments', [])):
+        match = ~assigned
+        for key in ('r', 'f', 'm'):
+            if key in rule:
+                lo, hi = rule[key]
+                match &= (grid[key] >= lo) & (grid[key] <= hi)
+        lookup[match] = i
+        assigned |= match
+
+    return np.array(names, dtype=object), lookup
+
+
+def segment_scores(r_score, f_score, m_score, rules=None):
+    # Skor integer (1-5) -> nama segmen, satu operasi indexing untuk semua customer
+    names, lookup = build_segment_lookup(rules or load_segment_rules())
+    return names[lookup[r_score - 1, f_score - 1, m_score - 1]]
+
+
+# ===========================
+# AGREGASI RFM (KERNEL VECTORIZED)
+# ===========================
+NAT_NS = np.iinfo(np.int64).min
+DAY_NS = 86_400 * 10**9
+RFM_COLUMNS = ['customer_unique_id', 'order_purchase_timestamp', 'order_id', 'total_payment_value']
+# Presisi nilai pembayaran di sumber data (sen). Monetary dibulatkan ke presisi ini sebelum scoring,
+# jadi semua jalur (groupby, chunk, prefix sum feature store, SQL) memberi skor & segmen yang sama
+# walaupun urutan penjumlahan float berbeda di digit terakhir
+MONETARY_DECIMALS = 2
+
+
+def _customer_keys(customer):
+    # Kode integer yang urutannya sama dengan urutan ID (kode hasil compact_frame sudah begitu)
+    if pd.api.types.is_integer_dtype(customer.dtype):
+        return customer.to_numpy(dtype=np.int64), None
+    codes, uniques = pd.factorize(customer, sort=True)
+    return codes.astype(np.int64), uniques
+
+
+def _segment_sum(values, starts):
+    # Sum per segmen (values sudah urut per customer) dengan Kahan summation dalam urutan
+    # baris asli — hasilnya sama persis dengan groupby().sum() pandas. NaN dilewati.
+    # Loop berjalan per posisi-dalam-segmen (maks. jumlah baris satu customer), bukan per baris.
+    n_groups = len(starts)
+    total = np.zeros(n_groups)
+    compensation = np.zeros(n_groups)
+
+    group_of_row = np.repeat(np.arange(n_groups), np.diff(np.r_[starts, len(values)]))
+    valid = ~np.isnan(values)
+    values, group_of_row = values[valid], group_of_row[valid]
+    if not len(values):
+        return total
+
+    # Posisi baris di dalam segmennya (0, 1, 2, ...)
+    rows = np.arange(len(values))
+    new_group = np.r_[True, group_of_row[1:] != group_of_row[:-1]]
+    position = rows - np.maximum.accumulate(np.where(new_group, rows, 0))
+
+    by_position = np.argsort(position, kind='stable')
+    offset = 0
+    for count in np.bincount(position):
+        idx = by_position[offset:offset + count]
+        offset += count
+        groups = group_of_row[idx]
+        y = values[idx] - compensation[groups]
+        t = total[groups] + y
+        c = t - total[groups] - y
+        compensation[groups] = np.where(np.isnan(c), 0.0, c)
+        total[groups] = t
+    return total
+
+
+def aggregate_customers(df_input):
+    # Satu sort-based groupby per customer: max timestamp (int64), count order, sum payment.
+    # Return DataFrame customer_id, last_purchase_ns, frequency, monetary (urut customer_id).
+    df_input = df_input[df_input['customer_unique_id'].notna()]
+    keys, uniques = _customer_keys(df_input['customer_unique_id'])
+
+    ts = df_input['order_purchase_timestamp'].to_numpy(dtype='datetime64[ns]').view(np.int64)
+    has_order = df_input['order_id'].notna().to_numpy().astype(np.int64)
+    payment = df_input['total_payment_value'].to_numpy(dtype=np.float64, na_value=np.nan)
+
+    order = np.argsort(keys, kind='stable')
+    sorted_keys = keys[order]
+    if len(sorted_keys):
+        starts = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+        last_purchase = np.maximum.reduceat(ts[order], starts)
+        frequency = np.add.reduceat(has_order[order], starts)
+        monetary = _segment_sum(payment[order], starts)
+        group_keys = sorted_keys[starts]
+    else:
+        last_purchase = frequency = group_keys = np.empty(0, dtype=np.int64)
+        monetary = np.empty(0, dtype=np.float64)
+
+    if uniques is None:
+        customer_id = pd.array(group_keys, dtype=df_input['customer_unique_id'].dtype)
+    else:
+        customer_id = uniques.take(group_keys)
+    return pd.DataFrame({
+        'customer_id': customer_id,
+        'last_purchase_ns': last_purchase,
+        'frequency': frequency,
+        'monetary': monetary
+    })
+
+
+def merge_customer_aggregates(parts):
+    # Gabungkan hasil aggregate_customers dari beberapa chunk (max / sum / sum per customer)
+    combined = pd.concat(parts, ignore_index=True)
+    keys, uniques = _customer_keys(combined['customer_id'])
+    order = np.argsort(keys, kind='stable')
+    sorted_keys = keys[order]
+    if not len(sorted_keys):
+        return combined
+    starts = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+    group_keys = sorted_keys[starts]
+    if uniques is None:
+        customer_id = pd.array(group_keys, dtype=combined['customer_id'].dtype)
+    else:
+        customer_id = uniques.take(group_keys)
+    return pd.DataFrame({
+        'customer_id': customer_id,
+        'last_purchase_ns': np.maximum.reduceat(combined['last_purchase_ns'].to_numpy()[order], starts),
+        'frequency': np.add.reduceat(combined['frequency'].to_numpy()[order], starts),
+        'monetary': _segment_sum(combined['monetary'].to_numpy()[order], starts)
+    })
+
+
+def _with_recency(aggregated):
+    # Recency = (snapshot_date - pembelian terakhir).days, snapshot_date = max timestamp + 1 hari
+    last = aggregated.pop('last_purchase_ns').to_numpy()
+    valid = last != NAT_NS
+    snapshot_ns = (last[valid].max() if valid.any() else 0) + DAY_NS
+    recency = (snapshot_ns - last) // DAY_NS
+    if not valid.all():
+        recency = np.where(valid, recency, np.nan)
+    aggregated.insert(1, 'recency', recency)
+    return aggregated
+
+
+def rfm_table(df_input):
+    # Tabel customer_id, recency, frequency, monetary dari raw rows
+    return _with_recency(aggregate_customers(df_input))
+
+
+def rfm_table_chunked(chunks, merge_every=8):
+    # Mode streaming: chunks = iterable DataFrame (mis. pd.read_csv(..., chunksize=...)).
+    # Memori dibatasi jumlah customer, bukan jumlah baris: partial aggregate di-merge
+    # setiap `merge_every` chunk.
+    partial, pending = None, []
+    for chunk in chunks:
+        pending.append(aggregate_customers(chunk[RFM_COLUMNS]))
+        if len(pending) >= merge_every:
+            partial = merge_customer_aggregates(([partial] if partial is not None else []) + pending)
+            pending = []
+    parts = ([partial] if partial is not None else []) + pending
+    if not parts:
+        return _with_recency(aggregate_customers(pd.DataFrame(columns=RFM_COLUMNS)))
+    return _with_recency(merge_customer_aggregates(parts))
+
+
+# ===========================
+# RFM
+# ===========================
+def score_rfm(rfm, rules=None):
+    rfm = rfm.copy()
+    rfm['monetary'] = rfm['monetary'].round(MONETARY_DECIMALS)
+
+    # Buat scoring
+    rfm['r_score'] = pd.qcut(rfm['recency'], q=5, labels=[5, 4, 3, 2, 1], duplicates='drop')
+    rfm['f_score'] = pd.qcut(rfm['frequency'].rank(method='first'), q=5, labels=[1, 2, 3, 4, 5], duplicates='drop')
+    rfm['m_score'] = pd.qcut(rfm['monetary'], q=5, labels=[1, 2, 3, 4, 5], duplicates='drop')
+
+    r = rfm['r_score'].to_numpy(dtype=np.int64)
+    f = rfm['f_score'].to_numpy(dtype=np.int64)
+    m = rfm['m_score'].to_numpy(dtype=np.int64)
+
+    # Gabungkan score (tanpa concat string per kolom): 125 string kombinasi skor, lalu indexing
+    rfm['rfm_score'] = SCORE_STRINGS[r * 100 + f * 10 + m]
+    rfm['rfm_score_sum'] = r + f + m
+
+    # Segmentasi: lookup table 5x5x5 dari aturan di rfm_segments.toml
+    rfm['segment'] = segment_scores(r, f, m, rules)
+
+    return rfm
+
+
+def calculate_rfm(df_input, rules=None):
+    return score_rfm(rfm_table(df_input), rules)
+
+
+def calculate_rfm_chunked(chunks, rules=None, merge_every=8):
+    return score_rfm(rfm_table_chunked(chunks, merge_every), rules)
@@ -0,0 +1,200 @@
+import json
+import os
+import shutil
+import uuid
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+try:
+    import fcntl
+except ImportError:
+    # Windows: file yang sedang di-map tidak bisa dihapus, jadi rmtree gagal dan folder dilewati
+    fcntl = None
+
+from data_loader import DASHBOARD_COLUMNS, LoadedDataset, compact_frame
+from data_sources import dataset_version, get_data_source
+
+ROWS_FILENAME = 'rows.arrow'
+LOCK_FILENAME = 'readers.lock'
+DATASET_PREFIX = 'dataset-'
+META_KEY = b'shared'
+MASK_SUFFIX = '.__mask__'
+
+
+# ===========================
+# DATASET BERSAMA (MEMORY-MAPPED ARROW)
+# ===========================
+# Dataset yang sudah dikompaksi (compact_frame) ditulis sekali per versi dataset sebagai file Arrow
+# IPC tanpa kompresi, lalu dibuka dengan memory map. Kolom DataFrame langsung menunjuk ke buffer
+# file itu (tanpa salinan), jadi semua sesi di satu proses memakai objek yang sama (cache_resource)
+# dan semua proses worker berbagi halaman yang sama di page cache OS. Array bersifat read-only.
+#
+# Supaya konversi ke pandas zero-copy, tiap kolom disimpan sebagai array primitif:
+# - category -> kode (int8/int16), kategori di metadata kolom
+# - datetime64[ns] -> int64 (NaT = int64 minimum, tetap NaT setelah di-view ulang)
+# - float -> NaN disimpan sebagai nilai, bukan null Arrow
+# - Int nullable (kode ID dengan NaN) -> nilai + kolom mask uint8
+# - lookup ID (string asli) -> satu file per kolom, dibaca sebagai ArrowStringArray
+#
+# Versi baru menggantikan versi lama: setelah versi baru selesai ditulis, folder versi lain dihapus,
+# kecuali yang masih dipakai proses lain. Tiap proses memegang flock shared di readers.lock folder
+# yang sedang di-map; folder yang lock-nya tidak bisa diambil exclusive dilewati.
+
+# Lock reader per folder, dipegang selama proses hidup (memory map dataset juga tidak pernah dilepas)
+_reader_locks = {}
+
+
+def dataset_dir(directory, version):
+    return os.path.join(directory, f'{DATASET_PREFIX}{version}')
+
+
+def _hold_reader_lock(path):
+    if fcntl is None or path in _reader_locks:
+        return
+    try:
+        lock = open(os.path.join(path, LOCK_FILENAME), 'a')
+    except OSError:
+        # Folder read-only: tidak bisa dikunci, dan proses ini juga tidak akan menghapusnya
+        return
+    fcntl.flock(lock, fcntl.LOCK_SH)
+    _reader_locks[path] = lock
+
+
+def prune_versions(directory, keep):
+    # Hapus folder dataset versi lain yang tidak sedang di-map proses mana pun
+    keep = os.path.basename(dataset_dir(directory, keep))
+    for name in os.listdir(directory):
+        path = os.path.join(directory, name)
+        # Folder .tmp-* bisa jadi sedang ditulis proses lain: tidak disentuh
+        if name == keep or not name.startswith(DATASET_PREFIX) or '.tmp-' in name or not os.path.isdir(path):
+            continue
+        if fcntl is None:
+            shutil.rmtree(path, ignore_errors=True)
+            continue
+        try:
+            lock = open(os.path.join(path, LOCK_FILENAME), 'a')
+        except OSError:
+            continue
+        with lock:
+            try:
+                fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                continue
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def _column_arrays(name, series):
+    # Return [(nama_kolom_arrow, array_numpy, metadata)]
+    dtype = series.dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        meta = {'kind': 'category', 'categories': list(dtype.categories), 'ordered': bool(dtype.ordered)}
+        return [(name, series.cat.codes.to_numpy(), meta)]
+    if pd.api.types.is_datetime64_dtype(dtype):
+        return [(name, series.to_numpy(dtype='datetime64[ns]').view('i8'), {'kind': 'datetime'})]
+    if isinstance(dtype, pd.api.extensions.ExtensionDtype) and hasattr(dtype, 'numpy_dtype'):
+        # Nullable Int / Float / boolean: nilai (NaN -> 0) + mask dari API publik pandas
+        mask = series.isna().to_numpy()
+        return [(name, series.to_numpy(dtype=dtype.numpy_dtype, na_value=0), {'kind': 'masked', 'dtype': str(dtype)}),
+                (name + MASK_SUFFIX, mask.view(np.uint8), {'kind': 'mask'})]
+    return [(name, series.to_numpy(), {'kind': 'numpy'})]
+
+
+def _write_table(path, table):
+    with pa.OSFile(path, 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+
+
+def write_shared(directory, dataset):
+    # dataset: LoadedDataset (df hasil compact_frame). Ditulis ke folder sementara lalu di-rename,
+    # jadi proses lain hanya pernah melihat folder yang lengkap
+    df, id_lookup, version = dataset
+    target = dataset_dir(directory, version)
+    tmp = f'{target}.tmp-{uuid.uuid4().hex[:8]}'
+    os.makedirs(tmp)
+    try:
+        fields, arrays = [], []
+        for col in df.columns:
+            for name, values, meta in _column_arrays(col, df[col]):
+                if values.dtype == bool:
+                    # Boolean Arrow di-pack per bit (tidak bisa zero-copy): disimpan sebagai uint8
+                    values, meta = values.view(np.uint8), dict(meta, bool=True)
+                fields.append(pa.field(name, pa.from_numpy_dtype(values.dtype),
+                                       metadata={META_KEY: json.dumps(meta)}))
+                arrays.append(pa.array(values, from_pandas=False))
+        schema = pa.schema(fields, metadata={META_KEY: json.dumps({'version': version, 'rows': len(df)})})
+        _write_table(os.path.join(tmp, ROWS_FILENAME), pa.Table.from_arrays(arrays, schema=schema))
+        for col, lookup in id_lookup.items():
+            values = pa.array(lookup.to_numpy(dtype=object), type=pa.large_string())
+            _write_table(os.path.join(tmp, f'{col}.arrow'), pa.table({col: values}))
+        try:
+            os.rename(tmp, target)
+        except OSError:
+            # Proses lain sudah lebih dulu menulis versi yang sama (dan sudah membersihkan versi lama)
+            pass
+        else:
+            prune_versions(directory, version)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    return target
+
+
+def _read_table(path):
+    # Buffer tabel menunjuk langsung ke memory map; map tetap hidup selama buffer dipakai
+    return pa.ipc.open_file(pa.memory_map(path, 'r')).read_all()
+
+
+def _numpy(column, dtype):
+    if column.num_chunks == 0:
+        return np.empty(0, dtype=dtype)
+    return column.chunk(0).to_numpy(zero_copy_only=True)
+
+
+def read_shared(path):
+    # Folder hasil write_shared -> LoadedDataset dengan kolom read-only di atas memory map
+    _hold_reader_lock(path)
+    table = _read_table(os.path.join(path, ROWS_FILENAME))
+    meta = json.loads(table.schema.metadata[META_KEY])
+    columns = {}
+    for field, column in zip(table.schema, table.columns):
+        info = json.loads(field.metadata[META_KEY])
+        values = _numpy(column, field.type.to_pandas_dtype())
+        if info.get('bool'):
+            values = values.view(bool)
+        kind = info['kind']
+        if kind == 'category':
+            dtype = pd.CategoricalDtype(info['categories'], ordered=info['ordered'])
+            columns[field.name] = pd.Categorical.from_codes(values, dtype=dtype)
+        elif kind == 'datetime':
+            columns[field.name] = values.view('datetime64[ns]')
+        elif kind == 'masked':
+            mask = _numpy(table.column(field.name + MASK_SUFFIX), np.uint8).view(bool)
+            array_type = pd.api.types.pandas_dtype(info['dtype']).construct_array_type()
+            columns[field.name] = array_type(values, mask)
+        elif kind == 'numpy':
+            columns[field.name] = values
+    # copy=False: satu block per kolom, tidak ada konsolidasi (= salinan) oleh pandas
+    df = pd.DataFrame(columns, index=pd.RangeIndex(meta['rows']), copy=False)
+
+    id_lookup = {}
+    for filename in sorted(os.listdir(path)):
+        col = filename[:-len('.arrow')]
+        if filename == ROWS_FILENAME or not filename.endswith('.arrow'):
+            continue
+        values = _read_table(os.path.join(path, filename)).column(col)
+        id_lookup[col] = pd.Index(pd.arrays.ArrowStringArray(values), name=col)
+    return LoadedDataset(df, id_lookup, meta['version'])
+
+
+def open_dataset(config, columns=DASHBOARD_COLUMNS):
+    # Dataset bersama untuk versi sumber data saat ini: dibaca dari shared_dir kalau sudah ada,
+    # kalau belum dimuat + dikompaksi sekali lalu ditulis (proses lain cukup membuka file-nya)
+    source = get_data_source(config)
+    version = dataset_version(config, source)
+    path = dataset_dir(config.shared_dir, version)
+    if not os.path.exists(os.path.join(path, ROWS_FILENAME)):
+        os.makedirs(config.shared_dir, exist_ok=True)
+        df, id_lookup = compact_frame(source.load(columns=columns))
+        write_shared(config.shared_dir, LoadedDataset(df, id_lookup, version))
+    return read_shared(path)
@@ -0,0 +1,157 @@
+import numpy as np
+import pandas as pd
+
+# ===========================
+# HYPERLOGLOG
+# ===========================
+# Register HLL disimpan sebagai array uint8 berukuran m = 2**p.
+# Merge dua sketch = np.maximum per register; estimasi punya standard error ~1.04 / sqrt(m).
+
+DEFAULT_PRECISION = 10
+
+
+def hash_values(values):
+    # Hash 64-bit deterministik (sama di semua proses), dipakai untuk ID string maupun kode integer
+    return pd.util.hash_array(np.asarray(values))
+
+
+def _bit_length(x):
+    # Panjang bit uint64 tanpa konversi float: isi semua bit di bawah MSB lalu popcount
+    x = x.copy()
+    for shift in (1, 2, 4, 8, 16, 32):
+        x |= x >> np.uint64(shift)
+    return np.bitwise_count(x).astype(np.uint8)
+
+
+def register_updates(values, p=DEFAULT_PRECISION):
+    # Nilai -> (index register, rank) untuk tiap elemen
+    h = hash_values(values)
+    idx = (h >> np.uint64(64 - p)).astype(np.int64)
+    rest = h & np.uint64((1 << (64 - p)) - 1)
+    rank = (64 - p) - _bit_length(rest) + 1
+    return idx, rank.astype(np.uint8)
+
+
+def estimate(registers):
+    # Estimasi cardinality dari register (bisa batch: axis terakhir = register)
+    registers = np.asarray(registers)
+    m = registers.shape[-1]
+    alpha = 0.7213 / (1 + 1.079 / m)
+    raw = alpha * m * m / np.sum(np.exp2(-registers.astype(np.float64)), axis=-1)
+
+    # Small range correction (linear counting) kalau masih banyak register kosong
+    zeros = np.sum(registers == 0, axis=-1)
+    with np.errstate(divide='ignore'):
+        linear = m * np.log(m / np.maximum(zeros, 1))
+    return np.where((raw <= 2.5 * m) & (zeros > 0), linear, raw)
+
+
+def relative_error(p=DEFAULT_PRECISION):
+    # Standard error relatif (1 sigma)
+    return 1.04 / np.sqrt(2 ** p)
+
+
+# ===========================
+# SKETCH PER HARI
+# ===========================
+class DailyDistinctSketch:
+    # Sketch HLL per (hari, status) untuk satu kolom ID.
+    # Union rentang tanggal dijawab dari sparse table per status (blok 2**k hari),
+    # jadi cukup merge 2 sketch per rentang: waktu konstan terhadap panjang rentang.
+    # Sparse table dibangun lazy per status saat pertama kali dipakai.
+
+    def __init__(self, days, status_codes, n_statuses, values, p=DEFAULT_PRECISION):
+        # days: int index hari (0 = hari pertama), status_codes: 0..n_statuses-1
+        self.p = p
+        self.m = 2 ** p
+        self.n_days = int(days.max()) + 1 if len(days) else 0
+        self.n_statuses = n_statuses
+
+        idx, rank = register_updates(values, p)
+        cell = (days.astype(np.int64) * n_statuses + status_codes.astype(np.int64)) * self.m + idx
+        registers = np.zeros(self.n_days * n_statuses * self.m, dtype=np.uint8)
+        np.maximum.at(registers, cell, rank)
+        self.registers = registers.reshape(self.n_days, n_statuses, self.m)
+        self._tables = {}
+
+    def union(self, other):
+        # Sketch baru = max register per (hari, status); hari disamakan dulu ke yang terpanjang.
+        # Dipakai saat append data baru: sketch baris baru di-union ke sketch lama.
+        if (self.p, self.n_statuses) != (other.p, other.n_statuses):
+            raise ValueError("Sketch dengan presisi / jumlah status berbeda tidak bisa di-union")
+        n_days = max(self.n_days, other.n_days)
+        registers = np.zeros((n_days, self.n_statuses, self.m), dtype=np.uint8)
+        registers[:self.n_days] = self.registers
+        np.maximum(registers[:other.n_days], other.registers, out=registers[:other.n_days])
+
+        merged = object.__new__(DailyDistinctSketch)
+        merged.p, merged.m = self.p, self.m
+        merged.n_days, merged.n_statuses = n_days, self.n_statuses
+        merged.registers = registers
+        merged._tables = {}
+        return merged
+
+    def _sparse_table(self, status):
+        if status not in self._tables:
+            levels = [self.registers[:, status, :]]
+            span = 1
+            while span * 2 <= self.n_days:
+                prev = levels[-1]
+                levels.append(np.maximum(prev[:-span], prev[span:]))
+                span *= 2
+            self._tables[status] = levels
+        return self._tables[status]
+
+    def merged_registers(self, day_slices, statuses):
+        # Union semua (rentang hari [lo, hi), status) -> satu array register
+        merged = np.zeros(self.m, dtype=np.uint8)
+        for status in statuses:
+            table = self._sparse_table(status)
+            for lo, hi in day_slices:
+                if hi <= lo:
+                    continue
+                k = (hi - lo).bit_length() - 1
+                np.maximum(merged, table[k][lo], out=merged)
+                np.maximum(merged, table[k][hi - 2 ** k], out=merged)
+        return merged
+
+    def estimate(self, day_slices, statuses):
+        return float(estimate(self.merged_registers(day_slices, statuses)))
+
+
+# ===========================
+# HISTOGRAM NILAI (KUANTIL)
+# ===========================
+# Kuantil dari histogram (nilai, jumlah baris). Histogram per cell bisa dijumlahkan, jadi median
+# untuk kombinasi filter apa pun cukup dari histogram gabungan tanpa menyentuh raw rows.
+# Dengan alpha=None nilai disimpan apa adanya (kuantil exact); dengan alpha, nilai dibulatkan ke
+# bucket logaritmik (error relatif <= alpha) supaya jumlah entry histogram terbatas.
+
+def log_bucket(values, alpha):
+    # Nilai > 0 -> representative bucket gamma^i (gaya DDSketch); nilai <= 0 dibiarkan
+    values = np.asarray(values, dtype=np.float64)
+    gamma = (1 + alpha) / (1 - alpha)
+    positive = values > 0
+    index = np.ceil(np.log(values, where=positive, out=np.zeros_like(values)) / np.log(gamma))
+    return np.where(positive, 2 * gamma ** index / (gamma + 1), values)
+
+
+def grouped_quantiles(groups, values, counts, q):
+    # groups, values: sudah urut per (grup, nilai); counts: jumlah baris per entry.
+    # Return array [n_grup] kuantil q dengan interpolasi linear seperti pandas
+    # (q=0.5 -> rata-rata dua nilai tengah, sama persis dengan groupby().median()).
+    counts = np.asarray(counts, dtype=np.int64)
+    if not len(counts):
+        return np.empty(0, dtype=np.float64)
+    starts = np.flatnonzero(np.r_[True, groups[1:] != groups[:-1]])
+    cum = np.cumsum(counts)
+    before = np.r_[0, cum[:-1]][starts]
+    n = np.add.reduceat(counts, starts)
+
+    pos = q * (n - 1)
+    lo_rank = np.floor(pos).astype(np.int64)
+    hi_rank = np.ceil(pos).astype(np.int64)
+    lo = values[np.searchsorted(cum, before + lo_rank, side='right')]
+    hi = values[np.searchsorted(cum, before + hi_rank, side='right')]
+    frac = pos - lo_rank
+    return np.where(frac == 0.5, (lo + hi) / 2, lo + (hi - lo) * frac)
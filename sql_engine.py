@@ -0,0 +1,185 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+import rfm
+from data_loader import snapshot_path_for
+from data_sources import STATUS_COLUMN, TIMESTAMP_COLUMN, dataset_version, get_data_source, sql_where
+
+CATEGORY_COLUMN = 'product_category_name_english'
+
+
+# ===========================
+# ENGINE SQL (DUCKDB)
+# ===========================
+# Alternatif DailyCube + pandas: setiap angka dashboard adalah satu query SQL berparameter yang
+# dijalankan DuckDB in-process (vectorized, paralel, bisa spill ke disk). Data dibaca langsung dari
+# snapshot / folder Parquet (tanpa salinan) atau dari tabel di file database DuckDB.
+# Jumlah floating point memakai fsum (Kahan) seperti groupby().sum() pandas, jadi hasilnya sama
+# dengan engine pandas (cek: benchmarks/bench_engines.py).
+
+def _parquet_glob(folder):
+    # Semua file Parquet di folder dataset (partisi bulan atau flat); file _common_metadata tidak ikut
+    return os.path.join(folder, '**', '*.parquet')
+
+
+class DuckDbAnalytics:
+    # Dipakai bersama semua sesi (st.cache_resource); tiap query memakai cursor sendiri karena
+    # satu koneksi DuckDB tidak boleh dipakai beberapa thread sekaligus.
+
+    def __init__(self, config):
+        import duckdb
+
+        source = get_data_source(config)
+        self.version = dataset_version(config, source)
+        if config.source == 'duckdb':
+            self.con = duckdb.connect(config.path, read_only=True)
+            self.relation = f'"{config.table}"'
+            self.filter_options = self._filter_options()
+            return
+
+        if config.source == 'csv':
+            source.scan()  # bangun snapshot Parquet kalau belum ada / kadaluarsa
+            folder = snapshot_path_for(config.path)
+        elif config.source == 'parquet':
+            folder = config.path
+        else:
+            raise ValueError(f"Engine duckdb mendukung sumber csv, parquet, atau duckdb, bukan {config.source!r}")
+        # Kolom partisi tidak dibaca: file per bulan sudah dipangkas lewat statistik min/max timestamp
+        # (DDL tidak bisa memakai parameter, path di-quote sebagai literal SQL)
+        self.con = duckdb.connect()
+        path = _parquet_glob(folder).replace("'", "''")
+        self.con.execute(
+            f"CREATE VIEW orders AS SELECT * FROM read_parquet('{path}', union_by_name = true, hive_partitioning = false)"
+        )
+        self.relation = 'orders'
+        self.filter_options = self._filter_options()
+
+    def query(self, sql, params=()):
+        cursor = self.con.cursor()
+        try:
+            return cursor.execute(sql, list(params)).df()
+        finally:
+            cursor.close()
+
+    def _filter_options(self):
+        # Format sama dengan DataSource.filter_options()
+        bounds = self.query(
+            f'SELECT year({TIMESTAMP_COLUMN}) AS year, MIN({TIMESTAMP_COLUMN}) AS "min", '
+            f'MAX({TIMESTAMP_COLUMN}) AS "max" FROM {self.relation} '
+            f'WHERE {TIMESTAMP_COLUMN} IS NOT NULL GROUP BY 1 ORDER BY 1'
+        )
+        statuses = self.query(
+            f'SELECT DISTINCT {STATUS_COLUMN} FROM {self.relation} WHERE {STATUS_COLUMN} IS NOT NULL'
+        )[STATUS_COLUMN]
+        year_bounds = bounds.set_index('year')[['min', 'max']].apply(pd.to_datetime)
+        year_bounds.index = year_bounds.index.astype(int)
+        return {
+            'years': year_bounds.index.tolist(),
+            'statuses': sorted(statuses),
+            'year_bounds': year_bounds
+        }
+
+    def select(self, years=None, start_date=None, end_date=None, statuses=None):
+        return SqlView(self, years, start_date, end_date, statuses)
+
+
+class SqlView:
+    # Hasil filter sidebar di engine SQL. Method-nya sama dengan CubeView (KPI, Q1, Q2) dan
+    # StreamingSelection (nunique, periode, RFM), jadi dashboard memakai objek ini untuk keduanya.
+
+    def __init__(self, engine, years=None, start_date=None, end_date=None, statuses=None):
+        self.engine = engine
+        self.where, self.params = sql_where(years, statuses, start_date, end_date)
+
+    def _query(self, select, conditions=(), group_by=None):
+        # Baris tanpa timestamp tidak pernah masuk cube, jadi di sini juga dikecualikan
+        conditions = [f'{TIMESTAMP_COLUMN} IS NOT NULL', *conditions]
+        where = self.where + (' AND ' if self.where else ' WHERE ') + ' AND '.join(conditions)
+        sql = f'SELECT {select} FROM {self.engine.relation}{where}'
+        if group_by:
+            sql += f' GROUP BY {group_by} ORDER BY {group_by}'
+        return self.engine.query(sql, self.params)
+
+    def _scalar(self, select):
+        return self._query(select).iloc[0, 0]
+
+    # ----- KPI -----
+    @property
+    def can_count_orders(self):
+        # COUNT(DISTINCT) langsung di raw rows, tidak bergantung pada sifat additive cube
+        return True
+
+    def total_orders(self):
+        return int(self._scalar('COUNT(DISTINCT order_id)'))
+
+    def total_revenue(self):
+        return float(self._scalar('COALESCE(fsum(total_payment_value), 0)'))
+
+    def avg_order_value(self):
+        value = self._scalar('fsum(total_payment_value) / COUNT(total_payment_value)')
+        return np.nan if pd.isna(value) else float(value)
+
+    def approx_distinct(self, col):
+        # DuckDB menghitung distinct exact secara paralel, estimasi HLL tidak diperlukan
+        return self.nunique(col), None
+
+    # ----- df_filtered -----
+    def nunique(self, col):
+        return int(self._scalar(f'COUNT(DISTINCT "{col}")'))
+
+    def period(self):
+        bounds = self._query(f'MIN({TIMESTAMP_COLUMN}), MAX({TIMESTAMP_COLUMN})')
+        return pd.Timestamp(bounds.iloc[0, 0]), pd.Timestamp(bounds.iloc[0, 1])
+
+    # ----- Pertanyaan Bisnis 1 -----
+    def revenue_by_category(self):
+        # df_filtered_q1 = dropna(product_id, price, kategori) lalu groupby kategori
+        return self._query(
+            f'{CATEGORY_COLUMN} AS category, fsum(price) AS total_revenue, '
+            'fsum(price) / COUNT(price) AS avg_order_value, COUNT(DISTINCT order_id) AS total_orders, '
+            'COUNT(product_id) AS total_items, fsum(review_score_avg) / COUNT(review_score_avg) AS avg_review',
+            ['product_id IS NOT NULL', 'price IS NOT NULL', f'{CATEGORY_COLUMN} IS NOT NULL'],
+            group_by='category'
+        )
+
+    # ----- Pertanyaan Bisnis 2 -----
+    def payment_measures(self):
+        # Kolom sama dengan CubeView.payment_measures() (input PaymentAnalytics). var_pop DuckDB
+        # memakai algoritma Welford, jadi M2 = var_pop * n tanpa selisih sum of squares
+        return self._query(
+            'payment_type, COUNT(*) AS "rows", COUNT(order_id) AS order_id_count, '
+            'COALESCE(fsum(total_payment_value), 0) AS payment_sum, '
+            'COALESCE(var_pop(total_payment_value) * COUNT(total_payment_value), 0) AS payment_m2, '
+            'COUNT(total_payment_value) AS payment_count, '
+            'COALESCE(fsum(max_installments), 0) AS installments_sum, COUNT(max_installments) AS installments_count',
+            ['payment_type IS NOT NULL'],
+            group_by='payment_type'
+        ).set_index('payment_type')
+
+    def payment_quantiles(self, qs=(0.5,)):
+        # quantile_cont = interpolasi linear, sama dengan quantile() pandas
+        select = ', '.join(f'quantile_cont(total_payment_value, {float(q)!r}) AS "q{i}"' for i, q in enumerate(qs))
+        table = self._query(
+            f'payment_type, {select}', ['payment_type IS NOT NULL', 'total_payment_value IS NOT NULL'],
+            group_by='payment_type'
+        ).set_index('payment_type')
+        table.columns = list(qs)
+        return table
+
+    # ----- Pertanyaan Bisnis 3 -----
+    def rfm_table(self):
+        # Agregat per customer di SQL; recency dihitung dengan rumus yang sama dengan rfm.rfm_table()
+        aggregated = self._query(
+            'customer_unique_id AS customer_id, epoch_ns(MAX(order_purchase_timestamp)) AS last_purchase_ns, '
+            'COUNT(order_id) AS frequency, COALESCE(fsum(total_payment_value), 0) AS monetary',
+            ['customer_unique_id IS NOT NULL'],
+            group_by='customer_id'
+        )
+        aggregated['last_purchase_ns'] = aggregated['last_purchase_ns'].fillna(rfm.NAT_NS).astype(np.int64)
+        aggregated['frequency'] = aggregated['frequency'].astype(np.int64)
+        return rfm._with_recency(aggregated)
+
+    def calculate_rfm(self, rules=None):
+        return rfm.score_rfm(self.rfm_table(), rules)
@@ -0,0 +1,192 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+
+import rfm
+from daily_cube import DailyCube
+from data_loader import COLUMN_SCHEMA, DASHBOARD_COLUMNS, _id_codes, is_partitioned
+from data_sources import STATUS_COLUMN, TIMESTAMP_COLUMN, _arrow_filter, dataset_version, get_data_source
+
+Q1_COLUMNS = ['product_category_name_english', 'order_id', 'product_id', 'price', 'review_score_avg']
+
+
+# ===========================
+# MODE STREAMING (OUT-OF-CORE)
+# ===========================
+# Dataset tidak pernah dimuat utuh: data dibaca per folder bulan pembelian dari dataset Parquet
+# terpartisi (snapshot CSV / folder Parquet), hanya kolom yang dibutuhkan, lalu direduksi menjadi
+# agregat kecil (cube harian, bitmap order, agregat per customer). Satu pass awal mengumpulkan
+# kamus global (lookup ID, kategori, batas tanggal) supaya tiap chunk dikompaksi dengan kode & dtype
+# yang sama dengan compact_frame() di mode in-memory, jadi semua angka dashboard sama.
+#
+# Satu order hanya punya satu timestamp pembelian, jadi order tidak pernah terpecah di dua chunk
+# bulan. RAM terpakai ~ lookup ID + satu bulan kolom terproyeksi + agregat.
+
+class StreamingDataset:
+    # Pengganti LoadedDataset + FilterIndex untuk mode streaming; dipakai bersama semua sesi
+    # (st.cache_resource), chunk selalu dibaca ulang dari disk.
+
+    def __init__(self, config, columns=DASHBOARD_COLUMNS, merge_every=8):
+        source = get_data_source(config)
+        self.dataset = source.scan()
+        if self.dataset is None:
+            raise ValueError(f"Mode streaming butuh sumber csv atau parquet, bukan {config.source!r}")
+        self.version = dataset_version(config, source)
+        self.partitioned = is_partitioned(self.dataset)
+        self.columns = [col for col in columns if col in self.dataset.schema.names]
+        self._scan_dictionaries(merge_every)
+
+    def _groups(self, filters=None):
+        # Fragment per folder bulan (urut waktu, urutan file di dalamnya dipertahankan).
+        # Folder Parquet tanpa partisi: satu file = satu chunk
+        groups = {}
+        for fragment in self.dataset.get_fragments(filter=filters):
+            key = os.path.dirname(fragment.path) if self.partitioned else fragment.path
+            groups.setdefault(key, []).append(fragment)
+        return [groups[key] for key in sorted(groups)]
+
+    def _tables(self, columns, filters=None):
+        for fragments in self._groups(filters):
+            group = ds.FileSystemDataset(fragments, self.dataset.schema, self.dataset.format,
+                                         self.dataset.filesystem)
+            table = group.to_table(columns=columns, filter=filters)
+            if table.num_rows:
+                yield table
+
+    def _scan_dictionaries(self, merge_every):
+        # Pass pertama: nilai unik kolom ID & kategori, status, batas tanggal per tahun.
+        # Nilai unik per chunk digabung setiap `merge_every` chunk supaya memori tetap sebesar kamus.
+        kinds = {col: COLUMN_SCHEMA[col] for col in self.columns if col in COLUMN_SCHEMA}
+        uniques = {col: np.empty(0, dtype=object) for col in kinds}
+        pending = {col: [] for col in kinds}
+        self.nullable = {col: False for col in kinds}
+        year_bounds = []
+        self.n_rows = 0
+
+        for i, table in enumerate(self._tables(list(kinds) + [TIMESTAMP_COLUMN]), start=1):
+            self.n_rows += table.num_rows
+            for col in kinds:
+                self.nullable[col] |= table[col].null_count > 0
+                pending[col].append(pc.unique(table[col]).drop_null().to_numpy(zero_copy_only=False))
+                if i % merge_every == 0:
+                    uniques[col] = np.unique(np.concatenate([uniques[col]] + pending[col]))
+                    pending[col] = []
+            ts = table[TIMESTAMP_COLUMN].to_pandas().dropna()
+            year_bounds.append(ts.groupby(ts.dt.year).agg(['min', 'max']))
+
+        for col in kinds:
+            uniques[col] = np.unique(np.concatenate([uniques[col]] + pending[col]))
+        # Sama dengan encode_ids() / astype('category') pada dataset lengkap: nilai unik terurut
+        self.id_lookup = {col: pd.Index(uniques[col], dtype=object, name=col)
+                          for col, kind in kinds.items() if kind == 'id'}
+        self.dtypes = {col: pd.CategoricalDtype(pd.Index(uniques[col], dtype=object))
+                       for col, kind in kinds.items() if kind == 'category'}
+
+        year_bounds = pd.concat(year_bounds) if year_bounds else pd.DataFrame(columns=['min', 'max'])
+        year_bounds = year_bounds.groupby(level=0).agg({'min': 'min', 'max': 'max'})
+        year_bounds.index.name = TIMESTAMP_COLUMN
+        self.statuses = list(self.dtypes[STATUS_COLUMN].categories)
+        self.filter_options = {
+            'years': year_bounds.index.tolist(),
+            'statuses': sorted(self.statuses),
+            'year_bounds': year_bounds
+        }
+        self.first_day = year_bounds['min'].min().floor('D') if len(year_bounds) else pd.Timestamp(0)
+
+    def _compact(self, df):
+        # Kompaksi chunk dengan kamus global (tanpa downcast numerik: chunk hanya sementara)
+        for col in df.columns:
+            if col in self.dtypes:
+                df[col] = pd.Categorical(df[col], dtype=self.dtypes[col])
+            elif col in self.id_lookup:
+                lookup = self.id_lookup[col]
+                df[col] = _id_codes(lookup.get_indexer(df[col]), len(lookup), df.index, col,
+                                    nullable=self.nullable[col])
+        return df
+
+    def chunks(self, columns=None, years=None, statuses=None, start_date=None, end_date=None):
+        # Yield DataFrame kompak per bulan untuk baris yang lolos filter sidebar (filter yang sama
+        # dengan FilterIndex, dievaluasi pyarrow + partition pruning)
+        columns = self.columns if columns is None else [col for col in columns if col in self.columns]
+        filters = _arrow_filter(years, statuses, start_date, end_date, partitioned=self.partitioned)
+        for table in self._tables(columns, filters):
+            yield self._compact(table.to_pandas())
+
+    def daily_cube(self):
+        return DailyCube.from_chunks(self.chunks(), self.statuses, self.first_day, len(self.id_lookup['order_id']))
+
+    def select(self, years=None, start_date=None, end_date=None, statuses=None):
+        return StreamingSelection(self, years, start_date, end_date, statuses)
+
+
+class StreamingSelection:
+    # Pengganti df_filtered di mode streaming: tiap method satu pass streaming atas baris yang lolos
+    # filter, hasilnya sama dengan operasi pandas yang disebut di komentar
+
+    def __init__(self, dataset, years=None, start_date=None, end_date=None, statuses=None):
+        self.dataset = dataset
+        self.filters = dict(years=years, start_date=start_date, end_date=end_date, statuses=statuses)
+
+    def chunks(self, columns):
+        return self.dataset.chunks(columns, **self.filters)
+
+    def nunique(self, col):
+        # df_filtered[col].nunique() — kolom ID lewat bitmap kode, kolom lain lewat nilai unik
+        lookup = self.dataset.id_lookup.get(col)
+        if lookup is None:
+            values = [chunk[col].dropna().unique() for chunk in self.chunks([col])]
+            return len(pd.unique(np.concatenate(values))) if values else 0
+        seen = np.zeros(len(lookup), dtype=bool)
+        for chunk in self.chunks([col]):
+            seen[chunk[col].dropna().to_numpy(dtype=np.int64)] = True
+        return int(seen.sum())
+
+    def period(self):
+        # (min, max) order_purchase_timestamp
+        bounds = [(chunk[TIMESTAMP_COLUMN].min(), chunk[TIMESTAMP_COLUMN].max())
+                  for chunk in self.chunks([TIMESTAMP_COLUMN])]
+        if not bounds:
+            return pd.NaT, pd.NaT
+        return min(lo for lo, _ in bounds), max(hi for _, hi in bounds)
+
+    def revenue_by_category(self):
+        # Fallback Q1 (order tidak additive di cube): dropna(product_id, price, kategori) lalu
+        # groupby kategori -> sum & mean price, nunique order_id, count product_id, mean review.
+        # Order unik dihitung dari pasangan (kategori, kode order) yang unik lintas chunk.
+        category = Q1_COLUMNS[0]
+        n_orders = len(self.dataset.id_lookup['order_id'])
+        sums, pairs = [], np.empty(0, dtype=np.int64)
+        for chunk in self.chunks(Q1_COLUMNS):
+            chunk = chunk.dropna(subset=['product_id', 'price', category])
+            sums.append(chunk.groupby(category, observed=True).agg(
+                price_sum=('price', 'sum'), price_count=('price', 'count'),
+                product_count=('product_id', 'count'),
+                review_sum=('review_score_avg', 'sum'), review_count=('review_score_avg', 'count')
+            ))
+            orders = chunk['order_id'].dropna()
+            codes = chunk[category].cat.codes.to_numpy()[chunk['order_id'].notna().to_numpy()]
+            pairs = np.union1d(pairs, codes.astype(np.int64) * n_orders + orders.to_numpy(dtype=np.int64))
+
+        dtype = self.dataset.dtypes[category]
+        if sums:
+            totals = pd.concat(sums).groupby(level=0, observed=True).sum()
+        else:
+            totals = pd.DataFrame(columns=['price_sum', 'price_count', 'product_count', 'review_sum',
+                                           'review_count'], index=pd.CategoricalIndex([], dtype=dtype))
+        order_counts = pd.Series(np.bincount(pairs // max(n_orders, 1), minlength=len(dtype.categories)),
+                                 index=dtype.categories)
+        return pd.DataFrame({
+            category: pd.Categorical(totals.index, dtype=dtype),
+            'total_revenue': totals['price_sum'].to_numpy(dtype=np.float64),
+            'avg_order_value': (totals['price_sum'] / totals['price_count']).to_numpy(dtype=np.float64),
+            'total_orders': order_counts.reindex(totals.index.astype(object)).to_numpy(),
+            'total_items': totals['product_count'].to_numpy(dtype=np.int64),
+            'avg_review': (totals['review_sum'] / totals['review_count'].replace(0, np.nan)).to_numpy(dtype=np.float64)
+        })
+
+    def calculate_rfm(self, rules=None):
+        # rfm.calculate_rfm(df_filtered) dengan agregat per customer yang di-merge antar chunk
+        return rfm.calculate_rfm_chunked(self.chunks(rfm.RFM_COLUMNS), rules)